@@ -18,9 +18,11 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-from models.tasks import SQLModel  # noqa
+from database import Base  # noqa
+import models.models  # noqa
+import models.tasks  # noqa
 
-target_metadata = SQLModel.metadata
+target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
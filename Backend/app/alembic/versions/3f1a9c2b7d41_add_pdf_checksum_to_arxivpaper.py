@@ -0,0 +1,45 @@
+"""add pdf size and sha256 to arxivpaper
+
+Revision ID: 3f1a9c2b7d41
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1a9c2b7d41"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 新库由 init_db 的 create_all 建表时已经包含这两列，这里只给旧库补列
+    columns = _columns("arxivpaper")
+    if "pdf_size" not in columns:
+        op.add_column("arxivpaper", sa.Column("pdf_size", sa.Integer(), nullable=True))
+    if "pdf_sha256" not in columns:
+        op.add_column(
+            "arxivpaper", sa.Column("pdf_sha256", sa.String(length=64), nullable=True)
+        )
+        op.create_index(
+            op.f("ix_arxivpaper_pdf_sha256"), "arxivpaper", ["pdf_sha256"]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_arxivpaper_pdf_sha256"), table_name="arxivpaper")
+    op.drop_column("arxivpaper", "pdf_sha256")
+    op.drop_column("arxivpaper", "pdf_size")
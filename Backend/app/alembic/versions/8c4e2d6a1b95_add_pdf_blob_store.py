@@ -0,0 +1,43 @@
+"""add content-addressed pdf blob store
+
+Revision ID: 8c4e2d6a1b95
+Revises: 3f1a9c2b7d41
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4e2d6a1b95"
+down_revision: Union[str, None] = "3f1a9c2b7d41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "pdf_blob" not in inspector.get_table_names():
+        op.create_table(
+            "pdf_blob",
+            sa.Column("sha256", sa.String(length=64), primary_key=True),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("storage_path", sa.String(length=255), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+    columns = {column["name"] for column in inspector.get_columns("arxivpaper")}
+    if "pdf_state" not in columns:
+        op.add_column("arxivpaper", sa.Column("pdf_state", sa.String(length=20), nullable=True))
+        op.create_index(op.f("ix_arxivpaper_pdf_state"), "arxivpaper", ["pdf_state"])
+    # 旧文件在 data/pdf/{年}/{月}/ 下，评审或预取时由 PdfStore.fetch 迁移进存储，这里不搬动文件
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_arxivpaper_pdf_state"), table_name="arxivpaper")
+    op.drop_column("arxivpaper", "pdf_state")
+    op.drop_table("pdf_blob")
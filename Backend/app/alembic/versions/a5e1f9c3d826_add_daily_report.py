@@ -0,0 +1,43 @@
+"""add daily report table
+
+Revision ID: a5e1f9c3d826
+Revises: f2c8a4d17e53
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a5e1f9c3d826"
+down_revision: Union[str, None] = "f2c8a4d17e53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "daily_report" not in inspector.get_table_names():
+        op.create_table(
+            "daily_report",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("report_date", sa.Date(), nullable=False),
+            sa.Column("top_k", sa.Integer(), nullable=False),
+            sa.Column("fingerprint", sa.String(length=64), nullable=False),
+            sa.Column("paper_ids", sa.JSON(), nullable=True),
+            sa.Column("report", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index(
+            op.f("ix_daily_report_report_date"), "daily_report", ["report_date"], unique=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_report")
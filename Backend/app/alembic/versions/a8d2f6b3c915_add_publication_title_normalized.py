@@ -0,0 +1,71 @@
+"""add title_normalized to publication
+
+Revision ID: a8d2f6b3c915
+Revises: f7a3c9e1b482
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.reference_parser import normalize_title
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a8d2f6b3c915"
+down_revision: Union[str, None] = "f7a3c9e1b482"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("publication")}
+    if "title_normalized" not in columns:
+        op.add_column(
+            "publication", sa.Column("title_normalized", sa.String(length=500), nullable=True)
+        )
+        op.create_index(
+            op.f("ix_publication_title_normalized"), "publication", ["title_normalized"]
+        )
+
+    # 规范化规则在 Python 里（合并空白、去掉结尾标点），按 id 分批回填
+    publication = sa.table(
+        "publication",
+        sa.column("id", sa.Integer),
+        sa.column("title", sa.String),
+        sa.column("title_normalized", sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(publication.c.id, publication.c.title)
+            .where(publication.c.id > last_id)
+            .order_by(publication.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            publication.update()
+            .where(publication.c.id == sa.bindparam("row_id"))
+            .values(title_normalized=sa.bindparam("normalized")),
+            [{"row_id": row.id, "normalized": normalize_title(row.title)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    # lower(title) 表达式索引不再使用（SQLite 反射不出表达式索引，直接用 IF EXISTS）
+    op.execute("DROP INDEX IF EXISTS ix_publication_title_lower")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_publication_title_lower", "publication", [sa.text("lower(title)")])
+    op.drop_index(op.f("ix_publication_title_normalized"), table_name="publication")
+    op.drop_column("publication", "title_normalized")
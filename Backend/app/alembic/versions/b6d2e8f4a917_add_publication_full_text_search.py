@@ -0,0 +1,96 @@
+"""add full-text search index over publication title, abstract, conclusion and topics
+
+Revision ID: b6d2e8f4a917
+Revises: a5e1f9c3d826
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d2e8f4a917"
+down_revision: Union[str, None] = "a5e1f9c3d826"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_FTS5_COLUMNS = "title, research_topics, abstract, conclusion"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if bind.dialect.name == "postgresql":
+        columns = {column["name"] for column in inspector.get_columns("publication")}
+        if "search_vector" not in columns:
+            # 生成列在添加时对已有行计算，之后插入和修改时由数据库增量维护
+            op.execute(
+                """
+                ALTER TABLE publication ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(research_topics, '')), 'B') ||
+                    setweight(to_tsvector('english', coalesce(abstract, '')), 'C') ||
+                    setweight(to_tsvector('english', coalesce(conclusion, '')), 'D')
+                ) STORED
+                """
+            )
+        indexes = {index["name"] for index in inspector.get_indexes("publication")}
+        if "ix_publication_search_vector" not in indexes:
+            op.execute(
+                "CREATE INDEX ix_publication_search_vector ON publication USING GIN (search_vector)"
+            )
+    elif bind.dialect.name == "sqlite":
+        if "publication_fts" not in inspector.get_table_names():
+            op.execute(
+                f"""
+                CREATE VIRTUAL TABLE publication_fts USING fts5(
+                    {_FTS5_COLUMNS},
+                    content='publication', content_rowid='id', tokenize='porter unicode61'
+                )
+                """
+            )
+            # 已有的论文一次性建索引
+            op.execute("INSERT INTO publication_fts(publication_fts) VALUES ('rebuild')")
+        op.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS publication_fts_ai AFTER INSERT ON publication BEGIN
+                INSERT INTO publication_fts(rowid, {_FTS5_COLUMNS})
+                VALUES (new.id, new.title, new.research_topics, new.abstract, new.conclusion);
+            END
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS publication_fts_ad AFTER DELETE ON publication BEGIN
+                INSERT INTO publication_fts(publication_fts, rowid, {_FTS5_COLUMNS})
+                VALUES ('delete', old.id, old.title, old.research_topics, old.abstract, old.conclusion);
+            END
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS publication_fts_au
+            AFTER UPDATE OF {_FTS5_COLUMNS} ON publication BEGIN
+                INSERT INTO publication_fts(publication_fts, rowid, {_FTS5_COLUMNS})
+                VALUES ('delete', old.id, old.title, old.research_topics, old.abstract, old.conclusion);
+                INSERT INTO publication_fts(rowid, {_FTS5_COLUMNS})
+                VALUES (new.id, new.title, new.research_topics, new.abstract, new.conclusion);
+            END
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_publication_search_vector")
+        op.execute("ALTER TABLE publication DROP COLUMN IF EXISTS search_vector")
+    elif bind.dialect.name == "sqlite":
+        for trigger in ("publication_fts_ai", "publication_fts_ad", "publication_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS publication_fts")
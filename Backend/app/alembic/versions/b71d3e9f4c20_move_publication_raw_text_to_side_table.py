@@ -0,0 +1,137 @@
+"""move publication raw text to a compressed side table
+
+Revision ID: b71d3e9f4c20
+Revises: 8c4e2d6a1b95
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b71d3e9f4c20"
+down_revision: Union[str, None] = "8c4e2d6a1b95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def _compress(text):
+    return zlib.compress(text.encode("utf-8"), 6) if text else None
+
+
+def _decompress(data):
+    return zlib.decompress(data).decode("utf-8") if data else None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "publication_content" not in inspector.get_table_names():
+        op.create_table(
+            "publication_content",
+            sa.Column(
+                "paper_id",
+                sa.String(length=255),
+                sa.ForeignKey("publication.paper_id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("content_compressed", sa.LargeBinary(), nullable=True),
+            sa.Column("reference_compressed", sa.LargeBinary(), nullable=True),
+            sa.Column("content_length", sa.Integer(), nullable=True),
+            sa.Column("reference_length", sa.Integer(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+    columns = {column["name"] for column in inspector.get_columns("publication")}
+    if "content_raw_text" not in columns:
+        return
+
+    # 分批把旧列的数据压缩后搬到新表，按主键翻页，不会一次把所有全文读进内存
+    publication = sa.table(
+        "publication",
+        sa.column("id", sa.Integer),
+        sa.column("paper_id", sa.String),
+        sa.column("content_raw_text", sa.Text),
+        sa.column("reference_raw_text", sa.Text),
+    )
+    content = sa.table(
+        "publication_content",
+        sa.column("paper_id", sa.String),
+        sa.column("content_compressed", sa.LargeBinary),
+        sa.column("reference_compressed", sa.LargeBinary),
+        sa.column("content_length", sa.Integer),
+        sa.column("reference_length", sa.Integer),
+        sa.column("updated_at", sa.DateTime),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                publication.c.id,
+                publication.c.paper_id,
+                publication.c.content_raw_text,
+                publication.c.reference_raw_text,
+            )
+            .where(publication.c.id > last_id)
+            .order_by(publication.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            content.insert(),
+            [
+                {
+                    "paper_id": row.paper_id,
+                    "content_compressed": _compress(row.content_raw_text),
+                    "reference_compressed": _compress(row.reference_raw_text),
+                    "content_length": len(row.content_raw_text or ""),
+                    "reference_length": len(row.reference_raw_text or ""),
+                    "updated_at": datetime.now(timezone.utc),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table("publication") as batch_op:
+        batch_op.drop_column("content_raw_text")
+        batch_op.drop_column("reference_raw_text")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    with op.batch_alter_table("publication") as batch_op:
+        batch_op.add_column(sa.Column("content_raw_text", sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column("reference_raw_text", sa.Text(), nullable=True))
+
+    publication = sa.table(
+        "publication",
+        sa.column("paper_id", sa.String),
+        sa.column("content_raw_text", sa.Text),
+        sa.column("reference_raw_text", sa.Text),
+    )
+    content = sa.table(
+        "publication_content",
+        sa.column("paper_id", sa.String),
+        sa.column("content_compressed", sa.LargeBinary),
+        sa.column("reference_compressed", sa.LargeBinary),
+    )
+    for row in bind.execute(sa.select(content)):
+        bind.execute(
+            publication.update()
+            .where(publication.c.paper_id == row.paper_id)
+            .values(
+                content_raw_text=_decompress(row.content_compressed),
+                reference_raw_text=_decompress(row.reference_compressed),
+            )
+        )
+    op.drop_table("publication_content")
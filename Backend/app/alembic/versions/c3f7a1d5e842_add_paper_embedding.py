@@ -0,0 +1,46 @@
+"""add paper embedding table
+
+Revision ID: c3f7a1d5e842
+Revises: b6d2e8f4a917
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f7a1d5e842"
+down_revision: Union[str, None] = "b6d2e8f4a917"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "paper_embedding" not in inspector.get_table_names():
+        op.create_table(
+            "paper_embedding",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column(
+                "paper_id",
+                sa.String(length=255),
+                sa.ForeignKey("publication.paper_id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("model", sa.String(length=255), nullable=False),
+            sa.Column("text_hash", sa.String(length=40), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index(
+            op.f("ix_paper_embedding_paper_id"), "paper_embedding", ["paper_id"], unique=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("paper_embedding")
@@ -0,0 +1,67 @@
+"""add citation edge table
+
+Revision ID: d4a7c1e95b38
+Revises: b71d3e9f4c20
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a7c1e95b38"
+down_revision: Union[str, None] = "b71d3e9f4c20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "citation" not in inspector.get_table_names():
+        op.create_table(
+            "citation",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column(
+                "citing_paper_id",
+                sa.String(length=255),
+                sa.ForeignKey("publication.paper_id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("cited_paper_id", sa.String(length=255), nullable=True),
+            sa.Column("cited_arxiv_id", sa.String(length=32), nullable=True),
+            sa.Column("cited_doi", sa.String(length=255), nullable=True),
+            sa.Column("cited_title", sa.String(length=500), nullable=True),
+            sa.Column("cited_year", sa.Integer(), nullable=True),
+            sa.Column("raw", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.UniqueConstraint(
+                "citing_paper_id", "position", name="uq_citation_citing_position"
+            ),
+        )
+        op.create_index(op.f("ix_citation_citing_paper_id"), "citation", ["citing_paper_id"])
+        op.create_index(op.f("ix_citation_cited_arxiv_id"), "citation", ["cited_arxiv_id"])
+        op.create_index(op.f("ix_citation_cited_doi"), "citation", ["cited_doi"])
+        op.create_index(
+            "ix_citation_cited_citing", "citation", ["cited_paper_id", "citing_paper_id"]
+        )
+
+    indexes = {index["name"] for index in inspector.get_indexes("publication")}
+    if "ix_publication_doi" not in indexes:
+        op.create_index(op.f("ix_publication_doi"), "publication", ["doi"])
+    if "ix_publication_title_lower" not in indexes:
+        op.create_index(
+            "ix_publication_title_lower", "publication", [sa.text("lower(title)")]
+        )
+    # 已有论文的引用边由 build_citation_graph 任务补建，这里不解析参考文献
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_publication_title_lower", table_name="publication")
+    op.drop_index(op.f("ix_publication_doi"), table_name="publication")
+    op.drop_table("citation")
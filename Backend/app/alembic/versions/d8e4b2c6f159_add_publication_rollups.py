@@ -0,0 +1,67 @@
+"""add publication rollup tables for facet counts
+
+Revision ID: d8e4b2c6f159
+Revises: c3f7a1d5e842
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8e4b2c6f159"
+down_revision: Union[str, None] = "c3f7a1d5e842"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 聚合表在升级后由 build_facet_rollups 任务全量构建，之后随论文写入增量维护
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    if "publication_rollup" not in tables:
+        op.create_table(
+            "publication_rollup",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("publish_date", sa.Date(), nullable=False),
+            sa.Column("primary_category", sa.String(length=255), nullable=True),
+            sa.Column("recommend", sa.Boolean(), nullable=True),
+            sa.Column("score_bucket", sa.Integer(), nullable=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+        op.create_index(
+            op.f("ix_publication_rollup_publish_date"),
+            "publication_rollup",
+            ["publish_date"],
+        )
+    if "publication_affiliation_rollup" not in tables:
+        op.create_table(
+            "publication_affiliation_rollup",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("publish_date", sa.Date(), nullable=False),
+            sa.Column("primary_category", sa.String(length=255), nullable=True),
+            sa.Column("recommend", sa.Boolean(), nullable=True),
+            sa.Column("score_bucket", sa.Integer(), nullable=True),
+            sa.Column("affiliation", sa.String(length=255), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+        op.create_index(
+            op.f("ix_publication_affiliation_rollup_publish_date"),
+            "publication_affiliation_rollup",
+            ["publish_date"],
+        )
+        op.create_index(
+            op.f("ix_publication_affiliation_rollup_affiliation"),
+            "publication_affiliation_rollup",
+            ["affiliation"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("publication_affiliation_rollup")
+    op.drop_table("publication_rollup")
@@ -0,0 +1,37 @@
+"""add citations_built_at to publication
+
+Revision ID: e5b9d3a7c214
+Revises: d8e4b2c6f159
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b9d3a7c214"
+down_revision: Union[str, None] = "d8e4b2c6f159"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 已经有引用边的论文仍然由 citation 表判断，不需要回填
+    if "citations_built_at" not in _columns("publication"):
+        op.add_column(
+            "publication", sa.Column("citations_built_at", sa.DateTime(), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("publication", "citations_built_at")
@@ -0,0 +1,53 @@
+"""add paper chunk table
+
+Revision ID: e93b5f2c7a16
+Revises: d4a7c1e95b38
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e93b5f2c7a16"
+down_revision: Union[str, None] = "d4a7c1e95b38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "paper_chunk" not in inspector.get_table_names():
+        op.create_table(
+            "paper_chunk",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column(
+                "paper_id",
+                sa.String(length=255),
+                sa.ForeignKey("publication.paper_id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("chunk_index", sa.Integer(), nullable=False),
+            sa.Column("section", sa.String(length=50), nullable=False),
+            sa.Column("line_start", sa.Integer(), nullable=False),
+            sa.Column("line_end", sa.Integer(), nullable=False),
+            sa.Column("char_start", sa.Integer(), nullable=False),
+            sa.Column("char_end", sa.Integer(), nullable=False),
+            sa.Column("page", sa.Integer(), nullable=True),
+            sa.Column("token_count", sa.Integer(), nullable=False),
+            sa.Column("text", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.UniqueConstraint(
+                "paper_id", "chunk_index", name="uq_paper_chunk_paper_index"
+            ),
+        )
+    # 已有论文的片段由 build_chunk_index 任务补建
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("paper_chunk")
@@ -0,0 +1,58 @@
+"""denormalize weighted score onto publication and add keyset indexes
+
+Revision ID: f2c8a4d17e53
+Revises: e93b5f2c7a16
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c8a4d17e53"
+down_revision: Union[str, None] = "e93b5f2c7a16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("publication")}
+    if "weighted_score" not in columns:
+        op.add_column(
+            "publication",
+            sa.Column("weighted_score", sa.Float(), nullable=False, server_default="0"),
+        )
+        # 用 paperscores 回填，之后由 PaperScores 的 after_insert/after_update 事件保持同步
+        op.execute(
+            """
+            UPDATE publication SET weighted_score = COALESCE(
+                (SELECT paperscores.weighted_score FROM paperscores
+                 WHERE paperscores.paper_id = publication.paper_id), 0)
+            """
+        )
+    indexes = {index["name"] for index in inspector.get_indexes("publication")}
+    if "ix_publication_publish_date_paper_id" not in indexes:
+        op.create_index(
+            "ix_publication_publish_date_paper_id",
+            "publication",
+            ["publish_date", "paper_id"],
+        )
+    if "ix_publication_weighted_score_paper_id" not in indexes:
+        op.create_index(
+            "ix_publication_weighted_score_paper_id",
+            "publication",
+            ["weighted_score", "paper_id"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_publication_weighted_score_paper_id", table_name="publication")
+    op.drop_index("ix_publication_publish_date_paper_id", table_name="publication")
+    with op.batch_alter_table("publication") as batch_op:
+        batch_op.drop_column("weighted_score")
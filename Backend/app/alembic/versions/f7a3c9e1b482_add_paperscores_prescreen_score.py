@@ -0,0 +1,66 @@
+"""add prescreen_score to paperscores
+
+Revision ID: f7a3c9e1b482
+Revises: e5b9d3a7c214
+Create Date: 2026-10-18 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f7a3c9e1b482"
+down_revision: Union[str, None] = "e5b9d3a7c214"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "prescreen_score" not in _columns("paperscores"):
+        op.add_column("paperscores", sa.Column("prescreen_score", sa.Float(), nullable=True))
+    # 之前预筛分数写在 weighted_score 里，移到 prescreen_score，论文上的冗余分数归零
+    op.execute(
+        """
+        UPDATE paperscores SET prescreen_score = weighted_score, weighted_score = NULL
+        WHERE review_status = 'prescreen_rejected' AND weighted_score IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE publication SET weighted_score = 0
+        WHERE paper_id IN (
+            SELECT paper_id FROM paperscores WHERE review_status = 'prescreen_rejected'
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        UPDATE paperscores SET weighted_score = prescreen_score
+        WHERE review_status = 'prescreen_rejected' AND prescreen_score IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE publication SET weighted_score = (
+            SELECT paperscores.weighted_score FROM paperscores
+            WHERE paperscores.paper_id = publication.paper_id
+        )
+        WHERE paper_id IN (
+            SELECT paper_id FROM paperscores WHERE review_status = 'prescreen_rejected'
+        )
+        """
+    )
+    op.drop_column("paperscores", "prescreen_score")
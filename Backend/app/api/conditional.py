@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+
+# Conditional GET: read endpoints first run a cheap version query (max updated_at and
+# row count of what the body would contain), derive an ETag / Last-Modified from it, and
+# answer 304 Not Modified before building the body when the client's copy is current.
+
+
+def latest(*values: Optional[datetime]) -> Optional[datetime]:
+    """
+    The most recent of the given timestamps (naive timestamps are taken as UTC)
+    """
+    aware = [
+        v if v.tzinfo else v.replace(tzinfo=timezone.utc) for v in values if v is not None
+    ]
+    return max(aware, default=None)
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag over the version parts; the same parts always give the same ETag
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8"))
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in header.split(",")
+    )
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def set_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+):
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    # Always revalidate, so clients poll with If-None-Match instead of using a stale copy
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Return a 304 response when the request's validators match, otherwise None.
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        matched = _etag_matches(if_none_match, etag)
+    elif last_modified and request.headers.get("if-modified-since"):
+        matched = _not_modified_since(request.headers["if-modified-since"], last_modified)
+    else:
+        matched = False
+    if not matched:
+        return None
+    response = Response(status_code=304)
+    set_validators(response, etag, last_modified)
+    return response
+
+
+def version_parts(request: Request, *parts: Any) -> Iterable[Any]:
+    """
+    Version parts scoped to the request path and query (?fields=, ?cursor= ... change the body)
+    """
+    return (request.url.path, str(request.query_params), *parts)
@@ -0,0 +1,60 @@
+import base64
+from datetime import date
+import json
+from typing import Any, List, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import asc, desc, tuple_
+
+# Keyset (cursor) pagination: a page is "the next N rows after the last row seen",
+# expressed as WHERE (sort_key, paper_id) < (last_sort_key, last_paper_id) on an index
+# of (sort_key, paper_id). Page N costs the same as page 1, and rows inserted while
+# a client is paging cannot shift the window and cause duplicates or skipped rows.
+
+
+def encode_cursor(sort_by: str, order: str, values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor
+    """
+    payload = {
+        "s": sort_by,
+        "o": order,
+        "v": [v.isoformat() if isinstance(v, date) else v for v in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> List[Any]:
+    """
+    Decode a cursor created by encode_cursor for the same sort field and order
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("s") != sort_by or payload.get("o") != order:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor was created with a different sort_by or order",
+        )
+    return values
+
+
+def keyset_order(columns: Sequence, descending: bool) -> list:
+    """
+    ORDER BY every key column in the same direction, so the composite index can be scanned
+    """
+    direction = desc if descending else asc
+    return [direction(column) for column in columns]
+
+
+def keyset_filter(columns: Sequence, values: Sequence[Any], descending: bool):
+    """
+    Row-value comparison selecting the rows after the cursor position
+    """
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timezone, timedelta
 from typing import Annotated, Optional
 
@@ -5,7 +6,7 @@ from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from database import get_db
+from database import engine, get_db
 from models.tasks import (
     ArxivPaper,
     CrawlerTask,
@@ -19,7 +20,16 @@ from models.tasks import (
     TaskExecutionResponse,
     TaskStatus,
 )
+from api.routes.daily_paper import (
+    build_chunk_index,
+    build_citation_graph,
+    build_embedding_index,
+    build_facet_rollups,
+    generate_daily_report,
+)
 from core.arxiv_crawler import ArxivApiArgs, ArxivCrawler
+from core.pdf_prefetch import PrefetchItem, pdf_prefetcher
+from config import PDF_PREFETCH_ENABLED
 
 import logging
 
@@ -30,6 +40,16 @@ router = APIRouter(prefix="/crawler", tags=["crawler"])
 # Use the async get_db dependency
 db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
+# Maintenance tasks that can be scheduled like crawl_arxiv. They are synchronous
+# (database batches, PDF parsing, LLM calls) and run in a worker thread
+MAINTENANCE_TASKS = {
+    "build_citation_graph": build_citation_graph,
+    "build_chunk_index": build_chunk_index,
+    "generate_daily_report": generate_daily_report,
+    "build_embedding_index": build_embedding_index,
+    "build_facet_rollups": build_facet_rollups,
+}
+
 
 @router.get("/tasks", response_model=CrawlerTaskList)
 async def get_tasks(db: db_dependency, skip: int = Query(0), limit: int = Query(100)):
@@ -197,7 +217,8 @@ async def execute_task(task_id: int):
     Execute a crawler task asynchronously
     """
     # Create a new database session for this background task
-    async with AsyncSession(engine) as db:
+    # Attributes stay loaded after commit, the task is read again after each status update
+    async with AsyncSession(engine, expire_on_commit=False) as db:
         # Get the task
         query = select(CrawlerTask).filter(CrawlerTask.id == task_id)
         result = await db.execute(query)
@@ -217,6 +238,7 @@ async def execute_task(task_id: int):
         db.add(execution)
         await db.commit()
         await db.refresh(execution)
+        prefetch_items = []
 
         try:
             # Update task status to running
@@ -267,12 +289,25 @@ async def execute_task(task_id: int):
                             categories=paper.categories,
                         )
                         db.add(new_paper)
+                        prefetch_items.append(PrefetchItem.from_paper(new_paper))
 
                 # Update execution log
                 execution.log = append_log(
                     execution.log, f"Successfully crawled {len(papers)} papers"
                 )
                 execution.status = TaskStatus.completed
+            elif task.function_name in MAINTENANCE_TASKS:
+                result = await asyncio.to_thread(
+                    MAINTENANCE_TASKS[task.function_name], task
+                )
+                execution.log = append_log(
+                    execution.log, f"{result.get('message')}: {result.get('data')}"
+                )
+                if result.get("status") == "error":
+                    execution.status = TaskStatus.failed
+                    task.status = TaskStatus.failed
+                else:
+                    execution.status = TaskStatus.completed
             else:
                 execution.log = append_log(
                     execution.log, f"Unknown function: {task.function_name}"
@@ -312,6 +347,10 @@ async def execute_task(task_id: int):
 
             await db.commit()
 
+        if PDF_PREFETCH_ENABLED:
+            # 新论文已经入库，在后台预取 PDF
+            pdf_prefetcher.schedule(prefetch_items)
+
 
 def crawl_arxiv(task: CrawlerTask):
     """
@@ -1,19 +1,35 @@
-from datetime import date, datetime, timezone
+import asyncio
+from datetime import date, datetime, timedelta, timezone
 import logging
 import sys
 import uuid
 from typing import Annotated, Any, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, logger
-from sqlalchemy import desc
-from sqlalchemy.orm import Session, load_only
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    logger,
+)
+from sqlalchemy import desc, select
+from sqlalchemy.orm import Session, joinedload, load_only
 from fastapi import Query
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+from api.routes.reports import get_daily_summary
 from core.review_arxiv_paper import ReviewArxivPaper
 from core.arxiv_crawler import ArxivApiArgs, ArxivCrawler
-from database import SessionLocal
+from core.citation_graph import citation_graph_builder
+from core.daily_report import DailyReportError, daily_report_builder
+from core.facets import publication_facets
+from core.pdf_prefetch import PrefetchItem, pdf_prefetcher
+from core.semantic_search import semantic_search_index
+from config import PDF_PREFETCH_ENABLED
+from database import SyncSessionLocal
 
 # Import SQLAlchemy models instead of SQLModel models
 from models.tasks import (
@@ -24,8 +40,10 @@ from models.tasks import (
     CrawlerTaskList,
     CrawlerTaskResponse,
     CrawlerTaskUpdate,
+    PaperChunk,
     PaperScores,
     Publication,
+    PublicationContent,
     StandardResponse,
     TaskExecution,
     TaskExecutionList,
@@ -44,7 +62,7 @@ logger = logging.getLogger(__name__)
 
 
 def get_db():
-    db = SessionLocal()
+    db = SyncSessionLocal()
     try:
         yield db
     finally:
@@ -204,9 +222,7 @@ async def get_paper(db: db_dependency, paper_id: str):
     arxiv_paper = db.query(ArxivPaper).filter(ArxivPaper.arxiv_id == paper_id).first()
 
     if publication and arxiv_paper:
-        # TODO: 全部返回给前端不合适，pdf 的raw data 太长了。另外，论文作者也待处理。 后续可以考虑直接建一个view
-        publication.content_raw_text = ""  # 粗暴处理 remove it
-        publication.reference_raw_text = ""
+        # TODO: 论文作者待处理。 后续可以考虑直接建一个view
         return_data = {
             "paper_id": publication.paper_id,
             "publish_date": publication.publish_date,
@@ -221,9 +237,7 @@ async def get_paper(db: db_dependency, paper_id: str):
                 if publication.scores
                 else "{'review_status':'pending','error_message':'not processed yet'}"
             ),
-            "weighted_score": (
-                publication.scores.weighted_score if publication.scores else 0
-            ),
+            "weighted_score": publication.weighted_score,
         }
 
         return StandardResponse(
@@ -270,6 +284,7 @@ async def get_papers(
 
     publication_list = (
         db.query(Publication)
+        .options(joinedload(Publication.scores), joinedload(Publication.arxiv_paper))
         .filter(
             Publication.paper_id != None,
             Publication.publish_date >= start_date,
@@ -285,19 +300,15 @@ async def get_papers(
     logger.info(f"query table Publication and found {len(publication_list)} records")
     return_data = []
     for publication in publication_list:
-        # TODO: 未来会改成，待把作者信息清洗后，就不需要再查询ArxivPaper
-        arxiv_paper = (
-            db.query(ArxivPaper)
-            .filter(ArxivPaper.arxiv_id == publication.paper_id)
-            .first()
-        )
+        # TODO: 未来会改成，待把作者信息清洗后，就不需要再关联ArxivPaper
+        arxiv_paper = publication.arxiv_paper
         item_data = {
             "paper_id": publication.paper_id,
             "publish_date": publication.publish_date,
             "title": publication.title,
             "pdf_url": publication.pdf_url,
             "abstract": publication.abstract,
-            "author": arxiv_paper.authors,
+            "author": arxiv_paper.authors if arxiv_paper else None,
             "conclusion": publication.conclusion,
             "traige_qa": publication.triage_qa,
             "scores": (
@@ -305,9 +316,7 @@ async def get_papers(
                 if publication.scores
                 else "{'review_status':'pending','error_message':'not processed yet'}"
             ),
-            "weighted_score": (
-                publication.scores.weighted_score if publication.scores else 0
-            ),
+            "weighted_score": publication.weighted_score,
         }
         return_data.append(item_data)
 
@@ -328,88 +337,19 @@ async def get_papers(
 
 @router.get("/reports/daily", response_model=StandardResponse)
 async def get_daily_report(
-    db: db_dependency,
+    request: Request,
+    response: Response,
     date: Optional[date] = Query(
         None, description="Report date (yyyy-mm-dd). Defaults to today if not specified"
     ),
+    refresh: bool = Query(
+        False, description="Regenerate the report even if the top papers have not changed"
+    ),
 ):
     """
-    Get daily report of top papers for a specific date
+    Get daily report of top papers for a specific date, same as GET /reports/daily/summary
     """
-    # 先查询日期是否已经成报告，如果是，直接返回，待实现
-    if not date:
-        date = datetime.now().date
-    logger.info(f"Starting to generate the daily report for date: {date}....")
-    # 首先查询当天的论文top 10
-
-    publication_list = (
-        db.query(Publication)
-        .filter(
-            Publication.paper_id != None,
-            Publication.publish_date >= date,
-            Publication.publish_date <= date,
-        )
-        .offset(0)
-        .limit(10)
-        .all()
-    )
-    if not publication_list:
-        return StandardResponse(
-            success=False, message="No papers found for this date", data={}
-        )
-    logger.info(f"query table Publication and found {len(publication_list)} records")
-    return_data = []
-    for publication in publication_list:
-        # TODO: 未来会改成，待把作者信息清洗后，就不需要再查询ArxivPaper
-        arxiv_paper = (
-            db.query(ArxivPaper)
-            .filter(ArxivPaper.arxiv_id == publication.paper_id)
-            .first()
-        )
-        item_data = {
-            "paper_id": publication.paper_id,
-            "publish_date": publication.publish_date,
-            "title": publication.title,
-            "pdf_url": publication.pdf_url,
-            "abstract": publication.abstract,
-            "author": arxiv_paper.authors,
-            "conclusion": publication.conclusion,
-            "traige_qa": publication.triage_qa,
-            "scores": (
-                publication.scores
-                if publication.scores
-                else "{'review_status':'pending','error_message':'not processed yet'}"
-            ),
-            "weighted_score": (
-                publication.scores.weighted_score if publication.scores else 0
-            ),
-        }
-        return_data.append(item_data)
-
-    # 默认把分数最高的放前面，然后按照日期来排序， TODO: 需要支持更多的方式
-    sorted_data = sorted(
-        return_data,
-        key=lambda x: (x["weighted_score"], x["publish_date"]),
-        reverse=True,
-    )
-
-    paper_today_response = sorted_data[:10]  # TODO, 去掉限制
-    total_count = len(paper_today_response)
-    logger.info(f"get the daily paper recommend: {str(paper_today_response)}")
-    # paper_list = paper_today_response.get('data').get('papers')
-    # count = paper_today_response.get('data').get('count')
-
-    logger.info(f"get the daily paper recommend: {str(paper_today_response)[:500]}")
-    logger.info(f"Calling AI to get the daily report....")
-    arxiv_review = ReviewArxivPaper()
-    report = arxiv_review.get_ai_daily_report(
-        report_day=date, top_k=total_count, context=str(paper_today_response)
-    )
-    return StandardResponse(
-        success=True,
-        message=f"Daily report generated for {date}",
-        data=report,
-    )
+    return await get_daily_summary(request, response, date, refresh)
 
 
 @router.post("/papers/{paper_id}/review", response_model=StandardResponse)
@@ -447,7 +387,8 @@ async def review_paper(db: db_dependency, paper_id: str):
             logger.error(f"Paper with ID {paper_id} not found")
             return StandardResponse(success=False, message=f"Paper not found", data={})
         arxiv_review = ReviewArxivPaper()
-        score = arxiv_review.process(paper)
+        # process() blocks on LLM calls and PDF downloads, keep it off the event loop
+        score = await asyncio.to_thread(arxiv_review.process, paper)
         if not score:
             logger.error(f"Failed to process paper with ID {paper_id}")
             return StandardResponse(
@@ -572,6 +513,7 @@ async def execute_task(task_id: int):
         if result.get("data") and result.get("data").get("papers"):
             papers_count = 0
             duplicate_count = 0
+            prefetch_items = []
             total_count = len(result.get("data").get("papers"))
             logger.info(f"共找到 {total_count} 篇论文")
             for paper_data in result.get("data").get("papers"):
@@ -610,8 +552,15 @@ async def execute_task(task_id: int):
                     )
                     db.add(new_paper)
                     papers_count += 1
+                    prefetch_items.append(PrefetchItem.from_paper(paper_data))
 
             db.commit()  # 提交所有更改
+            if PDF_PREFETCH_ENABLED:
+                # 新论文入库后立即在后台预取 PDF
+                pdf_prefetcher.schedule(prefetch_items)
+                execution.log = append_log(
+                    execution.log, f"已开始预取 {len(prefetch_items)} 篇论文的 PDF"
+                )
             execution.log = append_log(
                 execution.log,
                 f"成功保存 {papers_count} 篇论文到数据库, 跳过 {duplicate_count} 篇重复论文",
@@ -690,8 +639,163 @@ def crawl_arxiv(task: CrawlerTask):
         return {"status": "error", "message": str(e), "data": None}
 
 
+def build_citation_graph(task: CrawlerTask):
+    """
+    Backend task function to parse references and update the citation graph
+
+    Args:
+        paper_ids (list): Optional, publications to rebuild; defaults to publications without citations
+    """
+    try:
+        logger.info("构建引用图, task_id=%s", task.id)
+        stats = citation_graph_builder.build(
+            paper_ids=(task.parameters or {}).get("paper_ids"),
+            reference_loader=ReviewArxivPaper().load_reference_text,
+        )
+        return {
+            "status": "success",
+            "message": "Citation graph updated successfully",
+            "data": stats,
+        }
+    except Exception as e:
+        logger.error(f"Error building citation graph: {str(e)}")
+        return {"status": "error", "message": str(e), "data": None}
+
+
+def build_chunk_index(task: CrawlerTask):
+    """
+    Backend task function to split publications into overlapping chunks for retrieval
+
+    Args:
+        limit (int): Maximum number of publications without chunks to process
+    """
+    db = SyncSessionLocal()
+    try:
+        logger.info("切分论文片段, task_id=%s", task.id)
+        limit = (task.parameters or {}).get("limit", 200)
+        has_chunks = select(PaperChunk.id).where(
+            PaperChunk.paper_id == Publication.paper_id
+        )
+        # 没有全文的论文（初筛拒绝、PDF 下载失败）切不出片段，不选，否则每次都会被重新选中
+        publications = (
+            db.query(Publication)
+            .options(joinedload(Publication.content))
+            .filter(
+                ~has_chunks.exists(),
+                Publication.content.has(PublicationContent.content_length > 0),
+            )
+            .order_by(Publication.paper_id)
+            .limit(limit)
+            .all()
+        )
+        arxiv_review = ReviewArxivPaper()
+        chunk_count = sum(
+            arxiv_review.index_paper_chunks(publication) for publication in publications
+        )
+        return {
+            "status": "success",
+            "message": "Chunk index updated successfully",
+            "data": {"papers": len(publications), "chunks": chunk_count},
+        }
+    except Exception as e:
+        logger.error(f"Error building chunk index: {str(e)}")
+        return {"status": "error", "message": str(e), "data": None}
+    finally:
+        db.close()
+
+
+def generate_daily_report(task: CrawlerTask):
+    """
+    Backend task function to generate the daily report, regenerated only when the top papers change
+
+    Args:
+        date (str): Optional, report date (yyyy-mm-dd), defaults to today
+        days (int): Optional, also refresh the reports of the previous days
+    """
+    try:
+        parameters = task.parameters or {}
+        report_date = (
+            date.fromisoformat(parameters["date"])
+            if parameters.get("date")
+            else datetime.now().date()
+        )
+        logger.info("生成每日报告, task_id=%s, date=%s", task.id, report_date)
+        generated, failed = [], []
+        for offset in range(max(1, parameters.get("days", 1))):
+            day = report_date - timedelta(days=offset)
+            try:
+                if daily_report_builder.build(day):
+                    generated.append(str(day))
+            except DailyReportError as e:
+                logger.error(str(e))
+                failed.append(str(day))
+        return {
+            "status": "error" if failed and not generated else "success",
+            "message": (
+                f"Failed to generate the daily report for {', '.join(failed)}"
+                if failed
+                else "Daily report generated successfully"
+            ),
+            "data": {"dates": generated, "failed": failed},
+        }
+    except Exception as e:
+        logger.error(f"Error generating daily report: {str(e)}")
+        return {"status": "error", "message": str(e), "data": None}
+
+
+def build_embedding_index(task: CrawlerTask):
+    """
+    Backend task function to embed publication titles and abstracts for semantic search
+
+    Args:
+        limit (int): Optional, maximum number of publications to embed
+    """
+    try:
+        logger.info("向量化论文摘要, task_id=%s", task.id)
+        count = semantic_search_index.index_pending(
+            limit=(task.parameters or {}).get("limit")
+        )
+        return {
+            "status": "success",
+            "message": "Embedding index updated successfully",
+            "data": {"papers": count},
+        }
+    except Exception as e:
+        logger.error(f"Error building embedding index: {str(e)}")
+        return {"status": "error", "message": str(e), "data": None}
+
+
+def build_facet_rollups(task: CrawlerTask):
+    """
+    Backend task function to rebuild the rollup tables behind the facets endpoint
+
+    Args:
+        dates (list): Optional, publish dates (yyyy-mm-dd) to recompute; defaults to all dates
+    """
+    try:
+        logger.info("重建分面聚合表, task_id=%s", task.id)
+        dates = (task.parameters or {}).get("dates")
+        if dates:
+            count = publication_facets.refresh(date.fromisoformat(d) for d in dates)
+        else:
+            count = publication_facets.rebuild()
+        return {
+            "status": "success",
+            "message": "Facet rollups rebuilt successfully",
+            "data": {"dates": count},
+        }
+    except Exception as e:
+        logger.error(f"Error building facet rollups: {str(e)}")
+        return {"status": "error", "message": str(e), "data": None}
+
+
 # 构建函数映射字典，键为任务名称，值为对应的函数对象
 task_function_mapping = {
     "crawl_arxiv": crawl_arxiv,
+    "build_citation_graph": build_citation_graph,
+    "build_chunk_index": build_chunk_index,
+    "generate_daily_report": generate_daily_report,
+    "build_embedding_index": build_embedding_index,
+    "build_facet_rollups": build_facet_rollups,
     # 可以在这里添加更多的任务函数
 }
@@ -1,13 +1,32 @@
+import asyncio
 from datetime import date, datetime
-from typing import Annotated, Optional
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Query
-from sqlalchemy import select, desc, asc
+from sqlalchemy import func, select, desc
+from sqlalchemy.orm import contains_eager
 
+from api.conditional import latest, make_etag, not_modified, set_validators, version_parts
+from api.pagination import decode_cursor, encode_cursor, keyset_filter, keyset_order
+from core.export import EXPORT_FIELDS, EXPORT_FORMATS, stream_export
+from core.facets import DATE_BUCKETS, FACET_DIMENSIONS, FacetFilters, publication_facets
+from core.full_text_search import search_statement, search_terms
+from core.paper_chunks import PaperChunkStore, rank_chunks
+from core.query_cache import column_values, query_cache
+from core.semantic_search import SemanticSearchUnavailable, semantic_search_index
+from core.token_budget import section_base_name
 from database import get_db
-from models.tasks import ArxivPaper, PaperScores, Publication, StandardResponse
+from models.tasks import (
+    ArxivPaper,
+    Citation,
+    PaperChunk,
+    PaperScores,
+    Publication,
+    StandardResponse,
+)
 
 router = APIRouter(prefix="/publications", tags=["publications"])
 
@@ -19,15 +38,392 @@ logger = logging.getLogger(__name__)
 db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 
+# Fields that can be requested from the list endpoint with ?fields=, mapped to the columns
+# they are read from. Only the requested columns are selected, so heavy text columns
+# (conclusion, triage_qa, ...) are never loaded unless a client asks for them.
+PUBLICATION_LIST_FIELDS = {
+    "publication_id": Publication.paper_id,
+    "publish_date": Publication.publish_date,
+    "title": Publication.title,
+    "abstract": Publication.abstract,
+    "weighted_score": Publication.weighted_score,
+    "pdf_url": Publication.pdf_url,
+    "tldr": Publication.tldr,
+    "keywords": Publication.keywords,
+    "research_topics": Publication.research_topics,
+    "citation_count": Publication.citation_count,
+    "conclusion": Publication.conclusion,
+    "traige_qa": Publication.triage_qa,
+    "recommend": PaperScores.recommend,
+    "review_status": PaperScores.review_status,
+    "author": ArxivPaper.authors,
+}
+# Card fields returned when ?fields= is not given
+DEFAULT_LIST_FIELDS = [
+    "publication_id",
+    "publish_date",
+    "title",
+    "abstract",
+    "weighted_score",
+]
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Parse a comma-separated ?fields= value, keeping the order and dropping duplicates
+    """
+    if not fields:
+        return DEFAULT_LIST_FIELDS
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in PUBLICATION_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. "
+            f"Available fields: {', '.join(PUBLICATION_LIST_FIELDS)}",
+        )
+    return requested or DEFAULT_LIST_FIELDS
+
+
+def join_for_fields(query, selected_fields: List[str]):
+    """
+    Outer join the tables that the requested fields are read from
+    """
+    if {"recommend", "review_status"} & set(selected_fields):
+        query = query.outerjoin(
+            PaperScores, Publication.paper_id == PaperScores.paper_id
+        )
+    if "author" in selected_fields:
+        query = query.outerjoin(ArxivPaper, ArxivPaper.arxiv_id == Publication.paper_id)
+    return query
+
+
+# Sort fields supported by the list endpoint, each paired with paper_id as a tiebreaker
+# so that the keyset is unique (see api/pagination.py)
+PUBLICATION_SORT_KEYS = {
+    "publish_date": Publication.publish_date,
+    "weighted_score": Publication.weighted_score,
+}
+
+
+@router.get("/search", response_model=StandardResponse)
+async def search_publications(
+    db: db_dependency,
+    q: str = Query(
+        ...,
+        min_length=1,
+        description="Keywords to search for in title, abstract, conclusion and research topics",
+    ),
+    start_date: Optional[date] = Query(
+        None, description="Start date to filter by (yyyy-mm-dd)"
+    ),
+    end_date: Optional[date] = Query(
+        None, description="End date to filter by (yyyy-mm-dd)"
+    ),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        10, ge=1, le=100, description="Maximum number of records to return"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, defaults to "
+        + ",".join(DEFAULT_LIST_FIELDS),
+    ),
+):
+    """
+    Full-text search over publications, most relevant first.
+    Each result carries a relevance rank (higher is more relevant)
+    """
+    selected_fields = parse_fields(fields)
+    if not search_terms(q):
+        return StandardResponse(
+            success=True, message="Retrieved 0 publications", data={"publications": []}
+        )
+
+    # Served from the full-text index: tsvector + GIN on PostgreSQL, FTS5 on SQLite
+    query = search_statement(
+        db.bind.dialect.name,
+        q,
+        [PUBLICATION_LIST_FIELDS[name].label(name) for name in selected_fields],
+    )
+    query = join_for_fields(query, selected_fields)
+    if start_date:
+        query = query.filter(Publication.publish_date >= start_date)
+    if end_date:
+        query = query.filter(Publication.publish_date <= end_date)
+    query = query.offset(skip).limit(limit)
+
+    result = await db.execute(query)
+    publications_data = [
+        {**{name: row._mapping[name] for name in selected_fields}, "rank": row.rank}
+        for row in result
+    ]
+
+    return StandardResponse(
+        success=True,
+        message=f"Retrieved {len(publications_data)} publications",
+        data={"publications": publications_data},
+    )
+
+
+async def publications_for_hits(db, hits, selected_fields: List[str]) -> List[dict]:
+    """
+    Load the requested fields of ranked (paper_id, similarity) hits, keeping the hit order
+    """
+    if not hits:
+        return []
+    query = (
+        select(
+            *[PUBLICATION_LIST_FIELDS[name].label(name) for name in selected_fields],
+            Publication.paper_id.label("_paper_id"),
+        )
+        .select_from(Publication)
+        .filter(Publication.paper_id.in_([paper_id for paper_id, _ in hits]))
+    )
+    query = join_for_fields(query, selected_fields)
+    rows = {row._paper_id: row for row in await db.execute(query)}
+    return [
+        {
+            **{name: rows[paper_id]._mapping[name] for name in selected_fields},
+            "similarity": similarity,
+        }
+        for paper_id, similarity in hits
+        if paper_id in rows
+    ]
+
+
+@router.get("/semantic-search", response_model=StandardResponse)
+async def semantic_search_publications(
+    db: db_dependency,
+    q: str = Query(
+        ..., min_length=1, description="A description of the idea to find papers for"
+    ),
+    top_k: int = Query(10, ge=1, le=100, description="Maximum number of results"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, defaults to "
+        + ",".join(DEFAULT_LIST_FIELDS),
+    ),
+):
+    """
+    Semantic search over publication titles and abstracts, most similar first.
+    Each result carries a cosine similarity (higher is more similar)
+    """
+    selected_fields = parse_fields(fields)
+    try:
+        # Embedding the query and the ANN lookup are CPU/blocking work
+        hits = await asyncio.to_thread(semantic_search_index.search, q, top_k)
+    except SemanticSearchUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    publications_data = await publications_for_hits(db, hits, selected_fields)
+
+    return StandardResponse(
+        success=True,
+        message=f"Retrieved {len(publications_data)} publications",
+        data={"publications": publications_data},
+    )
+
+
+@router.get("/facets", response_model=StandardResponse)
+async def get_publication_facets(
+    db: db_dependency,
+    start_date: Optional[date] = Query(
+        None, description="Start date to filter by (yyyy-mm-dd)"
+    ),
+    end_date: Optional[date] = Query(
+        None, description="End date to filter by (yyyy-mm-dd)"
+    ),
+    category: Optional[str] = Query(
+        None, description="Comma-separated primary categories to filter by"
+    ),
+    affiliation: Optional[str] = Query(None, description="Author affiliation to filter by"),
+    recommend: Optional[bool] = Query(None, description="Recommend flag to filter by"),
+    min_score: Optional[float] = Query(
+        None, ge=0, le=10, description="Minimum weighted score (whole-point buckets)"
+    ),
+    max_score: Optional[float] = Query(
+        None, ge=0, le=10, description="Maximum weighted score (whole-point buckets)"
+    ),
+    facets: Optional[str] = Query(
+        None,
+        description="Comma-separated facets to compute, defaults to "
+        + ",".join(FACET_DIMENSIONS),
+    ),
+    date_bucket: str = Query("day", description="Date facet bucket: 'day', 'week' or 'month'"),
+    affiliation_limit: int = Query(
+        20, ge=1, le=200, description="Maximum number of affiliations to return"
+    ),
+):
+    """
+    Publication counts by primary category, affiliation, publish date, recommend flag
+    and score bucket. All filters can be combined; counts come from rollup tables
+    """
+    requested = (
+        list(dict.fromkeys(f.strip() for f in facets.split(",") if f.strip()))
+        if facets
+        else list(FACET_DIMENSIONS)
+    )
+    unknown = [f for f in requested if f not in FACET_DIMENSIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown facets: {', '.join(unknown)}. "
+            f"Available facets: {', '.join(FACET_DIMENSIONS)}",
+        )
+    if date_bucket not in DATE_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"date_bucket must be one of: {', '.join(DATE_BUCKETS)}",
+        )
+    filters = FacetFilters(
+        start_date=start_date,
+        end_date=end_date,
+        categories=[c.strip() for c in (category or "").split(",") if c.strip()],
+        affiliation=affiliation,
+        recommend=recommend,
+        min_score=min_score,
+        max_score=max_score,
+    )
+
+    # Dropped from the query cache once the rollups of a date in the range are refreshed
+    cache_key = (
+        "facets",
+        filters.model_dump_json(),
+        tuple(requested),
+        date_bucket,
+        affiliation_limit,
+    )
+    facets_data = query_cache.get(cache_key)
+    if facets_data is None:
+        total = (await db.execute(publication_facets.total_statement(filters))).scalar()
+        facet_counts = {}
+        for dimension in requested:
+            statement = publication_facets.facet_statement(
+                dimension,
+                filters,
+                limit=affiliation_limit if dimension == "affiliation" else None,
+            )
+            rows = (await db.execute(statement)).all()
+            facet_counts[dimension] = publication_facets.format_facet(
+                dimension, rows, date_bucket
+            )
+        facets_data = {"total": int(total), "facets": facet_counts}
+        query_cache.put_listing(
+            cache_key, start_date or date.min, end_date or date.max, facets_data
+        )
+
+    return StandardResponse(
+        success=True,
+        message="Publication facets retrieved successfully",
+        data=facets_data,
+    )
+
+
+@router.get("/export")
+async def export_publications(
+    format: str = Query(
+        "parquet", description="Output format: 'parquet' or 'arrow' (IPC stream)"
+    ),
+    start_date: Optional[date] = Query(
+        None, description="Start date to filter by (yyyy-mm-dd)"
+    ),
+    end_date: Optional[date] = Query(
+        None, description="End date to filter by (yyyy-mm-dd)"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to export, defaults to all: "
+        + ",".join(EXPORT_FIELDS),
+    ),
+):
+    """
+    Stream publications with their scores and arxiv metadata as a Parquet file or an
+    Arrow IPC stream, ordered by publish date. Rows are read with a server-side cursor,
+    so exporting the whole corpus runs in constant memory
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}",
+        )
+    selected_fields = (
+        list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        if fields
+        else list(EXPORT_FIELDS)
+    )
+    unknown = [f for f in selected_fields if f not in EXPORT_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. "
+            f"Available fields: {', '.join(EXPORT_FIELDS)}",
+        )
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_export(format, selected_fields, start_date, end_date),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="publications.{extension}"'},
+    )
+
+
+@router.get("/cache/stats", response_model=StandardResponse)
+async def get_query_cache_stats():
+    """
+    Hit rate and size of the in-process publication query cache
+    """
+    return StandardResponse(
+        success=True,
+        message="Query cache statistics retrieved successfully",
+        data=query_cache.stats(),
+    )
+
+
 @router.get("/{publication_id}", response_model=StandardResponse)
-async def get_publication(db: db_dependency, publication_id: str):
+async def get_publication(
+    db: db_dependency, publication_id: str, request: Request, response: Response
+):
     """
-    Retrieve a specific publication by ID with its evaluation scores
+    Retrieve a specific publication by ID with its evaluation scores.
+    Supports conditional GET with If-None-Match / If-Modified-Since
     """
+    # Served from the query cache without touching the database until a write to the
+    # publication, its scores or its arxiv metadata is committed (see core/query_cache.py)
+    cache_key = ("publication", publication_id)
+    entry = query_cache.get(cache_key)
+    if entry:
+        return_data, etag, last_modified = entry
+        cached = not_modified(request, etag, last_modified)
+        if cached:
+            return cached
+        set_validators(response, etag, last_modified)
+        return StandardResponse(
+            success=True,
+            message="Publication retrieved successfully",
+            data=return_data,
+        )
+
+    # Cheap version query first, so an unchanged publication is answered with 304
+    version_query = (
+        select(Publication.updated_at, PaperScores.updated_at, ArxivPaper.updated_at)
+        .select_from(Publication)
+        .outerjoin(PaperScores, Publication.paper_id == PaperScores.paper_id)
+        .outerjoin(ArxivPaper, ArxivPaper.arxiv_id == Publication.paper_id)
+        .filter(Publication.paper_id == publication_id)
+    )
+    version = (await db.execute(version_query)).first()
+    if version:
+        last_modified = latest(*version)
+        etag = make_etag(*version_parts(request, *version))
+        cached = not_modified(request, etag, last_modified)
+        if cached:
+            return cached
+        set_validators(response, etag, last_modified)
+
     # Use select statements for async queries
     publication_query = (
         select(Publication)
         .outerjoin(PaperScores, Publication.paper_id == PaperScores.paper_id)
+        .options(contains_eager(Publication.scores))
         .filter(Publication.paper_id == publication_id)
     )
 
@@ -40,9 +436,6 @@ async def get_publication(db: db_dependency, publication_id: str):
     arxiv_paper = arxiv_result.scalar_one_or_none()
 
     if publication and arxiv_paper:
-        # Avoid returning large raw text fields
-        publication.content_raw_text = ""
-        publication.reference_raw_text = ""
         return_data = {
             "publication_id": publication.paper_id,
             "publish_date": publication.publish_date,
@@ -53,14 +446,16 @@ async def get_publication(db: db_dependency, publication_id: str):
             "conclusion": publication.conclusion,
             "traige_qa": publication.triage_qa,
             "scores": (
-                publication.scores
+                column_values(publication.scores)
                 if publication.scores
                 else "{'review_status':'pending','error_message':'not processed yet'}"
             ),
-            "weighted_score": (
-                publication.scores.weighted_score if publication.scores else 0
-            ),
+            "weighted_score": publication.weighted_score,
         }
+        if version:
+            query_cache.put_detail(
+                cache_key, publication_id, (return_data, etag, last_modified)
+            )
 
         return StandardResponse(
             success=True,
@@ -71,16 +466,180 @@ async def get_publication(db: db_dependency, publication_id: str):
         return StandardResponse(success=False, message="Publication not found", data={})
 
 
+@router.get("/{publication_id}/citations", response_model=StandardResponse)
+async def get_publication_citations(
+    db: db_dependency,
+    publication_id: str,
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        20, ge=1, le=100, description="Maximum number of records to return"
+    ),
+):
+    """
+    Retrieve the publications that cite a specific publication
+    """
+    count_query = select(
+        func.count(func.distinct(Citation.citing_paper_id))
+    ).filter(Citation.cited_paper_id == publication_id)
+    total = (await db.execute(count_query)).scalar()
+
+    citing_query = (
+        select(Publication.paper_id, Publication.title, Publication.publish_date)
+        .join(Citation, Citation.citing_paper_id == Publication.paper_id)
+        .filter(Citation.cited_paper_id == publication_id)
+        .distinct()
+        .order_by(desc(Publication.publish_date), Publication.paper_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(citing_query)
+    citations_data = [
+        {
+            "publication_id": row.paper_id,
+            "title": row.title,
+            "publish_date": row.publish_date,
+        }
+        for row in result
+    ]
+
+    return StandardResponse(
+        success=True,
+        message=f"Retrieved {len(citations_data)} citing publications",
+        data={"total": total, "citations": citations_data},
+    )
+
+
+@router.get("/{publication_id}/references", response_model=StandardResponse)
+async def get_publication_references(db: db_dependency, publication_id: str):
+    """
+    Retrieve the parsed references of a specific publication,
+    with the cited publication ID when it is in the database
+    """
+    references_query = (
+        select(Citation)
+        .filter(Citation.citing_paper_id == publication_id)
+        .order_by(Citation.position)
+    )
+    result = await db.execute(references_query)
+    references_data = [
+        {
+            "position": citation.position,
+            "cited_publication_id": citation.cited_paper_id,
+            "arxiv_id": citation.cited_arxiv_id,
+            "doi": citation.cited_doi,
+            "title": citation.cited_title,
+            "year": citation.cited_year,
+            "raw": citation.raw,
+        }
+        for citation in result.scalars()
+    ]
+
+    return StandardResponse(
+        success=True,
+        message=f"Retrieved {len(references_data)} references",
+        data={"references": references_data},
+    )
+
+
+@router.get("/{publication_id}/similar", response_model=StandardResponse)
+async def get_similar_publications(
+    db: db_dependency,
+    publication_id: str,
+    top_k: int = Query(10, ge=1, le=100, description="Maximum number of results"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, defaults to "
+        + ",".join(DEFAULT_LIST_FIELDS),
+    ),
+):
+    """
+    Retrieve the publications whose title and abstract are most similar to a specific publication
+    """
+    selected_fields = parse_fields(fields)
+    try:
+        hits = await asyncio.to_thread(
+            semantic_search_index.similar, publication_id, top_k
+        )
+    except SemanticSearchUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if hits is None:
+        return StandardResponse(
+            success=False, message="Publication has not been embedded yet", data={}
+        )
+    publications_data = await publications_for_hits(db, hits, selected_fields)
+
+    return StandardResponse(
+        success=True,
+        message=f"Retrieved {len(publications_data)} similar publications",
+        data={"publications": publications_data},
+    )
+
+
+@router.get("/{publication_id}/chunks", response_model=StandardResponse)
+async def search_publication_chunks(
+    db: db_dependency,
+    publication_id: str,
+    q: str = Query(..., min_length=1, description="Text to search for in the paper"),
+    top_k: int = Query(5, ge=1, le=50, description="Maximum number of chunks to return"),
+    include_references: bool = Query(
+        False, description="Whether to search the references section too"
+    ),
+):
+    """
+    Retrieve the chunks of a specific publication that are most relevant to a query
+    """
+    chunks_query = (
+        select(PaperChunk)
+        .filter(PaperChunk.paper_id == publication_id)
+        .order_by(PaperChunk.chunk_index)
+    )
+    result = await db.execute(chunks_query)
+    chunks = result.scalars().all()
+    if not include_references:
+        chunks = [
+            chunk
+            for chunk in chunks
+            if section_base_name(chunk.section) not in PaperChunkStore.EXCLUDED_SECTIONS
+        ]
+    chunks_data = [
+        {
+            "chunk_index": chunk.chunk_index,
+            "section": chunk.section,
+            "page": chunk.page,
+            "char_start": chunk.char_start,
+            "char_end": chunk.char_end,
+            "token_count": chunk.token_count,
+            "text": chunk.text,
+        }
+        for chunk in rank_chunks(chunks, q, top_k)
+    ]
+
+    return StandardResponse(
+        success=True,
+        message=f"Retrieved {len(chunks_data)} chunks",
+        data={"chunks": chunks_data},
+    )
+
+
 @router.get("", response_model=StandardResponse)
 async def get_publications(
     db: db_dependency,
+    request: Request,
+    response: Response,
     start_date: Optional[date] = Query(
         None, description="Start date to filter by (yyyy-mm-dd)"
     ),
     end_date: Optional[date] = Query(
         None, description="End date to filter by (yyyy-mm-dd)"
     ),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the previous page's next_cursor"
+    ),
+    skip: int = Query(
+        0,
+        ge=0,
+        description="Number of records to skip (deprecated, use cursor; ignored when cursor is set)",
+    ),
     limit: int = Query(
         10, ge=1, le=100, description="Maximum number of records to return"
     ),
@@ -89,70 +648,112 @@ async def get_publications(
         description="Field to sort by: 'publish_date' or 'weighted_score'",
     ),
     order: Optional[str] = Query("desc", description="Sort order: 'asc' or 'desc'"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, defaults to "
+        + ",".join(DEFAULT_LIST_FIELDS),
+    ),
 ):
     """
-    Retrieve publications from the database with pagination and filtering options
+    Retrieve publications from the database with keyset pagination and filtering options.
+    Pass the returned next_cursor to get the following page.
+    Supports conditional GET with If-None-Match / If-Modified-Since
     """
+    selected_fields = parse_fields(fields)
+    if sort_by not in PUBLICATION_SORT_KEYS:
+        sort_by = "publish_date"
+    descending = order != "asc"
+    order = "desc" if descending else "asc"
+    key_columns = [PUBLICATION_SORT_KEYS[sort_by], Publication.paper_id]
+
     if not start_date:
         start_date = datetime(1970, 1, 1).date()
 
     if not end_date:
         end_date = datetime.now().date()
 
-    # Build the query
+    # Version of the date range: any insert, delete or update (scores are synced onto
+    # publication.updated_at) changes the row count or the latest updated_at
+    date_filter = (
+        Publication.publish_date >= start_date,
+        Publication.publish_date <= end_date,
+    )
+    version_query = select(
+        func.count(), func.max(Publication.updated_at)
+    ).select_from(Publication)
+    if "author" in selected_fields:
+        # Authors come from arxivpaper, whose updates don't touch publication.updated_at
+        version_query = version_query.add_columns(
+            func.max(ArxivPaper.updated_at)
+        ).outerjoin(ArxivPaper, ArxivPaper.arxiv_id == Publication.paper_id)
+    version_query = version_query.filter(*date_filter)
+    # Cached pages are dropped when a publication dated inside the range is written
+    cache_key = ("publications", request.url.path, str(request.query_params))
+    entry = query_cache.get(cache_key)
+    if entry:
+        list_data, etag, last_modified = entry
+        cached = not_modified(request, etag, last_modified)
+        if cached:
+            return cached
+        set_validators(response, etag, last_modified)
+        return StandardResponse(
+            success=True,
+            message=f"Retrieved {len(list_data['publications'])} publications",
+            data=list_data,
+        )
+
+    row_count, *range_updated_at = (await db.execute(version_query)).one()
+    last_modified = latest(*range_updated_at)
+    etag = make_etag(*version_parts(request, row_count, *range_updated_at))
+    cached = not_modified(request, etag, last_modified)
+    if cached:
+        return cached
+    set_validators(response, etag, last_modified)
+
+    # Build the query, selecting only the requested columns plus the sort key
     query = (
-        select(Publication)
-        .outerjoin(PaperScores, Publication.paper_id == PaperScores.paper_id)
-        .filter(
-            Publication.publish_date >= start_date, Publication.publish_date <= end_date
+        select(
+            *[PUBLICATION_LIST_FIELDS[name].label(name) for name in selected_fields],
+            *[column.label(f"_key_{i}") for i, column in enumerate(key_columns)],
         )
+        .select_from(Publication)
+        .filter(*date_filter)
     )
+    query = join_for_fields(query, selected_fields)
 
-    # Apply sorting
-    if sort_by == "weighted_score":
-        if order == "desc":
-            query = query.order_by(desc(PaperScores.weighted_score))
-        else:
-            query = query.order_by(asc(PaperScores.weighted_score))
-    else:  # Default to publish_date
-        if order == "desc":
-            query = query.order_by(desc(Publication.publish_date))
-        else:
-            query = query.order_by(asc(Publication.publish_date))
-
-    # Apply pagination
-    query = query.offset(skip).limit(limit)
+    # Apply keyset pagination
+    if cursor:
+        values = decode_cursor(cursor, sort_by, order)
+        if sort_by == "publish_date":
+            try:
+                values[0] = date.fromisoformat(values[0])
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(keyset_filter(key_columns, values, descending))
+    elif skip:
+        query = query.offset(skip)
+    query = query.order_by(*keyset_order(key_columns, descending)).limit(limit)
 
     # Execute the query
     result = await db.execute(query)
-    publications = result.scalars().all()
-
-    # Format the response
-    publications_data = []
-    for pub in publications:
-        # Avoid returning large raw text fields
-        pub.content_raw_text = ""
-        pub.reference_raw_text = ""
-
-        pub_data = {
-            "publication_id": pub.paper_id,
-            "publish_date": pub.publish_date,
-            "title": pub.title,
-            "pdf_url": pub.pdf_url,
-            "abstract": pub.abstract,
-            "conclusion": pub.conclusion,
-            "traige_qa": pub.triage_qa,
-            "scores": (
-                pub.scores
-                if pub.scores
-                else "{'review_status':'pending','error_message':'not processed yet'}"
-            ),
-            "weighted_score": (pub.scores.weighted_score if pub.scores else 0),
-        }
-        publications_data.append(pub_data)
+    rows = result.all()
+    publications_data = [
+        {name: row._mapping[name] for name in selected_fields} for row in rows
+    ]
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(
+            sort_by, order, [last[f"_key_{i}"] for i in range(len(key_columns))]
+        )
+
+    list_data = {"publications": publications_data, "next_cursor": next_cursor}
+    query_cache.put_listing(
+        cache_key, start_date, end_date, (list_data, etag, last_modified)
+    )
 
     return StandardResponse(
         success=True,
         message=f"Retrieved {len(publications_data)} publications",
-        data={"publications": publications_data},
+        data=list_data,
     )
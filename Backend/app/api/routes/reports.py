@@ -1,12 +1,17 @@
+import asyncio
 from datetime import date, datetime
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import func, select, desc
+from sqlalchemy.orm import joinedload
 
+from api.conditional import latest, make_etag, not_modified, set_validators, version_parts
 from database import get_db
 from models.tasks import ArxivPaper, PaperScores, Publication, StandardResponse
+from core.daily_report import DailyReportError, daily_report_builder
+from core.query_cache import column_values, query_cache
 from core.review_arxiv_paper import ReviewArxivPaper
 
 import logging
@@ -22,26 +27,66 @@ db_dependency = Annotated[AsyncSession, Depends(get_db)]
 @router.get("/daily", response_model=StandardResponse)
 async def get_daily_report(
     db: db_dependency,
+    request: Request,
+    response: Response,
     date: Optional[date] = Query(
         None, description="Report date (yyyy-mm-dd). Defaults to today if not specified"
     ),
 ):
     """
-    Get daily report of top publications for a specific date
+    Get daily report of top publications for a specific date.
+    Supports conditional GET with If-None-Match / If-Modified-Since
     """
     if not date:
         date = datetime.now().date()
 
+    # Version of the day's publications (scores are synced onto publication.updated_at).
+    # Authors come from arxivpaper, whose updates don't touch publication.updated_at
+    version_query = (
+        select(
+            func.count(),
+            func.max(Publication.updated_at),
+            func.max(ArxivPaper.updated_at),
+        )
+        .select_from(Publication)
+        .outerjoin(ArxivPaper, ArxivPaper.arxiv_id == Publication.paper_id)
+        .filter(Publication.publish_date >= date, Publication.publish_date <= date)
+    )
+    # Dropped from the query cache when a publication of that day is written
+    cache_key = ("daily_report", request.url.path, str(request.query_params), date)
+    entry = query_cache.get(cache_key)
+    if entry:
+        report_data, etag, last_modified = entry
+        cached = not_modified(request, etag, last_modified)
+        if cached:
+            return cached
+        set_validators(response, etag, last_modified)
+        return StandardResponse(
+            success=True, message=f"Daily report for {date}", data=report_data
+        )
+
+    row_count, *day_updated_at = (await db.execute(version_query)).one()
+    last_modified = latest(*day_updated_at)
+    etag = make_etag(*version_parts(request, row_count, *day_updated_at))
+    cached = not_modified(request, etag, last_modified)
+    if cached:
+        return cached
+    set_validators(response, etag, last_modified)
+
     logger.info(f"Generating daily report for date: {date}")
 
-    # Get publications for the specified date
+    # Get publications for the specified date, with scores and arxiv metadata in the same query
     query = (
         select(Publication)
+        .options(joinedload(Publication.scores), joinedload(Publication.arxiv_paper))
         .filter(
             Publication.paper_id != None,
             Publication.publish_date >= date,
             Publication.publish_date <= date,
+            # Papers rejected at prescreen have no full review and are not ranked
+            ~Publication.scores.has(PaperScores.review_status == "prescreen_rejected"),
         )
+        .order_by(Publication.weighted_score.desc(), Publication.paper_id)
         .limit(10)
     )  # Top 10 publications for the day
 
@@ -58,12 +103,7 @@ async def get_daily_report(
     # Get enhanced publication data with scores
     publication_data = []
     for publication in publication_list:
-        arxiv_query = select(ArxivPaper).filter(
-            ArxivPaper.arxiv_id == publication.paper_id
-        )
-        arxiv_result = await db.execute(arxiv_query)
-        arxiv_paper = arxiv_result.scalar_one_or_none()
-
+        arxiv_paper = publication.arxiv_paper
         if not arxiv_paper:
             continue
 
@@ -77,13 +117,11 @@ async def get_daily_report(
             "conclusion": publication.conclusion,
             "traige_qa": publication.triage_qa,
             "scores": (
-                publication.scores
+                column_values(publication.scores)
                 if publication.scores
                 else "{'review_status':'pending','error_message':'not processed yet'}"
             ),
-            "weighted_score": (
-                publication.scores.weighted_score if publication.scores else 0
-            ),
+            "weighted_score": publication.weighted_score,
         }
         publication_data.append(publication_info)
 
@@ -94,8 +132,63 @@ async def get_daily_report(
         reverse=True,
     )
 
+    report_data = {"publications": sorted_publications}
+    query_cache.put_listing(cache_key, date, date, (report_data, etag, last_modified))
+
     return StandardResponse(
         success=True,
         message=f"Daily report for {date}",
-        data={"publications": sorted_publications},
+        data=report_data,
+    )
+
+
+@router.get("/daily/summary", response_model=StandardResponse)
+async def get_daily_summary(
+    request: Request,
+    response: Response,
+    date: Optional[date] = Query(
+        None, description="Report date (yyyy-mm-dd). Defaults to today if not specified"
+    ),
+    refresh: bool = Query(
+        False, description="Regenerate the report even if the top papers have not changed"
+    ),
+):
+    """
+    Get the AI-written daily report of the top papers for a specific date.
+    Reports are generated by the generate_daily_report task and after reviews finish,
+    so this normally reads the stored report; it is only generated here on a miss.
+    Supports conditional GET with If-None-Match / If-Modified-Since
+    """
+    if not date:
+        date = datetime.now().date()
+    # Serve the stored report when there is one
+    daily_report = (
+        None if refresh else await asyncio.to_thread(daily_report_builder.get, date)
+    )
+    if daily_report is None:
+        logger.info(f"Starting to generate the daily report for date: {date}....")
+        try:
+            daily_report = await asyncio.to_thread(
+                daily_report_builder.build, date, refresh
+            )
+        except DailyReportError as e:
+            return StandardResponse(success=False, message=str(e), data={})
+    if daily_report is None:
+        return StandardResponse(
+            success=False, message="No papers found for this date", data={}
+        )
+    # The report is only regenerated when the top-k changes, so its fingerprint
+    # and updated_at are its version
+    last_modified = latest(daily_report.updated_at)
+    etag = make_etag(
+        *version_parts(request, daily_report.fingerprint, daily_report.updated_at)
+    )
+    cached = not_modified(request, etag, last_modified)
+    if cached:
+        return cached
+    set_validators(response, etag, last_modified)
+    return StandardResponse(
+        success=True,
+        message=f"Daily report generated for {date}",
+        data=daily_report.report,
     )
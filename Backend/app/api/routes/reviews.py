@@ -1,12 +1,17 @@
-from typing import Annotated
+import asyncio
+from typing import Annotated, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from models.tasks import ArxivPaper, PaperScores, StandardResponse
+from core.citation_graph import citation_graph_builder
+from core.daily_report import daily_report_builder
 from core.review_arxiv_paper import ReviewArxivPaper
+from core.review_progress import format_sse, review_progress
 
 import logging
 
@@ -47,7 +52,8 @@ async def review_publication(db: db_dependency, publication_id: str):
 
     # Process the publication with AI review
     arxiv_review = ReviewArxivPaper()
-    score = arxiv_review.process(paper)
+    # process() blocks on LLM calls and PDF downloads, keep it off the event loop
+    score = await asyncio.to_thread(arxiv_review.process, paper)
 
     if not score:
         logger.error(f"Failed to generate review for publication {publication_id}")
@@ -90,7 +96,7 @@ async def review_publications_batch(db: db_dependency):
 
     # Process publications in batch
     arxiv_review = ReviewArxivPaper()
-    scores = arxiv_review.process_batch(unprocessed_papers)
+    scores = await asyncio.to_thread(arxiv_review.process_batch, unprocessed_papers)
 
     if not scores or len(scores) == 0:
         logger.error("Batch processing failed")
@@ -106,3 +112,138 @@ async def review_publications_batch(db: db_dependency):
         message=f"Successfully processed {len(scores)} publications",
         data={"scores": scores},
     )
+
+
+def run_review_job(job_id: str, papers: List[ArxivPaper]):
+    """
+    Run a review job in the background and publish its progress events
+    """
+    arxiv_review = ReviewArxivPaper(
+        progress_callback=review_progress.callback_for(job_id)
+    )
+    review_progress.publish(job_id, "job_started", total=len(papers))
+    try:
+        if len(papers) == 1:
+            scores = [arxiv_review.process(papers[0])]
+        else:
+            scores = arxiv_review.process_batch(papers)
+        reviewed = len([score for score in scores if score])
+        review_progress.publish(
+            job_id,
+            "job_completed",
+            reviewed=reviewed,
+            total=len(papers),
+            token_usage=arxiv_review.get_token_usage_summary(),
+        )
+    except Exception as e:
+        logger.exception(f"Review job {job_id} failed: {e}")
+        review_progress.publish(job_id, "job_failed", error=str(e))
+        return
+
+    # 评审入库后解析参考文献，更新引用图
+    try:
+        citation_graph_builder.build(
+            paper_ids=[paper.arxiv_id for paper in papers],
+            reference_loader=arxiv_review.load_reference_text,
+        )
+    except Exception as e:
+        logger.error(f"Failed to update citation graph for review job {job_id}: {e}")
+
+    # 分数有变化的日期重新生成每日报告（top-k 没变的日期不会调用 LLM）
+    try:
+        daily_report_builder.refresh_for_papers([paper.arxiv_id for paper in papers])
+    except Exception as e:
+        logger.error(f"Failed to refresh daily reports for review job {job_id}: {e}")
+
+
+@router.post("/jobs/publications/{publication_id}", response_model=StandardResponse)
+async def start_review_job(
+    db: db_dependency,
+    request: Request,
+    publication_id: str,
+    background_tasks: BackgroundTasks,
+):
+    """
+    Start an AI review for a specific publication in the background.
+    Progress can be followed at the returned events_url (GET .../reviews/jobs/{job_id}/events)
+    """
+    paper_query = select(ArxivPaper).filter(ArxivPaper.arxiv_id == publication_id)
+    paper_result = await db.execute(paper_query)
+    paper = paper_result.scalar_one_or_none()
+
+    if not paper:
+        logger.error(f"Publication {publication_id} not found")
+        return StandardResponse(success=False, message="Publication not found", data={})
+
+    job_id = review_progress.create_job("publication", [paper.arxiv_id])
+    background_tasks.add_task(run_review_job, job_id, [paper])
+    return StandardResponse(
+        success=True,
+        message="Publication review started",
+        data={
+            "events_url": str(
+                request.url_for("stream_review_job_events", job_id=job_id)
+            )
+        },
+        task_id=job_id,
+    )
+
+
+@router.post("/jobs/batch", response_model=StandardResponse)
+async def start_batch_review_job(
+    db: db_dependency, request: Request, background_tasks: BackgroundTasks
+):
+    """
+    Start AI reviews for all unprocessed publications in the background.
+    Progress can be followed at the returned events_url (GET .../reviews/jobs/{job_id}/events)
+    """
+    unprocessed_query = (
+        select(ArxivPaper)
+        .outerjoin(PaperScores, ArxivPaper.arxiv_id == PaperScores.paper_id)
+        .filter(PaperScores.paper_id.is_(None))
+        .order_by(desc(ArxivPaper.published))
+    )
+    unprocessed_result = await db.execute(unprocessed_query)
+    unprocessed_papers = unprocessed_result.scalars().all()
+
+    if not unprocessed_papers:
+        logger.info("No unprocessed publications found")
+        return StandardResponse(
+            success=True, message="No unprocessed publications found", data={}
+        )
+
+    job_id = review_progress.create_job(
+        "batch", [paper.arxiv_id for paper in unprocessed_papers]
+    )
+    background_tasks.add_task(run_review_job, job_id, list(unprocessed_papers))
+    return StandardResponse(
+        success=True,
+        message=f"Batch review started for {len(unprocessed_papers)} publications",
+        data={
+            "events_url": str(
+                request.url_for("stream_review_job_events", job_id=job_id)
+            )
+        },
+        task_id=job_id,
+    )
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_review_job_events(job_id: str):
+    """
+    Server-sent event stream of a review job: pdf_fetched, pdf_parsed, topic_summary,
+    triage, general_review, expert_review, final_score, batch_progress and job_completed.
+    Events that happened before the client connected are replayed first.
+    """
+    if not review_progress.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Review job not found")
+
+    async def event_stream():
+        async for payload in review_progress.subscribe(job_id):
+            yield format_sse(payload)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -23,3 +23,59 @@ def get_data_storage_dir():
     # 这里假设 config.py 在 Backend/app/config.py 中， data 文件夹在 Backend/data/ 目录下
     project_root = current_file.parents[1]
     return project_root / "data"
+
+
+# PDF 预取：爬取到新论文后提前下载 PDF，不超过磁盘预算（MB）
+PDF_PREFETCH_ENABLED = os.getenv("PDF_PREFETCH_ENABLED", "true").lower() == "true"
+PDF_PREFETCH_DISK_BUDGET_MB = int(os.getenv("PDF_PREFETCH_DISK_BUDGET_MB", "5120"))
+# 每次预取最多下载的论文数
+PDF_PREFETCH_MAX_PAPERS = int(os.getenv("PDF_PREFETCH_MAX_PAPERS", "200"))
+# 优先预取这些分类的论文（靠前的优先），其余分类按发布时间排在后面
+PDF_PREFETCH_PRIORITY_CATEGORIES = [
+    "cs.AI",
+    "cs.CL",
+    "cs.LG",
+    "cs.CV",
+    "cs.IR",
+    "cs.MA",
+]
+
+# PDF 文本抽取进程池的进程数，以及长论文按页段并行抽取的参数
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(os.cpu_count() or 2)))
+PDF_EXTRACTION_PARALLEL_MIN_PAGES = int(os.getenv("PDF_EXTRACTION_PARALLEL_MIN_PAGES", "64"))
+PDF_EXTRACTION_PAGES_PER_TASK = int(os.getenv("PDF_EXTRACTION_PAGES_PER_TASK", "32"))
+
+# 按需抽取：评审只抽取到 References 所在页为止，附录和参考文献在需要时再抽取
+PDF_LAZY_EXTRACTION = os.getenv("PDF_LAZY_EXTRACTION", "true").lower() == "true"
+
+# 参考文献解析进程池的进程数，以及每次构建引用图最多处理的论文数
+CITATION_PARSE_WORKERS = int(os.getenv("CITATION_PARSE_WORKERS", str(os.cpu_count() or 2)))
+CITATION_BUILD_BATCH_SIZE = int(os.getenv("CITATION_BUILD_BATCH_SIZE", "200"))
+
+# 追问时附带的论文相关片段的 token 预算（助手没有设置 max_input_tokens 时使用）
+CHUNK_EXCERPT_TOKENS = int(os.getenv("CHUNK_EXCERPT_TOKENS", "4000"))
+
+# 每日报告取当天分数最高的论文数
+DAILY_REPORT_TOP_K = int(os.getenv("DAILY_REPORT_TOP_K", "10"))
+
+# 论文详情/列表查询结果的进程内缓存：最多缓存的条目数，以及条目的最长存活时间（秒）
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "2048"))
+QUERY_CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+
+# 语义检索：用 CPU 上的 ONNX 句向量模型（目录里需要 model.onnx 和 vocab.txt，
+# 例如导出为 ONNX 的 sentence-transformers/all-MiniLM-L6-v2）向量化论文标题和摘要
+EMBEDDING_MODEL_DIR = os.getenv(
+    "EMBEDDING_MODEL_DIR", str(get_data_storage_dir() / "models" / "all-MiniLM-L6-v2")
+)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_MAX_TOKENS = int(os.getenv("EMBEDDING_MAX_TOKENS", "256"))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", str(os.cpu_count() or 2)))
+# 向量索引：默认是本地文件（Milvus Lite），也可以指向 Milvus 服务（http://host:19530）
+SEMANTIC_INDEX_URI = os.getenv(
+    "SEMANTIC_INDEX_URI", str(get_data_storage_dir() / "semantic_index.db")
+)
+# ANN 索引类型（仅对 Milvus 服务生效；本地文件模式的 Milvus Lite 只做 FLAT 暴力检索）
+SEMANTIC_INDEX_TYPE = os.getenv("SEMANTIC_INDEX_TYPE", "HNSW")
+
+# 批量导出时每批从数据库读取的行数（服务端游标的 yield_per，也是 Parquet 的 row group 大小）
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "10000"))
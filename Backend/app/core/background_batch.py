@@ -0,0 +1,44 @@
+import logging
+import threading
+from typing import Callable, Generic, Hashable, Iterable, Optional, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=Hashable)
+
+
+class BackgroundBatcher(Generic[T]):
+    """
+    把提交后的后续处理放到后台线程里合并执行，不阻塞调用方。
+
+    - add() 把键放进待处理集合；没有工作线程时启动一个，已经在运行的线程会在下一轮取走新加入的键；
+    - 工作线程每轮取走当前全部的键交给 process，直到集合为空才退出，所以同一时间段内的多次提交合并成一批；
+    - process 自己处理预期内的失败；漏出来的异常只记日志，不会让工作线程丢掉后面排队的键
+    """
+
+    def __init__(self, name: str, process: Callable[[Set[T]], object]):
+        self.name = name
+        self._process = process
+        self._pending: Set[T] = set()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def add(self, keys: Iterable[T]):
+        with self._lock:
+            self._pending.update(key for key in keys if key)
+            if not self._pending or (self._worker and self._worker.is_alive()):
+                return
+            self._worker = threading.Thread(target=self._drain, name=self.name, daemon=True)
+            self._worker.start()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                keys, self._pending = self._pending, set()
+                if not keys:
+                    self._worker = None
+                    return
+            try:
+                self._process(keys)
+            except Exception as e:
+                logger.error(f"Background batch {self.name} failed for {len(keys)} keys: {e}")
@@ -0,0 +1,238 @@
+from datetime import datetime, timezone
+import logging
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from config import CITATION_BUILD_BATCH_SIZE, CITATION_PARSE_WORKERS
+from core.reference_parser import ParsedReference, normalize_title, parse_references_bulk
+from database import SyncSessionLocal
+from models.tasks import ArxivPaper, Citation, Publication
+
+logger = logging.getLogger(__name__)
+
+# 库里的 arxiv_id 带版本号（比如 1504.01441v3），参考文献里一般不带；展开成这些版本号后走唯一索引精确匹配
+MAX_ARXIV_VERSION = 9
+# IN 查询每批的参数个数
+QUERY_CHUNK_SIZE = 500
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+
+
+def _chunks(values: List, size: int = QUERY_CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+class CitationGraphBuilder:
+    """
+    引用图构建：在进程池里批量解析论文的参考文献，把解析结果按 arXiv 编号、DOI、标题
+    匹配到本库的论文，写入 citation 边表，并更新被引论文的 citation_count。
+
+    "谁引用了 X" 和引用数因此都是 citation 表上的索引查询，不再需要扫描参考文献原文。
+    """
+
+    def __init__(self, max_workers: int, batch_size: int):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    def build(
+        self,
+        paper_ids: Optional[Iterable[str]] = None,
+        reference_loader: Optional[Callable] = None,
+    ) -> dict:
+        """
+        为指定论文构建引用边；不指定时按 paper_id 顺序处理还没有构建过的论文（最多 batch_size 篇），
+        没有解析出参考文献的论文也会记下构建时间，之后不再自动选中。
+        reference_loader(publication, pdf_sha256) 用于补全按需抽取时还没有抽取的参考文献，
+        通常是 ReviewArxivPaper().load_reference_text
+        """
+        db = SyncSessionLocal()
+        try:
+            query = db.query(Publication)
+            if paper_ids is not None:
+                query = query.filter(Publication.paper_id.in_(list(paper_ids)))
+            else:
+                has_citations = select(Citation.id).where(
+                    Citation.citing_paper_id == Publication.paper_id
+                )
+                query = (
+                    query.filter(
+                        Publication.citations_built_at.is_(None), ~has_citations.exists()
+                    )
+                    .order_by(Publication.paper_id)
+                    .limit(self.batch_size)
+                )
+            publications = query.all()
+            if not publications:
+                return {"papers": 0, "references": 0, "resolved": 0}
+
+            texts = self._load_reference_texts(db, publications, reference_loader)
+            parsed = parse_references_bulk(texts, max_workers=self.max_workers)
+            resolved = self._resolve(db, parsed)
+
+            citing_ids = [publication.paper_id for publication in publications]
+            # 重新构建时，旧边指向的论文也要重新计数；本批论文自己也可能已经被其他论文引用
+            touched = set(citing_ids)
+            for chunk in _chunks(citing_ids):
+                touched.update(
+                    cited_id
+                    for (cited_id,) in db.query(Citation.cited_paper_id).filter(
+                        Citation.citing_paper_id.in_(chunk),
+                        Citation.cited_paper_id.isnot(None),
+                    )
+                )
+                db.query(Citation).filter(Citation.citing_paper_id.in_(chunk)).delete(
+                    synchronize_session=False
+                )
+
+            edges = []
+            for citing_id, refs in parsed.items():
+                for ref in refs:
+                    cited_id = resolved.get((citing_id, ref.position))
+                    if cited_id:
+                        touched.add(cited_id)
+                    edges.append(
+                        Citation(
+                            citing_paper_id=citing_id,
+                            position=ref.position,
+                            cited_paper_id=cited_id,
+                            cited_arxiv_id=ref.arxiv_id,
+                            cited_doi=ref.doi,
+                            cited_title=ref.title[:500] if ref.title else None,
+                            cited_year=ref.year,
+                            raw=ref.raw,
+                        )
+                    )
+            db.bulk_save_objects(edges)
+            built_at = datetime.now(timezone.utc)
+            for publication in publications:
+                publication.citations_built_at = built_at
+            self._update_citation_counts(db, touched)
+            db.commit()
+
+            stats = {
+                "papers": len(publications),
+                "references": len(edges),
+                "resolved": len(resolved),
+            }
+            logger.info(f"Citation graph updated: {stats}")
+            return stats
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to build citation graph: {e}")
+            raise
+        finally:
+            db.close()
+
+    def _load_reference_texts(
+        self, db, publications: List[Publication], reference_loader: Optional[Callable]
+    ) -> Dict[str, str]:
+        texts = {}
+        missing = []
+        for publication in publications:
+            text = publication.reference_raw_text
+            if text:
+                texts[publication.paper_id] = text
+            else:
+                missing.append(publication)
+        if not missing or not reference_loader:
+            return texts
+
+        pdf_hashes = {}
+        for chunk in _chunks([publication.paper_id for publication in missing]):
+            pdf_hashes.update(
+                db.query(ArxivPaper.arxiv_id, ArxivPaper.pdf_sha256).filter(
+                    ArxivPaper.arxiv_id.in_(chunk)
+                )
+            )
+        for publication in missing:
+            try:
+                text = reference_loader(publication, pdf_hashes.get(publication.paper_id))
+            except Exception as e:
+                logger.warning(f"Failed to load references of {publication.paper_id}: {e}")
+                continue
+            if text:
+                texts[publication.paper_id] = text
+        return texts
+
+    def _resolve(
+        self, db, parsed: Dict[str, List[ParsedReference]]
+    ) -> Dict[Tuple[str, int], str]:
+        """
+        把参考文献匹配到本库论文，返回 {(citing_paper_id, position): cited_paper_id}。
+        依次用 arXiv 编号、DOI、标题匹配，都走索引；自引不计入
+        """
+        arxiv_ids = {ref.arxiv_id for refs in parsed.values() for ref in refs if ref.arxiv_id}
+        dois = {ref.doi for refs in parsed.values() for ref in refs if ref.doi}
+        titles = {
+            normalize_title(ref.title)
+            for refs in parsed.values()
+            for ref in refs
+            if ref.title
+        }
+
+        by_arxiv = {}
+        candidates = [
+            f"{arxiv_id}{suffix}"
+            for arxiv_id in arxiv_ids
+            for suffix in [""] + [f"v{v}" for v in range(1, MAX_ARXIV_VERSION + 1)]
+        ]
+        for chunk in _chunks(candidates):
+            for (arxiv_id,) in db.query(ArxivPaper.arxiv_id).filter(
+                ArxivPaper.arxiv_id.in_(chunk)
+            ):
+                base = _VERSION_SUFFIX.sub("", arxiv_id)
+                # 多个版本都在库里时取最新的
+                by_arxiv[base] = max(by_arxiv.get(base, arxiv_id), arxiv_id)
+
+        by_doi = {}
+        for chunk in _chunks(sorted(dois)):
+            for paper_id, doi in db.query(Publication.paper_id, Publication.doi).filter(
+                Publication.doi.in_(chunk)
+            ):
+                by_doi[doi.lower()] = paper_id
+
+        by_title = {}
+        for chunk in _chunks(sorted(titles)):
+            by_title.update(
+                (title, paper_id)
+                for paper_id, title in db.query(
+                    Publication.paper_id, Publication.title_normalized
+                ).filter(Publication.title_normalized.in_(chunk))
+            )
+
+        resolved = {}
+        for citing_id, refs in parsed.items():
+            for ref in refs:
+                cited_id = (
+                    by_arxiv.get(ref.arxiv_id)
+                    or by_doi.get(ref.doi)
+                    or by_title.get(normalize_title(ref.title))
+                )
+                if cited_id and cited_id != citing_id:
+                    resolved[(citing_id, ref.position)] = cited_id
+        return resolved
+
+    def _update_citation_counts(self, db, paper_ids: Iterable[str]):
+        """citation_count = 本库中引用该论文的不同论文数"""
+        paper_ids = sorted(paper_ids)
+        for chunk in _chunks(paper_ids):
+            counts = dict(
+                db.query(
+                    Citation.cited_paper_id,
+                    func.count(func.distinct(Citation.citing_paper_id)),
+                )
+                .filter(Citation.cited_paper_id.in_(chunk))
+                .group_by(Citation.cited_paper_id)
+            )
+            for publication in db.query(Publication).filter(
+                Publication.paper_id.in_(chunk)
+            ):
+                publication.citation_count = counts.get(publication.paper_id, 0)
+
+
+citation_graph_builder = CitationGraphBuilder(
+    max_workers=CITATION_PARSE_WORKERS, batch_size=CITATION_BUILD_BATCH_SIZE
+)
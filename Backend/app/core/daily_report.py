@@ -0,0 +1,163 @@
+from datetime import date
+import hashlib
+import json
+import logging
+from typing import Iterable, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
+
+from config import DAILY_REPORT_TOP_K
+from core.review_arxiv_paper import ReviewArxivPaper
+from database import SyncSessionLocal
+from models.tasks import DailyReport, PaperScores, Publication
+
+logger = logging.getLogger(__name__)
+
+
+class DailyReportError(Exception):
+    """当天有论文，但报告生成失败且没有可以返回的旧报告"""
+
+
+class DailyReportBuilder:
+    """
+    每日报告的生成和存取。
+
+    报告由定时任务（以及评审任务结束后）生成并保存在 daily_report 表里，接口直接读表，不再每次请求都调用 LLM。
+    当天 top-k 论文或它们的分数没有变化时（fingerprint 相同）不会重新生成
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+
+    def top_papers(self, db, report_date: date) -> List[dict]:
+        """当天分数最高的 top_k 篇论文，作为生成报告的上下文"""
+        publications = (
+            db.query(Publication)
+            .options(joinedload(Publication.scores), joinedload(Publication.arxiv_paper))
+            .filter(
+                Publication.publish_date == report_date,
+                # 预筛未通过的论文没有完整评审，不进入报告
+                ~Publication.scores.has(PaperScores.review_status == "prescreen_rejected"),
+            )
+            .order_by(Publication.weighted_score.desc(), Publication.paper_id)
+            .limit(self.top_k)
+            .all()
+        )
+        return [
+            {
+                "paper_id": publication.paper_id,
+                "publish_date": publication.publish_date,
+                "title": publication.title,
+                "pdf_url": publication.pdf_url,
+                "abstract": publication.abstract,
+                "author": (
+                    publication.arxiv_paper.authors if publication.arxiv_paper else None
+                ),
+                "conclusion": publication.conclusion,
+                "traige_qa": publication.triage_qa,
+                "scores": (
+                    publication.scores
+                    if publication.scores
+                    else "{'review_status':'pending','error_message':'not processed yet'}"
+                ),
+                "weighted_score": publication.weighted_score,
+            }
+            for publication in publications
+        ]
+
+    @staticmethod
+    def fingerprint(papers: List[dict]) -> str:
+        key = [[paper["paper_id"], paper["weighted_score"]] for paper in papers]
+        return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+
+    def get(self, report_date: date) -> Optional[DailyReport]:
+        db = SyncSessionLocal()
+        try:
+            return (
+                db.query(DailyReport)
+                .filter(DailyReport.report_date == report_date)
+                .first()
+            )
+        finally:
+            db.close()
+
+    def build(self, report_date: date, force: bool = False) -> Optional[DailyReport]:
+        """
+        生成（或刷新）某一天的报告。top-k 没有变化且 force=False 时直接返回已有报告；
+        当天没有论文时返回 None；LLM 调用失败时保留旧报告，没有旧报告时抛出 DailyReportError
+        """
+        db = SyncSessionLocal()
+        try:
+            papers = self.top_papers(db, report_date)
+            if not papers:
+                logger.info(f"No papers for the daily report of {report_date}")
+                return None
+            fingerprint = self.fingerprint(papers)
+            existing = (
+                db.query(DailyReport)
+                .filter(DailyReport.report_date == report_date)
+                .first()
+            )
+            if existing and existing.fingerprint == fingerprint and not force:
+                logger.info(f"Daily report of {report_date} is up to date")
+                return existing
+
+            logger.info(f"Calling AI to generate the daily report of {report_date}....")
+            report = ReviewArxivPaper().get_ai_daily_report(
+                report_day=report_date, top_k=len(papers), context=str(papers)
+            )
+            if report is None:
+                logger.error(f"Failed to generate the daily report of {report_date}")
+                if existing is None:
+                    raise DailyReportError(
+                        f"AI failed to generate the daily report of {report_date}"
+                    )
+                return existing
+
+            daily_report = existing or DailyReport(report_date=report_date)
+            daily_report.top_k = len(papers)
+            daily_report.fingerprint = fingerprint
+            daily_report.paper_ids = [paper["paper_id"] for paper in papers]
+            daily_report.report = report
+            db.add(daily_report)
+            db.commit()
+            db.refresh(daily_report)
+            return daily_report
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to save the daily report of {report_date}: {e}")
+            raise
+        finally:
+            db.close()
+
+    def refresh_for_papers(self, paper_ids: Iterable[str]) -> List[DailyReport]:
+        """评审结束后，刷新这些论文发布日期的报告（top-k 没变的日期不会调用 LLM）"""
+        db = SyncSessionLocal()
+        try:
+            report_dates = sorted(
+                {
+                    publish_date
+                    for (publish_date,) in db.query(Publication.publish_date)
+                    .filter(
+                        Publication.paper_id.in_(list(paper_ids)),
+                        Publication.publish_date.isnot(None),
+                    )
+                    .distinct()
+                }
+            )
+        finally:
+            db.close()
+        reports = []
+        for report_date in report_dates:
+            try:
+                report = self.build(report_date)
+            except DailyReportError as e:
+                logger.error(str(e))
+                continue
+            if report:
+                reports.append(report)
+        return reports
+
+
+daily_report_builder = DailyReportBuilder(top_k=DAILY_REPORT_TOP_K)
@@ -0,0 +1,269 @@
+"""
+论文、评分和 arxiv 元数据的批量导出（Parquet 或 Arrow IPC 流），供离线分析使用。
+
+数据库侧用服务端游标（yield_per）分批读取，每批转成一个 Arrow RecordBatch 写出后即丢弃，
+导出整个库的内存占用只和批大小有关。接口 GET /publications/export 和命令行共用这里的实现。
+
+在 Backend/app 目录下运行：python -m core.export -o papers.parquet [--start-date 2025-01-01] [--fields paper_id,title]
+"""
+
+import argparse
+import asyncio
+from datetime import date
+import io
+import json
+from typing import AsyncIterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import JSON, Boolean, Date, DateTime, Float, Integer, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import EXPORT_BATCH_SIZE
+from database import SessionLocal
+from models.tasks import ArxivPaper, PaperScores, Publication
+
+# 可以导出的列：列名 -> 来源列
+EXPORT_FIELDS = {
+    **{
+        name: getattr(Publication, name)
+        for name in (
+            "paper_id",
+            "title",
+            "publish_date",
+            "abstract",
+            "tldr",
+            "keywords",
+            "research_topics",
+            "conclusion",
+            "triage_qa",
+            "citation_count",
+            "weighted_score",
+            "doi",
+            "pdf_url",
+        )
+    },
+    **{
+        name: getattr(PaperScores, name)
+        for name in (
+            "innovation_score",
+            "performance_score",
+            "simplicity_score",
+            "reusability_score",
+            "authority_score",
+            "confidence_score",
+            "recommend",
+            "recommend_reason",
+            "who_should_read",
+            "review_status",
+            "ai_reviewer",
+        )
+    },
+    **{
+        name: getattr(ArxivPaper, name)
+        for name in ("authors", "primary_category", "categories", "published")
+    },
+}
+
+EXPORT_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+def _arrow_type(column) -> pa.DataType:
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    # 字符串和 JSON（序列化成 JSON 字符串）
+    return pa.string()
+
+
+def export_schema(fields: List[str]) -> pa.Schema:
+    return pa.schema([(name, _arrow_type(EXPORT_FIELDS[name])) for name in fields])
+
+
+def export_statement(
+    fields: List[str], start_date: Optional[date] = None, end_date: Optional[date] = None
+):
+    """按发布日期和 paper_id 排序的导出查询，只关联用到的表"""
+    columns = [EXPORT_FIELDS[name] for name in fields]
+    statement = select(*[column.label(name) for name, column in zip(fields, columns)])
+    statement = statement.select_from(Publication)
+    tables = {column.class_ for column in columns}
+    if PaperScores in tables:
+        statement = statement.outerjoin(
+            PaperScores, PaperScores.paper_id == Publication.paper_id
+        )
+    if ArxivPaper in tables:
+        statement = statement.outerjoin(
+            ArxivPaper, ArxivPaper.arxiv_id == Publication.paper_id
+        )
+    if start_date:
+        statement = statement.filter(Publication.publish_date >= start_date)
+    if end_date:
+        statement = statement.filter(Publication.publish_date <= end_date)
+    return statement.order_by(Publication.publish_date, Publication.paper_id)
+
+
+async def record_batches(
+    db: AsyncSession,
+    fields: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[pa.RecordBatch]:
+    """用服务端游标分批读取，每批 batch_size 行转成一个 RecordBatch"""
+    schema = export_schema(fields)
+    json_fields = [
+        i for i, name in enumerate(fields) if isinstance(EXPORT_FIELDS[name].type, JSON)
+    ]
+    result = await db.stream(
+        export_statement(fields, start_date, end_date).execution_options(
+            yield_per=batch_size
+        )
+    )
+    async for rows in result.partitions():
+        columns = [list(values) for values in zip(*rows)]
+        for i in json_fields:
+            columns[i] = [
+                None if value is None else json.dumps(value, ensure_ascii=False)
+                for value in columns[i]
+            ]
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+
+class ExportWriter:
+    """把 RecordBatch 逐批写成 Parquet（每批一个 row group）或 Arrow IPC 流"""
+
+    def __init__(self, sink, export_format: str, schema: pa.Schema):
+        if export_format == "parquet":
+            self._writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_stream(sink, schema)
+
+    def write(self, batch: pa.RecordBatch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+
+class ChunkSink(io.RawIOBase):
+    """只追加的输出流：写入的字节暂存起来，由 drain() 取走，用于边生成边发送 HTTP 响应"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_export(
+    export_format: str,
+    fields: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> AsyncIterator[bytes]:
+    """
+    导出文件的字节流（StreamingResponse 用）。使用自己的会话：流式响应发送时请求依赖的会话已经关闭
+    """
+    sink = ChunkSink()
+    writer = ExportWriter(sink, export_format, export_schema(fields))
+    async with SessionLocal() as db:
+        async for batch in record_batches(db, fields, start_date, end_date):
+            # 编码和压缩是 CPU 工作，放到线程里，不阻塞事件循环
+            await asyncio.to_thread(writer.write, batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    writer.close()
+    yield sink.drain()
+
+
+async def export_to_file(
+    path: str,
+    export_format: str,
+    fields: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> int:
+    """导出到文件，返回导出的行数"""
+    rows = 0
+    writer = ExportWriter(path, export_format, export_schema(fields))
+    try:
+        async with SessionLocal() as db:
+            async for batch in record_batches(db, fields, start_date, end_date):
+                writer.write(batch)
+                rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export publications with scores and arxiv metadata"
+    )
+    parser.add_argument("-o", "--output", required=True, help="Output file path")
+    parser.add_argument(
+        "--format",
+        choices=list(EXPORT_FORMATS),
+        help="Output format, inferred from the output file extension by default",
+    )
+    parser.add_argument("--start-date", type=date.fromisoformat, help="yyyy-mm-dd")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="yyyy-mm-dd")
+    parser.add_argument(
+        "--fields",
+        help="Comma-separated fields to export, defaults to all: "
+        + ",".join(EXPORT_FIELDS),
+    )
+    args = parser.parse_args()
+
+    export_format = args.format or (
+        "parquet" if args.output.endswith(".parquet") else "arrow"
+    )
+    fields = (
+        [f.strip() for f in args.fields.split(",") if f.strip()]
+        if args.fields
+        else list(EXPORT_FIELDS)
+    )
+    unknown = [f for f in fields if f not in EXPORT_FIELDS]
+    if unknown:
+        parser.error(f"Unknown fields: {', '.join(unknown)}")
+
+    rows = asyncio.run(
+        export_to_file(args.output, export_format, fields, args.start_date, args.end_date)
+    )
+    print(f"Exported {rows} publications to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
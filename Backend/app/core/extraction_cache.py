@@ -0,0 +1,159 @@
+from array import array
+import json
+import logging
+import os
+from pathlib import Path
+import struct
+import tempfile
+from typing import Dict, List, Optional
+import zlib
+
+from config import get_data_storage_dir
+from core.pdf_extraction import OFFSET_TYPECODE, PdfText
+
+logger = logging.getLogger(__name__)
+
+# 文本抽取、分行或者章节识别的逻辑有变化时加 1，旧版本的缓存自动失效
+PARSER_VERSION = 2
+_HEADER_SIZE = struct.Struct(">I")
+
+
+def build_line_spans(text: str) -> array:
+    """
+    计算非空行（strip 之后）在全文中的 [start, end) 位置，展开为 start0, end0, start1, end1 ...
+    与 [line.strip() for line in text.split("\\n") if line.strip()] 得到的行一一对应。
+    """
+    spans = array(OFFSET_TYPECODE)
+    position = 0
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped:
+            start = position + len(line) - len(line.lstrip())
+            spans.append(start)
+            spans.append(start + len(stripped))
+        position += len(line) + 1
+    return spans
+
+
+class ExtractionArtifacts:
+    """
+    一篇 PDF 的解析结果：全文、页偏移、非空行的位置，以及识别出的章节标题行号。
+    按需抽取时只包含 References 所在页及之前的内容，total_pages 记录 PDF 的总页数
+    """
+
+    def __init__(
+        self,
+        text: str,
+        page_offsets: array,
+        line_spans: array,
+        title_indices: Dict[str, int],
+        total_pages: int = None,
+    ):
+        self.text = text
+        self.page_offsets = page_offsets
+        self.line_spans = line_spans
+        self.title_indices = title_indices
+        self.total_pages = (
+            len(page_offsets) - 1 if total_pages is None else total_pages
+        )
+
+    @property
+    def lines(self) -> List[str]:
+        spans = self.line_spans
+        return [self.text[spans[i] : spans[i + 1]] for i in range(0, len(spans), 2)]
+
+    @property
+    def pdf_text(self) -> PdfText:
+        return PdfText(self.text, self.page_offsets, self.total_pages)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.pdf_text.is_complete
+
+    def to_bytes(self) -> bytes:
+        text_bytes = self.text.encode("utf-8")
+        page_bytes = self.page_offsets.tobytes()
+        span_bytes = self.line_spans.tobytes()
+        header = json.dumps(
+            {
+                "parser_version": PARSER_VERSION,
+                "title_indices": self.title_indices,
+                "total_pages": self.total_pages,
+                "text_bytes": len(text_bytes),
+                "page_offsets_bytes": len(page_bytes),
+                "line_spans_bytes": len(span_bytes),
+            }
+        ).encode("utf-8")
+        return (
+            _HEADER_SIZE.pack(len(header))
+            + header
+            + zlib.compress(text_bytes + page_bytes + span_bytes, 6)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ExtractionArtifacts":
+        (header_size,) = _HEADER_SIZE.unpack_from(data)
+        body_start = _HEADER_SIZE.size + header_size
+        header = json.loads(data[_HEADER_SIZE.size : body_start])
+        if header["parser_version"] != PARSER_VERSION:
+            raise ValueError(f"parser version {header['parser_version']} is outdated")
+        body = zlib.decompress(data[body_start:])
+        text_end = header["text_bytes"]
+        page_end = text_end + header["page_offsets_bytes"]
+        page_offsets = array(OFFSET_TYPECODE)
+        page_offsets.frombytes(body[text_end:page_end])
+        line_spans = array(OFFSET_TYPECODE)
+        line_spans.frombytes(body[page_end : page_end + header["line_spans_bytes"]])
+        return cls(
+            text=body[:text_end].decode("utf-8"),
+            page_offsets=page_offsets,
+            line_spans=line_spans,
+            title_indices=header["title_indices"],
+            total_pages=header["total_pages"],
+        )
+
+
+class ExtractionCache:
+    """
+    以 PDF 的 sha256 为键的解析结果缓存（内容寻址，同一个 PDF 无论来自哪个 arxiv_id 都只解析一次）。
+    文件路径为 {cache_dir}/{sha256[:2]}/{sha256}.v{PARSER_VERSION}.bin，文本和偏移数组用 zlib 压缩。
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, pdf_sha256: str) -> Path:
+        return (
+            self.cache_dir / pdf_sha256[:2] / f"{pdf_sha256}.v{PARSER_VERSION}.bin"
+        )
+
+    def get(self, pdf_sha256: Optional[str]) -> Optional[ExtractionArtifacts]:
+        if not pdf_sha256:
+            return None
+        path = self._path(pdf_sha256)
+        try:
+            with open(path, "rb") as f:
+                return ExtractionArtifacts.from_bytes(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zlib.error) as e:
+            logger.warning(f"Dropping unreadable extraction cache {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, pdf_sha256: Optional[str], artifacts: ExtractionArtifacts):
+        if not pdf_sha256:
+            return
+        path = self._path(pdf_sha256)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再 rename，并发的 review 线程不会读到写了一半的缓存
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(artifacts.to_bytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write extraction cache {path}: {e}")
+
+
+extraction_cache = ExtractionCache(get_data_storage_dir() / "extraction_cache")
@@ -0,0 +1,254 @@
+from collections import Counter
+from datetime import date, timedelta
+import logging
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from pydantic import BaseModel
+from sqlalchemy import Select, func, select
+
+from core.background_batch import BackgroundBatcher
+from core.query_cache import on_publications_committed, query_cache
+from database import SyncSessionLocal
+from models.tasks import (
+    ArxivPaper,
+    PaperScores,
+    Publication,
+    PublicationAffiliationRollup,
+    PublicationRollup,
+)
+
+logger = logging.getLogger(__name__)
+
+FACET_DIMENSIONS = ("primary_category", "affiliation", "date", "recommend", "score")
+DATE_BUCKETS = ("day", "week", "month")
+
+
+def score_bucket(weighted_score: Optional[float]) -> Optional[int]:
+    """分数直方图的区间：[n, n+1)，10 分并入 9 区间"""
+    if weighted_score is None:
+        return None
+    return min(max(int(math.floor(weighted_score)), 0), 9)
+
+
+def paper_affiliations(authors) -> Set[str]:
+    """从 ArxivPaper.authors（[{"name": ..., "affiliations": [...]}]）中取出去重后的作者单位"""
+    affiliations = set()
+    for author in authors or []:
+        if not isinstance(author, dict):
+            continue
+        for affiliation in author.get("affiliations") or []:
+            affiliation = " ".join(str(affiliation).split())[:255]
+            if affiliation:
+                affiliations.add(affiliation)
+    return affiliations
+
+
+def bucket_date(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+class FacetFilters(BaseModel):
+    """分面统计的过滤条件，可以任意组合"""
+
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    categories: List[str] = []
+    affiliation: Optional[str] = None
+    recommend: Optional[bool] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+
+
+class PublicationFacets:
+    """
+    论文分面统计（按主分类、作者单位、发布日期、是否推荐、分数区间计数）。
+
+    - 统计只对 publication_rollup / publication_affiliation_rollup 两张聚合表做 GROUP BY，不扫描论文表；
+    - 聚合表按发布日期增量维护：论文、评分或 arxiv 元数据的写入提交后，在后台线程里重算受影响日期的行，
+      重算完成后失效这些日期的查询缓存；build_facet_rollups 任务可以全量重建；
+    - 没有发布日期的论文不计入统计
+    """
+
+    # 全量重建时每次重算的日期数
+    DATES_PER_BATCH = 100
+
+    def __init__(self):
+        self._refresh_lock = threading.Lock()
+        self._scheduled = BackgroundBatcher("facet-rollup", self._refresh_scheduled)
+
+    def _aggregate(self, db, dates: List[date]):
+        papers, affiliations = Counter(), Counter()
+        rows = (
+            db.query(
+                Publication.publish_date,
+                ArxivPaper.primary_category,
+                PaperScores.recommend,
+                PaperScores.weighted_score,
+                ArxivPaper.authors,
+            )
+            .outerjoin(PaperScores, PaperScores.paper_id == Publication.paper_id)
+            .outerjoin(ArxivPaper, ArxivPaper.arxiv_id == Publication.paper_id)
+            .filter(Publication.publish_date.in_(dates))
+        )
+        for publish_date, category, recommend, weighted_score, authors in rows:
+            key = (publish_date, category, recommend, score_bucket(weighted_score))
+            papers[key] += 1
+            for affiliation in paper_affiliations(authors):
+                affiliations[(*key, affiliation)] += 1
+        return papers, affiliations
+
+    def refresh(self, dates: Iterable[date]) -> int:
+        """重算这些发布日期的聚合行，返回重算的日期数"""
+        dates = sorted({d for d in dates if d})
+        with self._refresh_lock:
+            db = SyncSessionLocal()
+            try:
+                for start in range(0, len(dates), self.DATES_PER_BATCH):
+                    batch = dates[start : start + self.DATES_PER_BATCH]
+                    papers, affiliations = self._aggregate(db, batch)
+                    for model in (PublicationRollup, PublicationAffiliationRollup):
+                        db.query(model).filter(model.publish_date.in_(batch)).delete(
+                            synchronize_session=False
+                        )
+                    db.add_all(
+                        PublicationRollup(
+                            publish_date=publish_date,
+                            primary_category=category,
+                            recommend=recommend,
+                            score_bucket=bucket,
+                            count=count,
+                        )
+                        for (publish_date, category, recommend, bucket), count in papers.items()
+                    )
+                    db.add_all(
+                        PublicationAffiliationRollup(
+                            publish_date=publish_date,
+                            primary_category=category,
+                            recommend=recommend,
+                            score_bucket=bucket,
+                            affiliation=affiliation,
+                            count=count,
+                        )
+                        for (
+                            publish_date,
+                            category,
+                            recommend,
+                            bucket,
+                            affiliation,
+                        ), count in affiliations.items()
+                    )
+                    db.commit()
+                    # 聚合表更新后，缓存的分面结果才会过期
+                    query_cache.invalidate([], batch)
+                return len(dates)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def rebuild(self) -> int:
+        """全量重建聚合表"""
+        db = SyncSessionLocal()
+        try:
+            dates = [
+                publish_date
+                for (publish_date,) in db.query(Publication.publish_date)
+                .filter(Publication.publish_date.isnot(None))
+                .distinct()
+            ]
+            stale = [
+                publish_date
+                for (publish_date,) in db.query(PublicationRollup.publish_date).distinct()
+            ]
+        finally:
+            db.close()
+        # 已经没有论文的日期也要重算，清掉残留的行
+        return self.refresh(set(dates) | set(stale))
+
+    def schedule(self, paper_ids: Set[str], dates: Set[date]):
+        """论文写入提交后调用：在后台线程里重算这些日期，同一时间段内的多次提交合并处理"""
+        self._scheduled.add(dates)
+
+    def _refresh_scheduled(self, dates: Set[date]):
+        try:
+            self.refresh(dates)
+        except Exception as e:
+            # 失败的日期会在下次写入或 build_facet_rollups 任务中重算
+            logger.error(f"Failed to refresh facet rollups for {len(dates)} dates: {e}")
+
+    @staticmethod
+    def _filtered(statement: Select, model, filters: FacetFilters) -> Select:
+        if filters.start_date:
+            statement = statement.filter(model.publish_date >= filters.start_date)
+        if filters.end_date:
+            statement = statement.filter(model.publish_date <= filters.end_date)
+        if filters.categories:
+            statement = statement.filter(model.primary_category.in_(filters.categories))
+        if filters.recommend is not None:
+            statement = statement.filter(model.recommend == filters.recommend)
+        if filters.min_score is not None:
+            statement = statement.filter(model.score_bucket >= score_bucket(filters.min_score))
+        if filters.max_score is not None:
+            statement = statement.filter(model.score_bucket <= score_bucket(filters.max_score))
+        if filters.affiliation:
+            statement = statement.filter(model.affiliation == filters.affiliation)
+        return statement
+
+    def _model(self, filters: FacetFilters, dimension: Optional[str] = None):
+        # 按作者单位过滤或统计时读单位聚合表（每篇论文在一个单位下只计一次）
+        if dimension == "affiliation" or filters.affiliation:
+            return PublicationAffiliationRollup
+        return PublicationRollup
+
+    def total_statement(self, filters: FacetFilters) -> Select:
+        model = self._model(filters)
+        return self._filtered(select(func.coalesce(func.sum(model.count), 0)), model, filters)
+
+    def facet_statement(
+        self, dimension: str, filters: FacetFilters, limit: Optional[int] = None
+    ) -> Select:
+        """某个分面的 (取值, 论文数) 统计语句"""
+        model = self._model(filters, dimension)
+        column = getattr(
+            model, {"date": "publish_date", "score": "score_bucket"}.get(dimension, dimension)
+        )
+        count = func.sum(model.count).label("count")
+        statement = self._filtered(
+            select(column.label("value"), count), model, filters
+        ).group_by(column)
+        if dimension in ("primary_category", "affiliation"):
+            statement = statement.order_by(count.desc(), column)
+        else:
+            statement = statement.order_by(column)
+        if limit:
+            statement = statement.limit(limit)
+        return statement
+
+    @staticmethod
+    def format_facet(dimension: str, rows, date_bucket: str = "day") -> List[Dict]:
+        if dimension == "date":
+            buckets: Dict[date, int] = {}
+            for value, count in rows:
+                key = bucket_date(value, date_bucket)
+                buckets[key] = buckets.get(key, 0) + int(count)
+            return [{"value": key, "count": count} for key, count in sorted(buckets.items())]
+        if dimension == "score":
+            return [
+                {
+                    "value": "unreviewed" if value is None else f"{value}-{value + 1}",
+                    "count": int(count),
+                }
+                for value, count in rows
+            ]
+        return [{"value": value, "count": int(count)} for value, count in rows]
+
+
+publication_facets = PublicationFacets()
+on_publications_committed(publication_facets.schedule)
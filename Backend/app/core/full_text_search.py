@@ -0,0 +1,76 @@
+import re
+from typing import Sequence
+
+from sqlalchemy import Select, column, func, literal, literal_column, or_, select, table
+
+from models.tasks import Publication
+
+# 查询词：字母数字串（FTS5 的 MATCH 语法里引号、括号、AND/OR 等都有特殊含义，这里只保留词本身）
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+# SQLite bm25() 的列权重，与 PostgreSQL setweight 的 A/B/C/D 对应：
+# title, research_topics, abstract, conclusion
+_FTS5_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_publication_fts = table("publication_fts", column("rowid"))
+
+
+def search_terms(query: str) -> list:
+    return _TERM.findall(query)
+
+
+def _fts5_match(query: str) -> str:
+    """所有词都要出现（AND），每个词加引号作为普通词处理"""
+    return " ".join(f'"{term}"' for term in search_terms(query))
+
+
+def search_statement(dialect_name: str, query: str, columns: Sequence) -> Select:
+    """
+    构造全文检索语句：选出 columns 和相关度 rank（越大越相关），按 rank 降序排序。
+
+    - postgresql：search_vector @@ websearch_to_tsquery，ts_rank_cd 排序，走 GIN 索引；
+    - sqlite：publication_fts MATCH，bm25 排序；
+    - 其他数据库没有全文索引，退化为 LIKE 匹配，按发布日期排序
+    """
+    if dialect_name == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", query)
+        search_vector = literal_column("publication.search_vector")
+        rank = func.ts_rank_cd(search_vector, tsquery).label("rank")
+        return (
+            select(*columns, rank)
+            .select_from(Publication)
+            .filter(search_vector.op("@@")(tsquery))
+            .order_by(rank.desc(), Publication.paper_id)
+        )
+
+    if dialect_name == "sqlite":
+        # bm25() 越小越相关，取负数后与 PostgreSQL 的 rank 方向一致
+        rank = (-func.bm25(literal_column("publication_fts"), *_FTS5_WEIGHTS)).label("rank")
+        return (
+            select(*columns, rank)
+            .select_from(Publication)
+            .join(_publication_fts, _publication_fts.c.rowid == Publication.id)
+            .filter(literal_column("publication_fts").op("MATCH")(_fts5_match(query)))
+            .order_by(rank.desc(), Publication.paper_id)
+        )
+
+    conditions = [
+        or_(
+            *[
+                field.ilike(f"%{term}%")
+                for field in (
+                    Publication.title,
+                    Publication.research_topics,
+                    Publication.abstract,
+                    Publication.conclusion,
+                )
+            ]
+        )
+        for term in search_terms(query)
+    ]
+    return (
+        select(*columns, literal(0.0).label("rank"))
+        .select_from(Publication)
+        .filter(*conditions)
+        .order_by(Publication.publish_date.desc(), Publication.paper_id)
+    )
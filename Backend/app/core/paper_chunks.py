@@ -0,0 +1,241 @@
+from collections import Counter
+import logging
+import math
+import re
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.extraction_cache import build_line_spans
+from core.pdf_extraction import PdfText
+from core.section_titles import SectionTitleMatcher
+from core.token_budget import TokenCounter, section_base_name
+from database import SyncSessionLocal
+from models.tasks import PaperChunk
+
+logger = logging.getLogger(__name__)
+
+# 检索时忽略的常见词
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the this "
+    "to was were what which with does do did paper we our they their".split()
+)
+_WORD = re.compile(r"[a-z0-9]+")
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [
+        word for word in _WORD.findall((text or "").lower()) if word not in _STOPWORDS
+    ]
+
+
+class ChunkSpan(BaseModel):
+    chunk_index: int
+    section: str
+    line_start: int
+    line_end: int
+    char_start: int
+    char_end: int
+    page: Optional[int] = None
+    token_count: int
+    text: str
+
+
+class PaperChunker:
+    """
+    按章节切分论文：章节内按 max_lines 行一个片段、相邻片段重叠 overlap_lines 行，片段不跨章节；
+    参考文献按 reference_block_size 行一块切分，不重叠。
+    """
+
+    def __init__(
+        self,
+        section_title_matcher: SectionTitleMatcher,
+        token_counter: TokenCounter,
+        max_lines: int,
+        overlap_lines: int,
+        reference_block_size: int,
+    ):
+        self.section_title_matcher = section_title_matcher
+        self.token_counter = token_counter
+        self.max_lines = max_lines
+        self.step = max(1, max_lines - overlap_lines)
+        self.reference_block_size = reference_block_size
+
+    def chunk(
+        self,
+        text: str,
+        line_spans=None,
+        title_indices: Dict[str, int] = None,
+        pdf_text: Optional[PdfText] = None,
+    ) -> List[ChunkSpan]:
+        """
+        line_spans/title_indices 来自解析缓存时直接使用，否则重新计算；
+        有 pdf_text 时记录每个片段开始所在的页码
+        """
+        if line_spans is None:
+            line_spans = build_line_spans(text or "")
+        lines = [
+            text[line_spans[i] : line_spans[i + 1]]
+            for i in range(0, len(line_spans), 2)
+        ]
+        if title_indices is None:
+            title_indices = self.section_title_matcher.detect(lines)
+
+        # 第一个标题之前的内容（标题、作者、机构）记为 front_matter，与 _get_section_chunks 一致
+        boundaries = sorted(title_indices.items(), key=lambda x: x[1])
+        first_title_index = boundaries[0][1] if boundaries else len(lines)
+        if first_title_index > 0:
+            boundaries.insert(0, ("front_matter", 0))
+
+        chunks = []
+        for i, (section, start) in enumerate(boundaries):
+            end = boundaries[i + 1][1] if i + 1 < len(boundaries) else len(lines)
+            if section_base_name(section) == "references":
+                size, step = self.reference_block_size, self.reference_block_size
+            else:
+                size, step = self.max_lines, self.step
+            window_start = start
+            while window_start < end:
+                window_end = min(window_start + size, end)
+                char_start = line_spans[2 * window_start]
+                chunk_text = "\n".join(lines[window_start:window_end])
+                chunks.append(
+                    ChunkSpan(
+                        chunk_index=len(chunks),
+                        section=section,
+                        line_start=window_start,
+                        line_end=window_end,
+                        char_start=char_start,
+                        char_end=line_spans[2 * window_end - 1],
+                        page=pdf_text.page_of(char_start) if pdf_text else None,
+                        token_count=self.token_counter.count(chunk_text),
+                        text=chunk_text,
+                    )
+                )
+                if window_end >= end:
+                    break
+                window_start += step
+        return chunks
+
+
+def rank_chunks(chunks: List, query: str, top_k: Optional[int]) -> List:
+    """
+    在一篇论文的片段里按 BM25 给查询打分，返回得分最高的 top_k 个片段（得分为 0 的不返回，top_k 为空时返回全部）。
+    chunks 可以是 PaperChunk 或 ChunkSpan
+    """
+    terms = set(tokenize(query))
+    if not terms or not chunks:
+        return []
+    term_counts = [Counter(tokenize(chunk.text)) for chunk in chunks]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average_length = (sum(lengths) / len(lengths)) or 1
+    document_frequency = {
+        term: sum(1 for counts in term_counts if term in counts) for term in terms
+    }
+    scored = []
+    for chunk, counts, length in zip(chunks, term_counts, lengths):
+        score = 0.0
+        for term in terms:
+            frequency = counts.get(term)
+            if not frequency:
+                continue
+            idf = math.log(
+                1 + (len(chunks) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5)
+            )
+            score += idf * frequency * (BM25_K1 + 1) / (
+                frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            )
+        if score > 0:
+            scored.append((score, chunk))
+    scored.sort(key=lambda x: (-x[0], x[1].chunk_index))
+    return [chunk for _, chunk in scored[:top_k]]
+
+
+def join_chunks(chunks: Iterable) -> str:
+    """按原文顺序拼接片段，重叠的行只保留一次，不相邻的片段之间用 [...] 隔开"""
+    parts = []
+    last_end = None
+    for chunk in sorted(chunks, key=lambda c: c.line_start):
+        lines = chunk.text.split("\n")
+        if last_end is not None and chunk.line_start < last_end:
+            lines = lines[last_end - chunk.line_start :]
+        elif last_end is not None and chunk.line_start > last_end:
+            parts.append("[...]")
+        parts.extend(lines)
+        last_end = max(last_end or 0, chunk.line_end)
+    return "\n".join(parts)
+
+
+class PaperChunkStore:
+    """
+    论文片段的存取和检索，片段存放在 paper_chunk 表里，按 paper_id 取出后在内存中排序
+    """
+
+    # 检索时默认不返回的章节
+    EXCLUDED_SECTIONS = {"references", "acknowledgments"}
+
+    def save(self, paper_id: str, chunks: List[ChunkSpan]):
+        """覆盖保存一篇论文的全部片段"""
+        db = SyncSessionLocal()
+        try:
+            db.query(PaperChunk).filter(PaperChunk.paper_id == paper_id).delete(
+                synchronize_session=False
+            )
+            db.bulk_save_objects(
+                [PaperChunk(paper_id=paper_id, **chunk.model_dump()) for chunk in chunks]
+            )
+            db.commit()
+            logger.info(f"Saved {len(chunks)} chunks of {paper_id}")
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to save chunks of {paper_id}: {e}")
+        finally:
+            db.close()
+
+    def load(self, paper_id: str) -> List[PaperChunk]:
+        db = SyncSessionLocal()
+        try:
+            return (
+                db.query(PaperChunk)
+                .filter(PaperChunk.paper_id == paper_id)
+                .order_by(PaperChunk.chunk_index)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def search(
+        self,
+        paper_id: str,
+        query: str,
+        top_k: Optional[int] = 5,
+        include_references: bool = False,
+    ) -> List[PaperChunk]:
+        chunks = self.load(paper_id)
+        if not include_references:
+            chunks = [
+                chunk
+                for chunk in chunks
+                if section_base_name(chunk.section) not in self.EXCLUDED_SECTIONS
+            ]
+        return rank_chunks(chunks, query, top_k)
+
+    def excerpts(self, paper_id: str, query: str, budget: int) -> str:
+        """在 token 预算内取与 query 最相关的片段，按原文顺序拼接；论文还没有切分时返回空字符串"""
+        if budget <= 0:
+            return ""
+        selected = []
+        used = 0
+        for chunk in self.search(paper_id, query, top_k=None):
+            if used + chunk.token_count > budget:
+                continue
+            selected.append(chunk)
+            used += chunk.token_count
+        return join_chunks(selected)
+
+
+paper_chunk_store = PaperChunkStore()
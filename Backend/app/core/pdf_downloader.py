@@ -0,0 +1,286 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+PDF_MAGIC = b"%PDF-"
+# 这些状态码认为是临时错误，可以重试
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class PdfDownloadError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class PdfDownloadResult(BaseModel):
+    url: str
+    full_path: str
+    size: int
+    sha256: str
+    resumed: bool = False
+    attempts: int = 1
+
+
+def is_valid_pdf_file(full_path) -> bool:
+    """文件存在、非空，并且以 PDF 文件头开始"""
+    try:
+        with open(full_path, "rb") as f:
+            return f.read(len(PDF_MAGIC)) == PDF_MAGIC
+    except OSError:
+        return False
+
+
+def run_sync(coro):
+    """
+    在同步代码里执行协程直到完成。
+    当前线程已经有运行中的事件循环时（同步函数被 async 路由直接调用），asyncio.run 会报错，
+    这时放到一个新线程里执行，当前线程等待结果
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class StripedLocks:
+    """
+    按 key 加锁的固定锁池：key 按哈希分到其中一把锁上。
+    锁的数量不随 key（论文、文件路径）增长；不同 key 偶尔共用一把锁，只会多等一会儿
+    """
+
+    def __init__(self, stripes: int = 64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def get(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+
+async def acquire_lock(lock):
+    """
+    在事件循环里获取 threading 的锁/信号量。
+    threading 的锁才能在多个线程各自的事件循环之间共享，这里用非阻塞方式轮询，避免卡住事件循环
+    """
+    while not lock.acquire(blocking=False):
+        await asyncio.sleep(0.05)
+
+
+def file_sha256(full_path) -> Tuple[int, str]:
+    """计算已有文件的 (大小, sha256)"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(full_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+            size += len(block)
+    return size, digest.hexdigest()
+
+
+class PdfDownloadManager:
+    """
+    PDF 下载管理器：
+    1. 按块流式写入临时文件 {path}.part，下载完成并校验后再原子地 rename 为正式文件，
+       中途失败不会留下被当作有效 PDF 的残缺文件；
+    2. 重试时如果 .part 已有内容，使用 Range 请求断点续传；
+    3. 临时错误（超时、连接错误、5xx/429）按指数退避重试；
+    4. 每个 host 的并发数有上限（跨线程、跨事件循环生效，review 线程和预取任务共享）；
+    5. 同一个文件同时只有一个下载在写 .part，后到的请求等前一个结束后直接复用结果；
+    6. 返回文件大小和 sha256。
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 2,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        chunk_size: int = 64 * 1024,
+        timeout: Optional[httpx.Timeout] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.max_connections_per_host = max_connections_per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.chunk_size = chunk_size
+        self.timeout = timeout or httpx.Timeout(60.0, connect=10.0)
+        self.headers = headers or {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        }
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        self._path_locks = StripedLocks()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(
+                    self.max_connections_per_host
+                )
+            return self._host_slots[host]
+
+    async def download(
+        self, url: str, full_path, client: Optional[httpx.AsyncClient] = None
+    ) -> PdfDownloadResult:
+        """
+        下载单个 PDF 到 full_path，失败时抛出 PdfDownloadError（保留 .part 以便下次续传）
+        """
+        full_path = Path(full_path)
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        if client is None:
+            async with httpx.AsyncClient(
+                timeout=self.timeout, headers=self.headers, follow_redirects=True
+            ) as own_client:
+                return await self.download(url, full_path, client=own_client)
+
+        path_lock = self._path_locks.get(str(full_path))
+        await acquire_lock(path_lock)
+        try:
+            if is_valid_pdf_file(full_path):
+                # 其他线程（比如预取任务）刚刚下载完成
+                size, sha256 = file_sha256(full_path)
+                return PdfDownloadResult(
+                    url=url, full_path=str(full_path), size=size, sha256=sha256, attempts=0
+                )
+            return await self._download_with_retry(client, url, full_path)
+        finally:
+            path_lock.release()
+
+    async def _download_with_retry(
+        self, client: httpx.AsyncClient, url: str, full_path: Path
+    ) -> PdfDownloadResult:
+        slot = self._host_slot(url)
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            await acquire_lock(slot)
+            try:
+                size, sha256, resumed = await self._download_once(
+                    client, url, full_path
+                )
+                logger.info(
+                    f"PDF downloaded to {full_path} (size={size}, sha256={sha256}, resumed={resumed})"
+                )
+                return PdfDownloadResult(
+                    url=url,
+                    full_path=str(full_path),
+                    size=size,
+                    sha256=sha256,
+                    resumed=resumed,
+                    attempts=attempt + 1,
+                )
+            except (httpx.TransportError, PdfDownloadError) as e:
+                last_error = e
+                if isinstance(e, PdfDownloadError) and not e.retryable:
+                    break
+                wait_time = min(
+                    self.backoff_max, self.backoff_base * 2**attempt
+                ) + random.uniform(0, self.backoff_base)
+                logger.warning(
+                    f"Attempt {attempt + 1} to download {url} failed: {e!r}. Retrying after {wait_time:.1f} seconds..."
+                )
+            finally:
+                slot.release()
+            if attempt < self.max_retries:
+                await asyncio.sleep(wait_time)
+        raise PdfDownloadError(f"Failed to download {url}: {last_error!r}")
+
+    async def _download_once(
+        self, client: httpx.AsyncClient, url: str, full_path: Path
+    ) -> Tuple[int, str, bool]:
+        part_path = full_path.with_name(full_path.name + ".part")
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 416:
+                # 服务器不接受该范围（文件可能已变化），丢弃临时文件后重来
+                part_path.unlink(missing_ok=True)
+                raise PdfDownloadError(f"Range not satisfiable for {url}")
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise PdfDownloadError(f"HTTP {response.status_code} for {url}")
+            if response.status_code >= 400:
+                raise PdfDownloadError(
+                    f"HTTP {response.status_code} for {url}", retryable=False
+                )
+
+            resumed = offset > 0 and response.status_code == 206
+            digest = hashlib.sha256()
+            if resumed:
+                # 续传：先把已经下载的部分计入哈希
+                with open(part_path, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+            else:
+                offset = 0
+            # 有 Content-Encoding 时 Content-Length 是压缩后的长度，无法用来校验
+            expected = response.headers.get("Content-Length")
+            if expected and not response.headers.get("Content-Encoding"):
+                expected = offset + int(expected)
+            else:
+                expected = None
+
+            size = offset
+            with open(part_path, "ab" if resumed else "wb") as f:
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+        if expected is not None and size != expected:
+            raise PdfDownloadError(
+                f"Incomplete download for {url}: got {size} of {expected} bytes"
+            )
+        if not is_valid_pdf_file(part_path):
+            part_path.unlink(missing_ok=True)
+            raise PdfDownloadError(
+                f"Downloaded file from {url} is not a PDF", retryable=False
+            )
+        os.replace(part_path, full_path)
+        return size, digest.hexdigest(), resumed
+
+    async def download_many(
+        self, items: List[Tuple[str, str]]
+    ) -> List[Optional[PdfDownloadResult]]:
+        """
+        并发下载多个 (url, full_path)，失败的项返回 None
+        """
+        async with httpx.AsyncClient(
+            timeout=self.timeout, headers=self.headers, follow_redirects=True
+        ) as client:
+
+            async def _download(url, full_path):
+                try:
+                    return await self.download(url, full_path, client=client)
+                except PdfDownloadError as e:
+                    logger.error(str(e))
+                    return None
+
+            return await asyncio.gather(
+                *[_download(url, full_path) for url, full_path in items]
+            )
+
+    def download_sync(self, url: str, full_path) -> PdfDownloadResult:
+        """
+        给同步代码（review 线程）使用的入口
+        """
+        return run_sync(self.download(url, full_path))
+
+
+pdf_download_manager = PdfDownloadManager()
@@ -0,0 +1,242 @@
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+import threading
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+from config import (
+    PDF_EXTRACTION_PAGES_PER_TASK,
+    PDF_EXTRACTION_PARALLEL_MIN_PAGES,
+    PDF_EXTRACTION_WORKERS,
+)
+from core.section_titles import SectionTitleMatcher
+
+logger = logging.getLogger(__name__)
+
+# 页偏移的数组类型：无符号 64 位整数
+OFFSET_TYPECODE = "Q"
+
+
+class PdfText:
+    """
+    PDF 抽取结果：全文文本，以及每一页在全文中的起始字符偏移。
+    page_offsets 是长度为 页数+1 的 array，最后一个元素是全文长度，第 i 页的内容是 text[offsets[i]:offsets[i+1]]。
+    """
+
+    def __init__(self, text: str, page_offsets: array, total_pages: int = None):
+        self.text = text
+        self.page_offsets = page_offsets
+        # PDF 的总页数；按需抽取时只抽了前面一部分页，total_pages 大于 page_count
+        self.total_pages = self.page_count if total_pages is None else total_pages
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_offsets) - 1
+
+    @property
+    def is_complete(self) -> bool:
+        return self.page_count >= self.total_pages
+
+    def page_text(self, page_number: int) -> str:
+        return self.text[
+            self.page_offsets[page_number] : self.page_offsets[page_number + 1]
+        ]
+
+    def page_of(self, char_index: int) -> int:
+        """字符偏移所在的页码（从 0 开始）"""
+        return max(0, min(bisect_right(self.page_offsets, char_index) - 1, self.page_count - 1))
+
+
+def _extract_page_range(
+    pdf_path: str, start: int, end: Optional[int]
+) -> Tuple[str, bytes]:
+    """
+    在子进程中执行：抽取 [start, end) 页的文本，返回 (文本, 页偏移的字节串)。
+    偏移以字节串返回，跨进程传递时比 list[int] 的 pickle 小得多。
+    """
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        end = len(doc) if end is None else min(end, len(doc))
+        pages = []
+        offsets = array(OFFSET_TYPECODE, [0])
+        for page_number in range(start, end):
+            page_text = doc[page_number].get_text()
+            pages.append(page_text)
+            offsets.append(offsets[-1] + len(page_text))
+    return "".join(pages), offsets.tobytes()
+
+
+def _toc_boundary_page(doc, stop_keywords: FrozenSet[str]) -> Optional[int]:
+    """从 PDF 书签（目录）里找第一个边界章节（比如 References）所在的页码（从 0 开始）"""
+    for _, title, page in doc.get_toc(simple=True):
+        if page >= 1 and SectionTitleMatcher.clean_line(title) in stop_keywords:
+            return page - 1
+    return None
+
+
+def _extract_until_boundary(
+    pdf_path: str, stop_keywords: FrozenSet[str]
+) -> Tuple[str, bytes, int]:
+    """
+    在子进程中执行：从第一页开始抽取，直到边界章节标题所在的页（包含该页）为止，
+    返回 (文本, 页偏移的字节串, PDF 总页数)。
+    有书签时直接按书签定位边界页；没有书签时逐页检查是否出现了边界标题行。
+    找不到边界时抽取全文。
+    """
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        total_pages = len(doc)
+        boundary = _toc_boundary_page(doc, stop_keywords)
+        pages = []
+        offsets = array(OFFSET_TYPECODE, [0])
+        for page_number in range(total_pages):
+            page_text = doc[page_number].get_text()
+            pages.append(page_text)
+            offsets.append(offsets[-1] + len(page_text))
+            if boundary is not None:
+                if page_number >= boundary:
+                    break
+            elif any(
+                SectionTitleMatcher.clean_line(line) in stop_keywords
+                for line in page_text.split("\n")
+            ):
+                break
+    return "".join(pages), offsets.tobytes(), total_pages
+
+
+def _page_count(pdf_path: str) -> int:
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+class PdfExtractionService:
+    """
+    基于进程池的 PDF 文本抽取服务。
+
+    PyMuPDF 的文本抽取是 CPU 密集型的，放在 review 线程里会互相争抢 GIL；
+    这里把抽取放到子进程，多篇论文的解析可以按 CPU 核数并行。
+    页数超过 parallel_min_pages 的长论文再按 pages_per_task 拆成多个页段并行抽取，最后按页序拼接。
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        pages_per_task: int = 32,
+        parallel_min_pages: int = 64,
+    ):
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self.parallel_min_pages = parallel_min_pages
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 服务进程里有多个线程，fork 出来的子进程可能继承到被占用的锁，所以用 spawn
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, Optional[int]]]:
+        if page_count < self.parallel_min_pages:
+            return [(0, None)]
+        return [
+            (start, start + self.pages_per_task)
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+
+    def extract(self, pdf_path) -> PdfText:
+        pdf_path = str(pdf_path)
+        try:
+            executor = self._get_executor()
+            page_count = executor.submit(_page_count, pdf_path).result()
+            futures = [
+                executor.submit(_extract_page_range, pdf_path, start, end)
+                for start, end in self._page_ranges(page_count)
+            ]
+            parts = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            # 子进程异常退出（比如被 OOM kill），重建进程池，这一篇在当前进程里抽取
+            logger.error(f"PDF extraction pool is broken, extracting in process: {e}")
+            self.shutdown()
+            parts = [_extract_page_range(pdf_path, 0, None)]
+        return self._merge(parts)
+
+    def extract_until(self, pdf_path, stop_keywords: Iterable[str]) -> PdfText:
+        """
+        按需抽取：只抽取到边界章节（比如 References）所在的页为止，附录等后面的页留到需要时再用 extract_pages 抽取。
+        只需要摘要、引言、正文和结论的评审阶段用这个接口，长附录的论文可以省掉大部分抽取时间。
+        """
+        pdf_path = str(pdf_path)
+        stop_keywords = frozenset(keyword.lower() for keyword in stop_keywords)
+        try:
+            text, offset_bytes, total_pages = (
+                self._get_executor()
+                .submit(_extract_until_boundary, pdf_path, stop_keywords)
+                .result()
+            )
+        except BrokenProcessPool as e:
+            logger.error(f"PDF extraction pool is broken, extracting in process: {e}")
+            self.shutdown()
+            text, offset_bytes, total_pages = _extract_until_boundary(
+                pdf_path, stop_keywords
+            )
+        pdf_text = self._merge([(text, offset_bytes)])
+        pdf_text.total_pages = total_pages
+        return pdf_text
+
+    def extract_pages(self, pdf_path, start: int) -> PdfText:
+        """抽取从第 start 页（从 0 开始）到最后一页的文本，页数多时同样按页段并行"""
+        pdf_path = str(pdf_path)
+        try:
+            executor = self._get_executor()
+            page_count = executor.submit(_page_count, pdf_path).result()
+            ranges = [
+                (start + range_start, None if range_end is None else start + range_end)
+                for range_start, range_end in self._page_ranges(max(0, page_count - start))
+            ]
+            futures = [
+                executor.submit(_extract_page_range, pdf_path, range_start, range_end)
+                for range_start, range_end in ranges
+            ]
+            parts = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            logger.error(f"PDF extraction pool is broken, extracting in process: {e}")
+            self.shutdown()
+            parts = [_extract_page_range(pdf_path, start, None)]
+        return self._merge(parts)
+
+    @staticmethod
+    def _merge(parts: List[Tuple[str, bytes]]) -> PdfText:
+        texts = []
+        offsets = array(OFFSET_TYPECODE, [0])
+        for text, offset_bytes in parts:
+            part_offsets = array(OFFSET_TYPECODE)
+            part_offsets.frombytes(offset_bytes)
+            base = offsets[-1]
+            offsets.extend(base + offset for offset in part_offsets[1:])
+            texts.append(text)
+        return PdfText("".join(texts), offsets)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+pdf_extraction_service = PdfExtractionService(
+    max_workers=PDF_EXTRACTION_WORKERS,
+    pages_per_task=PDF_EXTRACTION_PAGES_PER_TASK,
+    parallel_min_pages=PDF_EXTRACTION_PARALLEL_MIN_PAGES,
+)
@@ -0,0 +1,188 @@
+import asyncio
+from datetime import datetime
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from config import (
+    PDF_PREFETCH_DISK_BUDGET_MB,
+    PDF_PREFETCH_MAX_PAPERS,
+    PDF_PREFETCH_PRIORITY_CATEGORIES,
+)
+from core.pdf_downloader import PdfDownloadError, PdfDownloadResult
+from core.pdf_store import PdfStore, pdf_store
+from models.tasks import PdfState
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchItem(BaseModel):
+    """预取需要的论文信息（不持有 ORM 对象，session 关闭后也可以使用）"""
+
+    arxiv_id: str
+    pdf_url: str
+    published: datetime
+    primary_category: Optional[str] = None
+    pdf_state: Optional[str] = None
+
+    @classmethod
+    def from_paper(cls, paper) -> Optional["PrefetchItem"]:
+        """从 ArxivPaper 或者爬虫返回的 dict 构造，缺少必要字段时返回 None"""
+        get = paper.get if isinstance(paper, dict) else lambda k: getattr(paper, k, None)
+        if not get("arxiv_id") or not get("pdf_url") or not get("published"):
+            return None
+        return cls(
+            arxiv_id=get("arxiv_id"),
+            pdf_url=get("pdf_url"),
+            published=get("published"),
+            primary_category=get("primary_category"),
+            pdf_state=get("pdf_state"),
+        )
+
+
+class PdfPrefetcher:
+    """
+    PDF 预取：爬取入库后立即在后台下载新论文的 PDF，review 线程处理到该论文时 PDF 已经在本地，
+    不用再等网络 I/O。
+
+    - 按优先级下载：优先分类靠前的先下，同一优先级里新发表的先下；
+    - 磁盘预算：PDF 存储的总大小达到预算后停止预取（不会删除已有文件），剩下的论文仍由 review 时按需下载；
+    - 与 review 共用同一个 PdfStore，同一篇论文不会被重复下载，per-host 并发上限也是共享的。
+    """
+
+    def __init__(
+        self,
+        store: PdfStore,
+        disk_budget_bytes: int,
+        max_papers: int,
+        priority_categories: List[str],
+    ):
+        self.store = store
+        self.download_manager = store.download_manager
+        self.disk_budget_bytes = disk_budget_bytes
+        self.max_papers = max_papers
+        self.priority_categories = {c: i for i, c in enumerate(priority_categories)}
+        self._background_tasks = set()
+
+    def prioritize(self, items: Iterable[PrefetchItem]) -> List[PrefetchItem]:
+        unranked = len(self.priority_categories)
+        return sorted(
+            items,
+            key=lambda item: (
+                self.priority_categories.get(item.primary_category, unranked),
+                -item.published.timestamp(),
+            ),
+        )
+
+    def plan(
+        self, items: Iterable[PrefetchItem], keep_order: bool = False
+    ) -> List[PrefetchItem]:
+        """去掉已下载和重复的论文，排好下载顺序，最多 max_papers 篇"""
+        seen = set()
+        pending = []
+        for item in items:
+            if not item or item.arxiv_id in seen:
+                continue
+            seen.add(item.arxiv_id)
+            if item.pdf_state != PdfState.stored.value:
+                pending.append(item)
+        if not keep_order:
+            pending = self.prioritize(pending)
+        return pending[: self.max_papers]
+
+    async def prefetch(
+        self, items: Iterable[PrefetchItem], keep_order: bool = False
+    ) -> Dict[str, PdfDownloadResult]:
+        """
+        按顺序预取 PDF，返回 {arxiv_id: 下载结果}。
+        keep_order=True 时保持传入顺序（批量 review 会按这个顺序处理论文）。
+        """
+        queue = self.plan(items, keep_order=keep_order)
+        if not queue:
+            return {}
+        used = await asyncio.to_thread(self.store.disk_usage)
+        if used >= self.disk_budget_bytes:
+            logger.warning(
+                f"PDF storage uses {used} bytes, over the prefetch budget {self.disk_budget_bytes}, skip prefetch"
+            )
+            return {}
+        logger.info(f"Prefetching {len(queue)} PDFs, disk usage {used}/{self.disk_budget_bytes} bytes")
+
+        results = {}
+        queue.reverse()  # 从尾部 pop，保持优先级顺序
+
+        async def _worker(client):
+            nonlocal used
+            while queue and used < self.disk_budget_bytes:
+                item = queue.pop()
+                try:
+                    result = await self.store.fetch(
+                        item.arxiv_id, item.pdf_url, item.published, client=client
+                    )
+                except PdfDownloadError as e:
+                    logger.warning(f"Prefetch of {item.arxiv_id} failed: {e}")
+                    continue
+                results[item.arxiv_id] = result
+                if result.attempts:  # attempts 为 0 表示已经在存储中，没有占用新的空间
+                    used += result.size
+
+        # worker 数等于 per-host 并发上限，下载按优先级依次进行，而不是全部同时发起
+        async with httpx.AsyncClient(
+            timeout=self.download_manager.timeout,
+            headers=self.download_manager.headers,
+            follow_redirects=True,
+        ) as client:
+            await asyncio.gather(
+                *[
+                    _worker(client)
+                    for _ in range(self.download_manager.max_connections_per_host)
+                ]
+            )
+
+        if queue:
+            logger.warning(
+                f"PDF prefetch stopped at the disk budget, {len(queue)} papers left for on-demand download"
+            )
+        logger.info(f"Prefetched {len(results)} PDFs")
+        return results
+
+    def schedule(self, items: Iterable[PrefetchItem]):
+        """在当前事件循环里后台预取（用于 async 的爬虫任务），不阻塞调用方"""
+        items = list(items)
+        if not items:
+            return
+        task = asyncio.get_running_loop().create_task(self._prefetch_safely(items))
+        # 事件循环只保留 task 的弱引用，这里持有引用，避免任务中途被回收
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def start_background(self, items: Iterable[PrefetchItem], keep_order: bool = True):
+        """在后台线程里预取（用于同步的批量 review）"""
+        items = list(items)
+        if not items:
+            return None
+        thread = threading.Thread(
+            target=lambda: asyncio.run(self._prefetch_safely(items, keep_order)),
+            name="pdf-prefetch",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    async def _prefetch_safely(self, items: List[PrefetchItem], keep_order=False):
+        try:
+            await self.prefetch(items, keep_order=keep_order)
+        except Exception as e:
+            # 预取只是优化，失败时 review 会自己下载
+            logger.error(f"PDF prefetch failed: {e}")
+
+
+pdf_prefetcher = PdfPrefetcher(
+    pdf_store,
+    disk_budget_bytes=PDF_PREFETCH_DISK_BUDGET_MB * 1024 * 1024,
+    max_papers=PDF_PREFETCH_MAX_PAPERS,
+    priority_categories=PDF_PREFETCH_PRIORITY_CATEGORIES,
+)
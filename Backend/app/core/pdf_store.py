@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import httpx
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+from config import get_data_storage_dir
+from core.pdf_downloader import (
+    PdfDownloadManager,
+    PdfDownloadResult,
+    StripedLocks,
+    acquire_lock,
+    file_sha256,
+    is_valid_pdf_file,
+    pdf_download_manager,
+    run_sync,
+)
+from database import SyncSessionLocal
+from models.tasks import ArxivPaper, PdfBlob, PdfState, Publication
+
+logger = logging.getLogger(__name__)
+
+
+def legacy_pdf_path(arxiv_id: str, published) -> Path:
+    """旧版本按日期存放的路径：{data}/pdf/{年}/{月}/{arxiv_id}.pdf"""
+    return (
+        get_data_storage_dir()
+        / "pdf"
+        / published.strftime("%Y")
+        / published.strftime("%m")
+        / f"{arxiv_id}.pdf"
+    )
+
+
+class PdfStore:
+    """
+    内容寻址的 PDF 存储。
+
+    文件按 sha256 分片存放在 {data}/blobs/pdf/{sha[:2]}/{sha[2:4]}/{sha}.pdf，
+    内容相同的 PDF（不同版本号、交叉投递）只保存一份。
+    论文 -> 文件的对应关系记录在 ArxivPaper 的 pdf_sha256/pdf_size/pdf_state 上，
+    所以判断 PDF 是否已经下载只需要看论文行，不再访问文件系统；
+    目录只在文件入库时创建一次，查路径时不会 mkdir。
+    """
+
+    def __init__(self, data_dir, download_manager: PdfDownloadManager):
+        self.data_dir = Path(data_dir)
+        self.download_manager = download_manager
+        self._locks = StripedLocks()
+
+    def blob_path(self, sha256: str) -> Tuple[str, str]:
+        """返回 (完整路径, 相对数据目录的路径)"""
+        relative_path = f"./blobs/pdf/{sha256[:2]}/{sha256[2:4]}/{sha256}.pdf"
+        return str(self.data_dir / relative_path), relative_path
+
+    def _staging_path(self, arxiv_id: str) -> Path:
+        # 老式的 arxiv id（比如 hep-th/9901001）里有 /
+        return self.data_dir / "blobs" / "staging" / f"{arxiv_id.replace('/', '_')}.pdf"
+
+    def _ingest(self, source_path, sha256: str) -> str:
+        """把下载好的文件移入存储，已有相同内容时直接删除新文件，返回相对路径"""
+        full_path, relative_path = self.blob_path(sha256)
+        if os.path.exists(full_path):
+            os.unlink(source_path)
+            logger.info(f"PDF {sha256} already stored, dropped the duplicate file")
+        else:
+            Path(full_path).parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source_path, full_path)
+        return relative_path
+
+    def lookup(self, arxiv_id: str) -> Optional[Tuple[str, int]]:
+        """论文已经入库时返回 (sha256, size)"""
+        db = SyncSessionLocal()
+        try:
+            row = (
+                db.query(ArxivPaper.pdf_sha256, ArxivPaper.pdf_size)
+                .filter(
+                    ArxivPaper.arxiv_id == arxiv_id,
+                    ArxivPaper.pdf_state == PdfState.stored.value,
+                )
+                .first()
+            )
+            return (row.pdf_sha256, row.pdf_size) if row and row.pdf_sha256 else None
+        finally:
+            db.close()
+
+    def record(self, arxiv_id: str, sha256: str, size: int, relative_path: str):
+        """登记文件，并把论文指向该文件；已有 Publication 的 pdf_path 一并更新"""
+        db = SyncSessionLocal()
+        try:
+            db.merge(PdfBlob(sha256=sha256, size=size, storage_path=relative_path))
+            # 加载行再修改（而不是 query().update()），提交后查询缓存只失效这篇论文
+            paper = db.query(ArxivPaper).filter(ArxivPaper.arxiv_id == arxiv_id).first()
+            if paper:
+                paper.pdf_sha256 = sha256
+                paper.pdf_size = size
+                paper.pdf_state = PdfState.stored.value
+            publication = (
+                db.query(Publication).filter(Publication.paper_id == arxiv_id).first()
+            )
+            if publication and publication.pdf_path != relative_path:
+                publication.pdf_path = relative_path
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to record PDF {sha256} for {arxiv_id}: {e}")
+        finally:
+            db.close()
+
+    def mark_failed(self, arxiv_id: str):
+        db = SyncSessionLocal()
+        try:
+            paper = db.query(ArxivPaper).filter(ArxivPaper.arxiv_id == arxiv_id).first()
+            if paper:
+                paper.pdf_state = PdfState.failed.value
+                db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to mark PDF of {arxiv_id} as failed: {e}")
+        finally:
+            db.close()
+
+    def disk_usage(self) -> int:
+        """存储中所有 PDF 的总字节数（去重后）"""
+        db = SyncSessionLocal()
+        try:
+            return db.query(func.coalesce(func.sum(PdfBlob.size), 0)).scalar()
+        finally:
+            db.close()
+
+    async def fetch(
+        self,
+        arxiv_id: str,
+        pdf_url: str,
+        published=None,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> PdfDownloadResult:
+        """
+        取论文的 PDF：已入库直接返回；旧目录里有文件就迁移进来；否则下载后入库。
+        同一篇论文同时只有一个 fetch 在执行（review 线程和预取任务不会重复下载）。
+        下载失败抛出 PdfDownloadError
+        """
+        lock = self._locks.get(arxiv_id)
+        await acquire_lock(lock)
+        try:
+            stored = await asyncio.to_thread(self.lookup, arxiv_id)
+            if stored:
+                sha256, size = stored
+                return PdfDownloadResult(
+                    url=pdf_url,
+                    full_path=self.blob_path(sha256)[0],
+                    size=size,
+                    sha256=sha256,
+                    attempts=0,
+                )
+
+            source_path = legacy_pdf_path(arxiv_id, published) if published else None
+            if source_path and is_valid_pdf_file(source_path):
+                size, sha256 = file_sha256(source_path)
+                result = PdfDownloadResult(
+                    url=pdf_url, full_path=str(source_path), size=size, sha256=sha256, attempts=0
+                )
+                logger.info(f"Moving legacy PDF {source_path} into the blob store")
+            else:
+                source_path = self._staging_path(arxiv_id)
+                try:
+                    result = await self.download_manager.download(
+                        pdf_url, source_path, client=client
+                    )
+                except Exception:
+                    await asyncio.to_thread(self.mark_failed, arxiv_id)
+                    raise
+
+            relative_path = self._ingest(source_path, result.sha256)
+            await asyncio.to_thread(
+                self.record, arxiv_id, result.sha256, result.size, relative_path
+            )
+            result.full_path = self.blob_path(result.sha256)[0]
+            return result
+        finally:
+            lock.release()
+
+    def fetch_sync(self, arxiv_id: str, pdf_url: str, published=None) -> PdfDownloadResult:
+        """给同步代码（review 线程）使用的入口"""
+        return run_sync(self.fetch(arxiv_id, pdf_url, published))
+
+
+pdf_store = PdfStore(get_data_storage_dir(), pdf_download_manager)
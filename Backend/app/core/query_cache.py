@@ -0,0 +1,193 @@
+from datetime import date, datetime
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from config import QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL_SECONDS
+from models.tasks import ArxivPaper, PaperScores, Publication
+
+logger = logging.getLogger(__name__)
+
+_CHANGES_KEY = "query_cache_changes"
+_TRACKED = (Publication, PaperScores, ArxivPaper)
+
+
+def _as_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+def column_values(obj) -> dict:
+    """ORM 对象的列值，缓存里只放这种普通数据，不放绑定在会话上的 ORM 对象"""
+    return {column.key: getattr(obj, column.key) for column in obj.__mapper__.column_attrs}
+
+
+class QueryResultCache:
+    """
+    进程内的论文查询结果缓存（LRU + TTL，有容量上限）。
+
+    - 详情按 paper_id 缓存，列表按请求参数缓存并记录覆盖的发布日期区间；
+    - Publication / PaperScores / ArxivPaper 的写入在事务提交后（after_commit）精确失效：
+      失效对应 paper_id 的详情，以及日期区间覆盖了该论文发布日期的列表；
+      回滚的事务不会失效缓存；批量 UPDATE/DELETE 无法知道具体行，直接清空；
+    - 其他进程的写入不会通知到这里，TTL 是这种情况下的过期上限。
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        # key -> 详情对应的 paper_id，或者列表覆盖的 (start_date, end_date)
+        self._tags: Dict[Hashable, Tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                self._tags.pop(key, None)
+            else:
+                self.hits += 1
+            return value
+
+    def _put(self, key: Hashable, value, tag: Tuple[str, Any]):
+        with self._lock:
+            self._entries[key] = value
+            self._tags[key] = tag
+            # TTLCache 淘汰条目时不会通知，这里顺带清理已经不在缓存里的标签
+            if len(self._tags) > 2 * self._entries.maxsize:
+                self._tags = {k: t for k, t in self._tags.items() if k in self._entries}
+
+    def put_detail(self, key: Hashable, paper_id: str, value):
+        self._put(key, value, ("paper", paper_id))
+
+    def put_listing(self, key: Hashable, start_date: date, end_date: date, value):
+        self._put(key, value, ("dates", (start_date, end_date)))
+
+    def invalidate(self, paper_ids: Iterable[str], dates: Iterable[date]):
+        paper_ids, dates = set(paper_ids), set(dates)
+        if not paper_ids and not dates:
+            return
+        with self._lock:
+            stale = [
+                key
+                for key, (kind, tag) in self._tags.items()
+                if (kind == "paper" and tag in paper_ids)
+                or (kind == "dates" and any(tag[0] <= d <= tag[1] for d in dates))
+            ]
+            for key in stale:
+                self._entries.pop(key, None)
+                self._tags.pop(key, None)
+            self.invalidations += len(stale)
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached publication queries")
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxsize,
+                "ttl_seconds": self._entries.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+query_cache = QueryResultCache(
+    maxsize=QUERY_CACHE_MAX_ENTRIES, ttl=QUERY_CACHE_TTL_SECONDS
+)
+
+
+# 事务提交后收到改动的 (paper_ids, 发布日期) 的回调，用于维护依赖论文数据的派生表（例如分面聚合表）。
+# 批量 UPDATE/DELETE 不知道具体行，不会通知
+_commit_listeners: List[Callable[[Set[str], Set[date]], None]] = []
+
+
+def on_publications_committed(listener: Callable[[Set[str], Set[date]], None]):
+    _commit_listeners.append(listener)
+    return listener
+
+
+def _pending_changes(session) -> dict:
+    return session.info.setdefault(
+        _CHANGES_KEY, {"paper_ids": set(), "dates": set(), "clear": False}
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    """记录本次 flush 改动的论文和发布日期，等事务提交后再失效缓存"""
+    paper_ids: Set[str] = set()
+    dates: Set[date] = set()
+    score_paper_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Publication):
+            paper_ids.add(obj.paper_id)
+            # 修改了发布日期时，新旧两个日期的列表都要失效
+            history = inspect(obj).attrs.publish_date.history
+            dates.update(_as_date(d) for d in history.sum() if d)
+        elif isinstance(obj, PaperScores):
+            score_paper_ids.add(obj.paper_id)
+        elif isinstance(obj, ArxivPaper):
+            paper_ids.add(obj.arxiv_id)
+            if obj.published:
+                dates.add(_as_date(obj.published))
+    if score_paper_ids:
+        # 评分行上没有发布日期，从 publication 查出来，用于失效按分数排序的列表
+        paper_ids |= score_paper_ids
+        rows = session.connection().execute(
+            select(Publication.__table__.c.publish_date).where(
+                Publication.__table__.c.paper_id.in_(score_paper_ids)
+            )
+        )
+        dates.update(_as_date(d) for (d,) in rows if d)
+    if paper_ids or dates:
+        changes = _pending_changes(session)
+        changes["paper_ids"] |= paper_ids
+        changes["dates"] |= dates
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state):
+    """query().update()/delete() 不经过 flush，无法知道改了哪些行，提交后清空缓存"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _TRACKED):
+        _pending_changes(orm_execute_state.session)["clear"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    if changes["clear"]:
+        query_cache.clear()
+        return
+    query_cache.invalidate(changes["paper_ids"], changes["dates"])
+    for listener in _commit_listeners:
+        try:
+            listener(changes["paper_ids"], changes["dates"])
+        except Exception as e:
+            logger.error(f"Publication commit listener {listener.__name__} failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_CHANGES_KEY, None)
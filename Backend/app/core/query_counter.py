@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+from typing import List, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+# 当前请求的计数器。contextvar 里放的是可变对象：同步路由在线程池里执行，
+# 线程里拿到的是 context 的副本，只有修改同一个对象，计数才能回到请求这一层
+_current: ContextVar[Optional[List[int]]] = ContextVar("query_counter", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def install(engine):
+    """在 engine 上注册计数；AsyncEngine 注册在底层的 sync_engine 上"""
+    target = getattr(engine, "sync_engine", engine)
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+
+
+@contextmanager
+def count_queries():
+    """
+    统计代码块内执行的 SQL 语句数：
+        with count_queries() as counter:
+            ...
+        counter[0]
+    """
+    counter = [0]
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+
+async def query_count_middleware(request, call_next):
+    """在响应头 X-Query-Count 中返回本次请求执行的 SQL 语句数，用来确认列表接口没有 N+1 查询"""
+    with count_queries() as counter:
+        response = await call_next(request)
+    response.headers[QUERY_COUNT_HEADER] = str(counter[0])
+    logger.debug(f"{request.method} {request.url.path} ran {counter[0]} queries")
+    return response
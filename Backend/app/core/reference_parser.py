@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+import re
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# [12] Author ...
+_BRACKET_MARKER = re.compile(r"^\s*\[(\d{1,3})\]\s*", re.MULTILINE)
+# 12. Author ...
+_NUMBER_MARKER = re.compile(r"^\s*(\d{1,3})\.\s+(?=[A-Z])", re.MULTILINE)
+# 作者-年份格式：上一条以句号结束，下一条以 "Surname, X." 或 "Surname X," 开头
+_AUTHOR_START = re.compile(r"(?<=\.)\s*\n\s*(?=[A-Z][A-Za-z'\-]+,?\s+(?:[A-Z]\.|[A-Z][a-z]+,))")
+
+_ARXIV_NEW = re.compile(
+    r"(?:arxiv(?:\s*preprint)?\s*:?\s*(?:abs/)?|arxiv\.org/(?:abs|pdf)/)\s*(\d{4}\.\d{4,5})(v\d+)?",
+    re.IGNORECASE,
+)
+_ARXIV_OLD = re.compile(
+    r"(?:arxiv\s*:?\s*|arxiv\.org/(?:abs|pdf)/)([a-z\-]+(?:\.[A-Z]{2})?/\d{7})(v\d+)?",
+    re.IGNORECASE,
+)
+_DOI = re.compile(r"\b(10\.\d{4,9}/[^\s\"<>,;]+)", re.IGNORECASE)
+_YEAR = re.compile(r"\b(19[5-9]\d|20\d\d)[a-z]?\b")
+_QUOTED_TITLE = re.compile(r"[“\"]([^”\"]{10,300}?)[,.]?[”\"]")
+# 句号分段，但不在姓名缩写（单个大写字母）后面断开
+_SENTENCE_SPLIT = re.compile(r"(?<!\b[A-Z])\.\s+")
+
+MAX_ENTRY_LENGTH = 1000
+
+
+class ParsedReference(BaseModel):
+    position: int  # 在参考文献列表中的序号（从 0 开始）
+    raw: str
+    title: Optional[str] = None
+    arxiv_id: Optional[str] = None  # 不带版本号
+    doi: Optional[str] = None
+    year: Optional[int] = None
+
+
+def normalize_title(title: Optional[str]) -> Optional[str]:
+    """用于匹配的标题：小写、合并空白、去掉结尾标点"""
+    if not title:
+        return None
+    return re.sub(r"\s+", " ", title).strip(" .,;:").lower() or None
+
+
+def split_references(text: str) -> List[str]:
+    """
+    把参考文献章节拆成条目，依次尝试 [n] 编号、n. 编号和作者-年份三种格式
+    """
+    if not text:
+        return []
+    lines = text.split("\n")
+    # 去掉章节标题行
+    if lines and re.sub(r"[^a-zA-Z]", "", lines[0]).lower() in {
+        "references",
+        "bibliography",
+        "citedworks",
+    }:
+        lines = lines[1:]
+    body = "\n".join(lines)
+
+    for marker in (_BRACKET_MARKER, _NUMBER_MARKER):
+        starts = [m.start() for m in marker.finditer(body)]
+        if len(starts) >= 3:
+            entries = [
+                body[start:end]
+                for start, end in zip(starts, starts[1:] + [len(body)])
+            ]
+            return [_join_lines(marker.sub("", entry, count=1)) for entry in entries]
+
+    return [_join_lines(entry) for entry in _AUTHOR_START.split(body) if entry.strip()]
+
+
+def _join_lines(entry: str) -> str:
+    # 合并换行，处理行尾的连字符断词
+    entry = re.sub(r"-\n\s*", "", entry.strip())
+    return re.sub(r"\s+", " ", entry)[:MAX_ENTRY_LENGTH]
+
+
+def _guess_title(entry: str) -> Optional[str]:
+    quoted = _QUOTED_TITLE.search(entry)
+    if quoted:
+        return quoted.group(1).strip()
+    segments = [s.strip() for s in _SENTENCE_SPLIT.split(entry) if s.strip()]
+    # 第一段是作者；作者-年份格式里第二段是年份，标题顺延一段
+    for segment in segments[1:]:
+        if _YEAR.fullmatch(segment.strip("() ")):
+            continue
+        if len(segment.split()) >= 3:
+            return segment
+    return None
+
+
+def parse_reference(entry: str, position: int = 0) -> ParsedReference:
+    arxiv = _ARXIV_NEW.search(entry) or _ARXIV_OLD.search(entry)
+    doi = _DOI.search(entry)
+    # 先去掉 arXiv 编号和 DOI，避免把 2012.01234 里的 2012 当成年份
+    without_ids = _DOI.sub(" ", _ARXIV_OLD.sub(" ", _ARXIV_NEW.sub(" ", entry)))
+    years = _YEAR.findall(without_ids)
+    return ParsedReference(
+        position=position,
+        raw=entry,
+        title=_guess_title(without_ids),
+        arxiv_id=arxiv.group(1) if arxiv else None,
+        doi=doi.group(1).rstrip(".").lower() if doi else None,
+        year=int(years[-1]) if years else None,
+    )
+
+
+def parse_references(text: str) -> List[ParsedReference]:
+    return [
+        parse_reference(entry, position)
+        for position, entry in enumerate(split_references(text))
+    ]
+
+
+def _parse_batch(items: List[tuple]) -> List[tuple]:
+    return [(paper_id, parse_references(text)) for paper_id, text in items]
+
+
+def parse_references_bulk(
+    texts: Dict[str, str], max_workers: int, batch_size: int = 20
+) -> Dict[str, List[ParsedReference]]:
+    """
+    在进程池里批量解析多篇论文的参考文献，返回 {paper_id: [ParsedReference]}
+    """
+    items = [(paper_id, text) for paper_id, text in texts.items() if text]
+    if not items:
+        return {}
+    batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+    if len(batches) == 1 or max_workers <= 1:
+        return dict(pair for batch in batches for pair in _parse_batch(batch))
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(batches)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        return dict(
+            pair for result in executor.map(_parse_batch, batches) for pair in result
+        )
@@ -1,3 +1,4 @@
+from array import array
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
@@ -11,16 +12,33 @@ from pathlib import Path
 import re
 from string import Template
 import sys
+import threading
 import time
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-import fitz
-from openai import OpenAI, Timeout
-import requests
+from openai import OpenAI
 from dotenv import load_dotenv
-from config import get_data_storage_dir
-from database import SessionLocal
-from models.tasks import ArxivPaper, PaperScores, Publication, SOTAContext
+from core.pdf_downloader import PdfDownloadError, PdfDownloadResult
+from core.pdf_store import pdf_store
+from config import (
+    CHUNK_EXCERPT_TOKENS,
+    PDF_LAZY_EXTRACTION,
+    PDF_PREFETCH_ENABLED,
+    get_data_storage_dir,
+)
+from core.extraction_cache import (
+    ExtractionArtifacts,
+    build_line_spans,
+    extraction_cache,
+)
+from core.paper_chunks import PaperChunker, paper_chunk_store
+from core.pdf_extraction import PdfText, pdf_extraction_service
+from core.pdf_prefetch import PrefetchItem, pdf_prefetcher
+from core.section_titles import SectionTitleMatcher
+from core.semantic_search import semantic_search_index
+from core.token_budget import TokenCounter, pack_sections_by_priority
+from database import SyncSessionLocal
+from models.tasks import ArxivPaper, PaperScores, PdfState, Publication, SOTAContext
 from sqlalchemy.exc import SQLAlchemyError
 
 # Load environment variables from .env file
@@ -63,6 +81,13 @@ class BaseAssistant:
         self.model_name = config.get("model_name")
         self.prompt = config.get("prompt")
         self.instruction = config.get("instruction")
+        # 多篇论文共享的上下文模板（比如 SOTA 背景知识），放在论文信息之前
+        self.shared_context = config.get("shared_context")
+        # 输入 token 预算（instruction + prompt），为空表示不限制
+        self.max_input_tokens = config.get("max_input_tokens")
+        self.token_counter = TokenCounter(self.model_name)
+        # 记录每次调用的 token 使用情况
+        self.usage_history = []
         # Get API key from environment variables (loaded from .env file)
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
@@ -70,7 +95,7 @@ class BaseAssistant:
         self.client = OpenAI(api_key=api_key)
 
     def _get_db(self):
-        db = SessionLocal()
+        db = SyncSessionLocal()
         try:
             yield db
         finally:
@@ -80,12 +105,26 @@ class BaseAssistant:
         return self._get_response(publication=publication, prompt=self.prompt)
 
     def ask_question(self, publication: Publication, prompt: str) -> dict:
-        # 追问更多问题
+        # 追问更多问题：只附带与问题相关的论文片段，而不是重新发送截断的全文
+        if self.max_input_tokens:
+            budget = (
+                self.max_input_tokens
+                - self.token_counter.count(self.instruction)
+                - self.token_counter.count(prompt)
+            )
+        else:
+            budget = CHUNK_EXCERPT_TOKENS
+        excerpts = paper_chunk_store.excerpts(publication.paper_id, prompt, budget)
+        if excerpts:
+            prompt = f"{prompt}\n\nRelevant excerpts from the paper:\n{excerpts}"
         return self._get_response(publication=publication, prompt=prompt)
 
-    def _get_response(self, publication: Publication, prompt: str) -> dict:
+    def _get_response(
+        self, publication: Publication, prompt: str, shared_context: str = None
+    ) -> dict:
         max_retries = 2  # 允许重试2次
-        cached_response = cache.get(prompt)
+        cache_key = f"{shared_context}\n{prompt}" if shared_context else prompt
+        cached_response = cache.get(cache_key)
         if cached_response:
             logger.info(f"!!biggo!!Cached response return: {cached_response}")
             return cached_response
@@ -96,13 +135,14 @@ class BaseAssistant:
                 response = self.client.responses.create(
                     model=self.model_name,
                     instructions=self.instruction,
-                    input=prompt,
+                    input=self._build_input(prompt, shared_context),
                     max_output_tokens=10000,  # TODO: 这里可以根据实际需要调整,开发阶段，限制长度
                 )
+                self._record_usage(response)
                 # 解析并返回结果
                 result = self._parse_response(response)
                 # TODO: 优化它
-                cache.set(prompt=prompt, response=result)
+                cache.set(prompt=cache_key, response=result)
                 return result
             except ValueError as ve:
                 logger.error(
@@ -117,6 +157,39 @@ class BaseAssistant:
         logger.error(f"Attempt {attempt + 1} failed. Exit with error!!!")
         return None
 
+    def _build_input(self, prompt: str, shared_context: str = None):
+        """
+        组装请求的 input。供应商的 prompt 缓存按前缀匹配，所以顺序是：
+        固定的 instruction（通过 instructions 参数，最先发送）-> 共享上下文 -> 每篇论文各不相同的内容。
+        """
+        if not shared_context:
+            return prompt
+        return [
+            {"role": "user", "content": shared_context},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _record_usage(self, response) -> dict:
+        """
+        记录本次调用的 token 使用情况（来自 response.usage），包括命中前缀缓存的 input token 数
+        """
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        input_details = getattr(usage, "input_tokens_details", None)
+        cached_tokens = getattr(input_details, "cached_tokens", 0) or 0
+        record = {
+            "assistant": self.name,
+            "model": self.model_name,
+            "input_tokens": input_tokens,
+            "cached_input_tokens": cached_tokens,
+            "uncached_input_tokens": input_tokens - cached_tokens,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        }
+        self.usage_history.append(record)
+        logger.info(f"Token usage of [{self.name}]: {record}")
+        return record
+
     def _load_domain_sota_knowledge(self, publication: Publication) -> str:
         if publication.research_topics:
             keywords = publication.research_topics
@@ -228,7 +301,7 @@ class TraigeAssistant(BaseAssistant):
         self.prompt = config.get("prompt")
         self.instruction = config.get("instruction")
 
-    def do_work(self, publication, context):
+    def do_work(self, publication, context, section_chunks=None):
         """ "
         论文标题：{title}
         关键字：{keywords}
@@ -237,20 +310,47 @@ class TraigeAssistant(BaseAssistant):
         文章全文：{full_text}
         为了帮助你更好地回答问题，以下是一些该领域的前沿研究成果（SOTA）：
         {sota_context}
+
+        full_text 不再按字符硬截断，而是在 max_input_tokens 的预算内，
+        按 PaperReviewConfig.SECTION_PRIORITY 的章节优先级填充
         """
-        # get the sota context
-        sota_context = self._load_domain_sota_knowledge(publication)
-        # build the prompt
-        prompt = self.prompt.format(
+        # get the sota context, 作为共享上下文放在论文信息之前
+        shared_context = self.shared_context.format(
+            sota_context=self._load_domain_sota_knowledge(publication)
+        )
+        prompt_fields = dict(
             title=publication.title,
             keywords=publication.research_topics,
             abstract=publication.abstract,
             conclusion=publication.conclusion,
-            full_text=publication.content_raw_text[:10000],  # TODO测试阶段，限制长度
-            sota_context=sota_context,
         )
-        logger.info(f"Prompt for Triage Assistant: {prompt[:200]}")
-        return self._get_response(publication=publication, prompt=prompt)
+        # 先算出除全文以外的 prompt 占用了多少 token，剩下的预算留给全文
+        base_tokens = (
+            self.token_counter.count(self.instruction)
+            + self.token_counter.count(shared_context)
+            + self.token_counter.count(self.prompt.format(full_text="", **prompt_fields))
+        )
+        if self.max_input_tokens:
+            full_text_budget = max(0, self.max_input_tokens - base_tokens)
+        else:
+            full_text_budget = self.token_counter.count(publication.content_raw_text)
+        if not section_chunks:
+            # 没有识别出章节时，把全文当成一个章节
+            section_chunks = {"body": (publication.content_raw_text or "").split("\n")}
+        full_text = pack_sections_by_priority(
+            section_chunks,
+            priority=PaperReviewConfig.SECTION_PRIORITY,
+            budget=full_text_budget,
+            counter=self.token_counter,
+        )
+        # build the prompt
+        prompt = self.prompt.format(full_text=full_text, **prompt_fields)
+        logger.info(
+            f"Prompt for Triage Assistant ({base_tokens} + {self.token_counter.count(full_text)} tokens): {prompt[:200]}"
+        )
+        return self._get_response(
+            publication=publication, prompt=prompt, shared_context=shared_context
+        )
 
 
 class DomainExpertReviewAssistant(BaseAssistant):
@@ -262,14 +362,9 @@ class DomainExpertReviewAssistant(BaseAssistant):
         self.instruction = config.get("instruction")
 
     def do_work(self, publication, traige_summary, previous_review_json) -> dict:
-        # update the instruction, TODO： 感觉应该有更好的地方来处理这个逻辑
-        if self.name == AIAssistantType.REVIEWER_GENERAL:
-            self.instruction = self.instruction.format(
-                domain=publication.research_topics
-            )
-        else:
-            # 如果是domain的专家，请专家自己来加载他的专业领域知识, TODO: 待补充考虑，现在直接pass
-            pass
+        # instruction 保持不变（不再按论文填入 domain），这样多篇论文之间 prompt 前缀一致，可以命中供应商的前缀缓存。
+        # 论文的领域信息通过 prompt 里的 Keywords 传入
+        # 如果是domain的专家，请专家自己来加载他的专业领域知识, TODO: 待补充考虑
         # build the prompt
         if not traige_summary:
             traige_summary = "I dont have enough context, please try your best."
@@ -291,6 +386,27 @@ class DomainExpertReviewAssistant(BaseAssistant):
         return self._get_response(publication=publication, prompt=prompt)
 
 
+class PreScreenAssistant(BaseAssistant):
+    def __init__(self, config: dict):
+        super().__init__(config)
+        self.name = config.get("name")
+        self.model_name = config.get("model_name")
+        self.prompt = config.get("prompt")
+        self.instruction = config.get("instruction")
+
+    def do_work(self, paper: ArxivPaper) -> dict:
+        """
+        只根据标题、分类和摘要给论文打一个粗略的预筛分数，不下载也不解析 PDF
+        """
+        prompt = self.prompt.format(
+            title=paper.title,
+            categories=", ".join(paper.categories or []),
+            abstract=paper.summary,
+        )
+        logger.info(f"Prompt for PreScreen Assistant: {prompt[:200]}")
+        return self._get_response(publication=None, prompt=prompt)
+
+
 class DailyReportAssistant(BaseAssistant):
     def __init__(self, config: dict):
         super().__init__(config)
@@ -322,6 +438,7 @@ class AIAssistantType(Enum):
     DOMAIN_REVIEWER_CHIP = "domain_reviewer_chip"
     DOMAIN_REVIEWER_NETWORK = "domain_reviewer_network"
     DAILY_REPORT_SUMMARY = "daily_report_summary"
+    PAPER_PRESCREEN = "paper_prescreen"
     # xxx_domain 可以注入更多定制化的专家
 
 
@@ -383,6 +500,23 @@ class PaperReviewConfig:
         },
     }
 
+    # 按 token 预算填充全文时的章节优先级，越靠前越优先放入 prompt。
+    # abstract/conclusion 已经作为单独字段放入 prompt，这里不再重复；
+    # references/acknowledgments 对评审没有帮助，不放入；front_matter 是第一个标题之前的内容（标题、作者、机构）
+    SECTION_PRIORITY = [
+        "front_matter",
+        "methodology",
+        "results",
+        "experiment",
+        "introduction",
+        "ablation",
+        "limitations",
+        "summary",
+        "body",
+        "related_work",
+        "appendix",
+    ]
+
     # 论文拆分参数
     MAX_LINE_PER_CHUNK = 25  # 每个 chunk 最大行数
     OVERLAP_LINES = 5  # 上下文重叠行数
@@ -390,6 +524,10 @@ class PaperReviewConfig:
 
     GPT_MODEL_NAME = "gpt-4o-mini"
 
+    # 预筛：只用标题和摘要打分，低于阈值的论文不再进入完整的评审流程（下载 PDF、triage、专家评审）
+    PRESCREEN_ENABLED = True
+    PRESCREEN_THRESHOLD = 4.0
+
     ai_assistants_config = {
         AIAssistantType.TOPIC_SUMMARY: {
             "name": "topic_summary",
@@ -398,13 +536,7 @@ class PaperReviewConfig:
                             1. **Core Keywords:** Summarize the key technical terms that encapsulate the main themes of the paper.
                             2. **Research Topics:** Identify the top 3 specific research topics or directions that the paper addresses. These topics should be more detailed and specific than the keywords. For example, if a keyword is "cache," a more specific research topic might be "compression methods for key-value caches."
                             Return your answer strictly in JSON format, with no extra text or annotations.""",
-            "prompt": """Please evaluate the following research paper information and extract the required details:
-                    Paper Information:
-                    Title: {title}
-                    Keywords: {keywords}
-                    Abstract: {abstract}
-                    Conclusion: {conclusion}
-                    Based on the above information, please extract:
+            "prompt": """Please evaluate the research paper information given at the end and extract the required details:
                     1. Core Keywords (i.e., the key technical terms that summarize the paper's main themes).
                     2. The Top 3 specific research topics or directions that the paper addresses.
 
@@ -415,11 +547,18 @@ class PaperReviewConfig:
                     {{
                         "keywords": ["keyword1", "keyword2", "keyword3", ...],
                         "research_topics": ["research_topic1", "research_topic2", "research_topic3"]
-                    }}""",
+                    }}
+
+                    Paper Information:
+                    Title: {title}
+                    Keywords: {keywords}
+                    Abstract: {abstract}
+                    Conclusion: {conclusion}""",
         },
         AIAssistantType.PAPER_TRIAGE: {
             "name": "paper_triage",
             "model_name": "gpt-4o-mini",
+            "max_input_tokens": 6000,
             "instruction": """You are a seasoned academic paper reviewer, well-versed in the cutting-edge research trends in both academia and industry. I will provide you with the core information of a research paper—including its title, keywords, abstract, conclusion, and author details.
 
                     Based on this information, please analyze and answer the following six questions systematically:
@@ -447,28 +586,28 @@ class PaperReviewConfig:
                     }},
                     "influence_assessment": "Provide a detailed assessment of the academic or industrial influence of the authors and their institutions."
                     }}""",
+            # 该领域的 SOTA 背景知识，作为共享上下文放在论文信息之前
+            "shared_context": """For additional context, here are some state-of-the-art (SOTA) research outcomes in this field:
+                        {sota_context}""",
             "prompt": """Please evaluate the following research paper based on the instruction above. Use the paper’s core information to answer each of the six questions in detail, ensuring that your response is comprehensive and precise.
 
+                        Requirements:
+                        - Return your response strictly in the JSON format as specified in the instruction.
+                        - Do not include any extra text or markdown formatting.
+                        - Ensure that the JSON is syntactically correct and can be parsed by a machine.
+
                         Paper Information:
                         Title: {title}
                         Keywords: {keywords}
                         Abstract: {abstract}
                         Conclusion: {conclusion}
                         Full Text: {full_text}
-                        
-                        For additional context, here are some state-of-the-art (SOTA) research outcomes in this field:
-                        {sota_context}
-
-                        Requirements:
-                        - Return your response strictly in the JSON format as specified in the instruction.
-                        - Do not include any extra text or markdown formatting.
-                        - Ensure that the JSON is syntactically correct and can be parsed by a machine.
                         """,
         },
         AIAssistantType.REVIEWER_GENERAL: {
             "name": "reviewer_general",
             "model_name": "gpt-4o-mini",
-            "instruction": """You are a seasoned expert in {domain}. You will receive the core information of a research paper, including the title, keywords (if available), abstract, and conclusion. Based on this information and the provided background context, you are required to evaluate the paper on the following five dimensions. All scores should be on a scale from 1.0 to 10.0 (scores may include up to two decimal places), where 10.0 represents the best performance. Please strictly adhere to the provided paper content and context to ensure a fair and unbiased evaluation.
+            "instruction": """You are a seasoned expert in the research domain of the paper, as described by its keywords and research topics. You will receive the core information of a research paper, including the title, keywords (if available), abstract, and conclusion. Based on this information and the provided background context, you are required to evaluate the paper on the following five dimensions. All scores should be on a scale from 1.0 to 10.0 (scores may include up to two decimal places), where 10.0 represents the best performance. Please strictly adhere to the provided paper content and context to ensure a fair and unbiased evaluation.
                         For each of the five dimensions, please provide a detailed answer of approximately 300 words or more, explaining your reasoning thoroughly.
                         1. **Technical Innovation:** Evaluate the novelty of the method compared to existing solutions. For instance, determine whether the paper introduces a completely new mechanism or replaces traditional components with an entirely new architecture. If the work opens up a new direction or shifts community focus to a new research paradigm, a high score (above 8.0) is warranted.
                         2. **Performance Improvement:** Examine the experimental results on recognized benchmark datasets and compare them with the best previously published results. A significant improvement in key metrics should result in a high score. Consider whether the improvements are consistent across multiple tasks or datasets, demonstrating both general applicability and strong performance gains.
@@ -491,18 +630,49 @@ class PaperReviewConfig:
                             "who_should_read": "Target audience description. "
                             "confidence": 0.85
                         }}""",
-            "prompt": """Please evaluate the following research paper based on the instruction provided above. Provide detailed responses for each of the evaluation dimensions, with each explanation being around 300 words or more, so that the answer is thoroughly justified.：
+            "prompt": """Please evaluate the following research paper based on the instruction provided above. Provide detailed responses for each of the evaluation dimensions, with each explanation being around 300 words or more, so that the answer is thoroughly justified.
+                        Based on the paper information below, perform your evaluation according to the instruction, and return your answer strictly in the JSON format shown in the instruction. Do not include any additional text or Markdown formatting.：
                         Paper Information:
                         Title: {title}
                         Keywords: {keywords}
                         Abstract: {abstract}
                         Conclusion: {conclusion}
-                        Additional Summary/QA: {traige_summary}
-                        Based on the above information, perform your evaluation according to the instruction, and return your answer strictly in the JSON format shown in the instruction. Do not include any additional text or Markdown formatting.""",
+                        Additional Summary/QA: {traige_summary}""",
         },
         AIAssistantType.DOMAIN_REVIEWER_ALGORITHM: {
             "name": "domain_reviewer_algorithm",
             "model_name": "gpt-4o-mini",
+            # 专家路由：arXiv 分类或研究课题命中其一，才会调用该专家
+            "arxiv_categories": {
+                "cs.AI",
+                "cs.CL",
+                "cs.CV",
+                "cs.DS",
+                "cs.IR",
+                "cs.LG",
+                "cs.NE",
+                "cs.SE",
+                "cs.PL",
+                "stat.ML",
+            },
+            "topic_keywords": {
+                "algorithm",
+                "optimization",
+                "neural network",
+                "deep learning",
+                "machine learning",
+                "reinforcement learning",
+                "transformer",
+                "attention",
+                "llm",
+                "language model",
+                "diffusion",
+                "training",
+                "inference",
+                "quantization",
+                "compiler",
+                "software",
+            },
             "instruction": """You are a seasoned expert in the field of Computer Software and Algorithm Research, with extensive experience in reviewing academic papers. You have received the core information of a research paper along with preliminary scores provided by a general AI Reviewer for your reference.
 
                         Please follow these steps:
@@ -547,6 +717,15 @@ class PaperReviewConfig:
                         }}""",
             "prompt": """Please evaluate the following research paper based on the instruction provided above. You have been given the paper's core information along with the preliminary scores from the general AI Reviewer.
 
+                        Instructions:
+                        - First, determine if the paper is relevant to your domain (Computer Software and Algorithm Research).  
+                        - If it is not relevant, simply return the preliminary scores, appending a confidence value (for example, 0.4) to indicate that the paper is outside your domain.
+                        - If the paper is relevant, carefully review the preliminary scores and adjust them slightly only if necessary. Avoid large changes unless absolutely required, and provide brief reasons for any modifications.
+                        - Also, confirm or update the recommendation and the intended readership.
+                        - Finally, assign an overall confidence level (from 0.0 to 1.0) to your evaluation.
+
+                        Return your response strictly in the JSON format shown in the instruction (do not include any additional text or Markdown formatting)
+
                         Paper Information:
                         Title: {title}
                         Keywords: {keywords}
@@ -555,20 +734,34 @@ class PaperReviewConfig:
                         Additional Summary/QA: {traige_summary}
 
                         Preliminary Scores (for reference):
-                        {previous_review_json}
-                        
-                        Instructions:
-                        - First, determine if the paper is relevant to your domain (Computer Software and Algorithm Research).  
-                        - If it is not relevant, simply return the preliminary scores, appending a confidence value (for example, 0.4) to indicate that the paper is outside your domain.
-                        - If the paper is relevant, carefully review the preliminary scores and adjust them slightly only if necessary. Avoid large changes unless absolutely required, and provide brief reasons for any modifications.
-                        - Also, confirm or update the recommendation and the intended readership.
-                        - Finally, assign an overall confidence level (from 0.0 to 1.0) to your evaluation.
-
-                        Return your response strictly in the following JSON format (do not include any additional text or Markdown formatting)""",
+                        {previous_review_json}""",
         },
         AIAssistantType.DOMAIN_REVIEWER_ARCHITECT: {
             "name": "domain_reviewer_architect",
             "model_name": "gpt-4o-mini",
+            "arxiv_categories": {"cs.AR", "cs.DC", "cs.ET", "cs.OS", "cs.PF"},
+            "topic_keywords": {
+                "accelerator",
+                "hardware",
+                "microarchitecture",
+                "architecture design",
+                "gpu",
+                "tpu",
+                "npu",
+                "fpga",
+                "asic",
+                "chip",
+                "memory hierarchy",
+                "kv cache",
+                "cache",
+                "dataflow",
+                "systolic",
+                "processing-in-memory",
+                "energy efficiency",
+                "interconnect",
+                "distributed training",
+                "cluster",
+            },
             "instruction": """You are a seasoned expert in the field of Computer Architecture, with extensive experience in reviewing academic papers and assessing state-of-the-art research in hardware design, microarchitecture, and system performance. You have received the core information of a research paper along with preliminary scores provided by a general AI Reviewer for your reference.
 
                         Please follow these steps:
@@ -614,6 +807,15 @@ class PaperReviewConfig:
                         }}""",
             "prompt": """Please evaluate the following research paper based on the instruction provided above. You have been given the paper's core information along with the preliminary scores from the general AI Reviewer.
 
+                        Instructions:
+                        - First, determine if the paper is relevant to your domain (Computer Software and Algorithm Research).  
+                        - If it is not relevant, simply return the preliminary scores, appending a confidence value (for example, 0.4) to indicate that the paper is outside your domain.
+                        - If the paper is relevant, carefully review the preliminary scores and adjust them slightly only if necessary. Avoid large changes unless absolutely required, and provide brief reasons for any modifications.
+                        - Also, confirm or update the recommendation and the intended readership.
+                        - Finally, assign an overall confidence level (from 0.0 to 1.0) to your evaluation.
+
+                        Return your response strictly in the JSON format shown in the instruction (do not include any additional text or Markdown formatting)
+
                         Paper Information:
                         Title: {title}
                         Keywords: {keywords}
@@ -622,18 +824,31 @@ class PaperReviewConfig:
                         Additional Summary/QA: {traige_summary}
 
                         Preliminary Scores (for reference):
-                        {previous_review_json}
-                        
-                        Instructions:
-                        - First, determine if the paper is relevant to your domain (Computer Software and Algorithm Research).  
-                        - If it is not relevant, simply return the preliminary scores, appending a confidence value (for example, 0.4) to indicate that the paper is outside your domain.
-                        - If the paper is relevant, carefully review the preliminary scores and adjust them slightly only if necessary. Avoid large changes unless absolutely required, and provide brief reasons for any modifications.
-                        - Also, confirm or update the recommendation and the intended readership.
-                        - Finally, assign an overall confidence level (from 0.0 to 1.0) to your evaluation.
-
-                        Return your response strictly in the following JSON format (do not include any additional text or Markdown formatting)""",
+                        {previous_review_json}""",
         },
         # TODO: 其他领域的评审助手配置
+        AIAssistantType.PAPER_PRESCREEN: {
+            "name": "paper_prescreen",
+            "model_name": "gpt-4o-mini",
+            "instruction": """You are a fast first-pass screener for a daily research paper digest. Readers are researchers and engineers working on AI algorithms, AI systems, computer architecture, AI chips, networking and large-scale clusters.
+                    You only see the title, arXiv categories and abstract of a paper. Based on this information alone, quickly estimate:
+                    1. **Relevance:** How relevant the paper is to the readers' fields (0.0 = unrelated, 10.0 = core topic).
+                    2. **Quality:** How substantial the contribution looks (new method, strong results, solid evaluation) versus incremental, survey-only or weakly supported work (0.0 = very weak, 10.0 = outstanding).
+                    3. **Score:** An overall screening score from 0.0 to 10.0 combining relevance and quality. Papers that are clearly irrelevant or weak should receive a low score.
+                    Be decisive and brief. Return your answer strictly in JSON format, with no extra text or annotations.""",
+            "prompt": """Please screen the following research paper:
+                    Title: {title}
+                    arXiv Categories: {categories}
+                    Abstract: {abstract}
+
+                    Return your answer strictly in the following JSON format, ensuring it is syntactically correct and contains no additional text or annotations:
+                    {{
+                        "relevance": 6.5,
+                        "quality": 7.0,
+                        "score": 6.8,
+                        "reason": "One or two sentences explaining the score."
+                    }}""",
+        },
         AIAssistantType.DAILY_REPORT_SUMMARY: {
             "name": "daily_report_summary",
             "model_name": "gpt-4o",
@@ -683,6 +898,64 @@ class PaperReviewConfig:
     }
 
 
+class DomainExpertRouter:
+    """
+    在调用任何领域专家之前，先用 arXiv 分类和研究课题做一次廉价的相关性判断，
+    只把论文交给相关领域的专家，跳过和论文无关的专家（它们只会原样返回初评分数，白白浪费一次 LLM 调用）。
+    没有配置 arxiv_categories/topic_keywords 的专家视为通用专家，总是会被调用。
+    """
+
+    def __init__(self, expert_configs: Dict[AIAssistantType, dict]):
+        self.expert_configs = expert_configs
+        self.keyword_patterns = {}
+        for assistant_type, config in expert_configs.items():
+            keywords = config.get("topic_keywords") or set()
+            if keywords:
+                self.keyword_patterns[assistant_type] = re.compile(
+                    r"\b(?:"
+                    + "|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))
+                    + r")\b",
+                    re.IGNORECASE,
+                )
+
+    def route(
+        self, publication: Publication, categories: List[str] = None
+    ) -> Tuple[List[AIAssistantType], List[AIAssistantType]]:
+        """
+        返回 (需要调用的专家, 被跳过的专家)
+        """
+        paper_categories = set(categories or [])
+        topic_text = " ".join(
+            self._as_text(value)
+            for value in (
+                publication.research_topics,
+                publication.keywords,
+                publication.title,
+            )
+        )
+        selected, skipped = [], []
+        for assistant_type, config in self.expert_configs.items():
+            expert_categories = config.get("arxiv_categories") or set()
+            pattern = self.keyword_patterns.get(assistant_type)
+            if not expert_categories and not pattern:
+                selected.append(assistant_type)
+            elif paper_categories & expert_categories:
+                selected.append(assistant_type)
+            elif pattern and pattern.search(topic_text):
+                selected.append(assistant_type)
+            else:
+                skipped.append(assistant_type)
+        return selected, skipped
+
+    @staticmethod
+    def _as_text(value) -> str:
+        if not value:
+            return ""
+        if isinstance(value, (list, tuple, set)):
+            return " ".join(str(v) for v in value)
+        return str(value)
+
+
 class ReviewArxivPaper:
     """
     1. 初始化 OpenAI 客户端，会多次发送请求
@@ -691,14 +964,40 @@ class ReviewArxivPaper:
     4. 定义 5 个不同的 AI 助手，基于文本，对论文开始打分
     """
 
-    def __init__(self):
+    def __init__(self, progress_callback=None):
         """
         初始化 OpenAI 客户端
+        progress_callback(event, paper_id=None, **data): 可选，每完成一个评审阶段回调一次，用于推送进度
         """
         self.client = OpenAI()
+        self.progress_callback = progress_callback
+        # 批处理期间累计的 token 使用情况（多线程共享）
+        self.token_usage_lock = threading.Lock()
+        self.token_usage = {"input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
+        self.calls = 0
+        # 关键词哈希表只建一次，所有论文共用
+        self.section_title_matcher = SectionTitleMatcher(PaperReviewConfig.SECTION_TITLES)
+        self.chunker = PaperChunker(
+            self.section_title_matcher,
+            TokenCounter(PaperReviewConfig.GPT_MODEL_NAME),
+            max_lines=PaperReviewConfig.MAX_LINE_PER_CHUNK,
+            overlap_lines=PaperReviewConfig.OVERLAP_LINES,
+            reference_block_size=PaperReviewConfig.REFERENCE_BLOCK_SIZE,
+        )
+
+    def _emit(self, event: str, paper_id: str = None, **data):
+        """
+        发布评审阶段事件，回调出错不能影响评审本身
+        """
+        if not self.progress_callback:
+            return
+        try:
+            self.progress_callback(event, paper_id=paper_id, **data)
+        except Exception as e:
+            logger.warning(f"Failed to publish review progress event {event}: {e}")
 
     def _get_db(self):
-        db = SessionLocal()
+        db = SyncSessionLocal()
         try:
             yield db
         finally:
@@ -711,20 +1010,49 @@ class ReviewArxivPaper:
         logger.info(f"Processing paper: “{paper.title}”")
         db = None
         try:
+            # 0. 预筛：只看标题和摘要，分数太低的论文直接记录简化评审并结束
+            if PaperReviewConfig.PRESCREEN_ENABLED:
+                prescreen = self._prescreen_paper(paper)
+                if (
+                    prescreen
+                    and prescreen.get("score", 10.0)
+                    < PaperReviewConfig.PRESCREEN_THRESHOLD
+                ):
+                    db = next(self._get_db())
+                    score = self._save_prescreen_review(db, paper, prescreen)
+                    self._emit(
+                        "final_score",
+                        paper.arxiv_id,
+                        review_status=score.review_status,
+                        prescreen_score=score.prescreen_score,
+                        recommend=score.recommend,
+                    )
+                    return score
+                self._emit(
+                    "prescreen",
+                    paper.arxiv_id,
+                    passed=True,
+                    score=prescreen.get("score") if prescreen else None,
+                )
 
-            # 检查 PDF 是否已经下载
-            full_path, relative_path = self._get_pdf_path(paper)
-            if not self._is_pdf_downloaded(paper):
+            # 检查 PDF 是否已经下载（看论文行上的存储状态，不访问文件系统）
+            if self._is_pdf_downloaded(paper):
+                pdf_sha256 = paper.pdf_sha256
+            else:
                 logger.info(f"PDF not downloaded, downloading now: {paper.pdf_url}")
-                full_path, relative_path = self._download_pdf(paper)
-
-            if not full_path or not relative_path:
-                logger.error(f"Failed to locate the PDF for paper: {paper.title}")
-                return None
+                download_result = self._download_pdf(paper)
+                if not download_result:
+                    logger.error(f"Failed to locate the PDF for paper: {paper.title}")
+                    self._emit("failed", paper.arxiv_id, error="PDF download failed")
+                    return None
+                pdf_sha256 = download_result.sha256
+            full_path, relative_path = pdf_store.blob_path(pdf_sha256)
             logger.info(f"Found the paper PDF file in: {relative_path}")
+            self._emit("pdf_fetched", paper.arxiv_id, pdf_path=relative_path)
 
             # 检查 Publication 是否已经存在
             db = next(self._get_db())
+            artifacts = None
             publication = (
                 db.query(Publication)
                 .filter(Publication.paper_id == paper.arxiv_id)
@@ -734,11 +1062,11 @@ class ReviewArxivPaper:
                 logger.info(
                     f"Publication not found in database, creating new entry for: {paper.title}"
                 )
-                # 1. 简单处理，去掉空行
-                text = self._parse_pdf_to_text(full_path)
-                text_lines = [line.strip() for line in text.split("\n") if line.strip()]
-                # 2. 论文的一些典型识别标题
-                title_indices = self._detect_section_titles(text_lines)
+                # 1~2. 解析 PDF、去掉空行、识别典型标题（同一个 PDF 解析过就直接用缓存）
+                artifacts = self._load_extraction_artifacts(full_path, pdf_sha256)
+                text = artifacts.text
+                text_lines = artifacts.lines
+                title_indices = artifacts.title_indices
                 # 3. 按标题拆分
                 section_chunks = self._split_to_chunks_by_title(
                     text_lines, title_indices
@@ -748,7 +1076,12 @@ class ReviewArxivPaper:
                     section_chunks.get("abstract", "")
                 )  # convert to string
                 conclusion_text = "\n".join(section_chunks.get("conclusion", ""))
-                references_text = "\n".join(section_chunks.get("references", ""))
+                # 按需抽取时 References 只抽到了第一页，先不保存，需要时由 load_reference_text 补全
+                references_text = (
+                    "\n".join(section_chunks.get("references", ""))
+                    if artifacts.is_complete
+                    else ""
+                )
                 if title_indices.get("refernces"):
                     # main context 取到 references 之前的所有内容
                     main_context = "\n".join(
@@ -791,14 +1124,40 @@ class ReviewArxivPaper:
                 logger.info(f"Saving publication to database: {publication.title}")
                 db.commit()
                 db.refresh(publication)
+                self.index_paper_chunks(publication, artifacts)
+                # 新论文的摘要在后台线程里向量化，供语义检索使用
+                semantic_search_index.schedule([publication.paper_id])
+                self._emit(
+                    "pdf_parsed",
+                    paper.arxiv_id,
+                    text_length=len(text),
+                    sections=sorted(title_indices.keys()),
+                )
 
-            # 然后交给评审打分
-            scores = self._review_paper_with_ai_experts(publication)
+            # 然后交给评审打分；重新评审时，章节划分也直接从缓存中取
+            if artifacts is None:
+                artifacts = extraction_cache.get(pdf_sha256)
+            section_chunks = None
+            if artifacts and artifacts.text == publication.content_raw_text:
+                section_chunks = self._get_section_chunks(
+                    artifacts.text, title_indices=artifacts.title_indices
+                )
+            scores = self._review_paper_with_ai_experts(
+                publication, categories=paper.categories, section_chunks=section_chunks
+            )
             db.add(publication)
             db.add(scores)
             db.commit()
 
             db.refresh(scores)
+            self._emit(
+                "final_score",
+                paper.arxiv_id,
+                review_status=scores.review_status,
+                weighted_score=scores.weighted_score,
+                recommend=scores.recommend,
+                ai_reviewer=scores.ai_reviewer,
+            )
             return scores
 
         except SQLAlchemyError as db_err:
@@ -806,10 +1165,12 @@ class ReviewArxivPaper:
             logger.error(
                 f"Database error occurred while processing paper “{paper.title}”: {db_err}"
             )
+            self._emit("failed", paper.arxiv_id, error=str(db_err))
         except Exception as e:
             logger.error(
                 f"An unexpected error occurred while processing paper “{paper.title}”: {e}"
             )
+            self._emit("failed", paper.arxiv_id, error=str(e))
         finally:
             if db:
                 db.close()
@@ -823,6 +1184,11 @@ class ReviewArxivPaper:
         # TODO: 一次处理50篇论文，试运行稳定后删除
         paper_list = paper_list[:50]
         results = []
+        if PDF_PREFETCH_ENABLED:
+            # review 线程主要在等 LLM，PDF 在后台按处理顺序提前下载
+            pdf_prefetcher.start_background(
+                [PrefetchItem.from_paper(paper) for paper in paper_list]
+            )
         # 使用线程池并发处理
         max_threads = 4  # 根据您的系统和任务需求调整线程数
         with ThreadPoolExecutor(max_threads) as executor:
@@ -831,13 +1197,20 @@ class ReviewArxivPaper:
                 executor.submit(self.process, paper): paper for paper in paper_list
             }
             # 等待所有任务完成
-            for future in as_completed(future_to_paper):
+            for completed, future in enumerate(as_completed(future_to_paper), 1):
                 paper = future_to_paper[future]
                 try:
                     results.append(future.result())  # 获取线程执行结果
                 except Exception as exc:
                     logger.error(f"{paper} 处理时发生异常: {exc}")
+                self._emit(
+                    "batch_progress",
+                    paper.arxiv_id,
+                    completed=completed,
+                    total=len(paper_list),
+                )
 
+        logger.info(f"Token usage of the batch: {self.get_token_usage_summary()}")
         return results
 
     def get_ai_daily_report(self, report_day: date, top_k: int, context: str) -> str:
@@ -856,28 +1229,90 @@ class ReviewArxivPaper:
         )
         return report_result
 
+    def _prescreen_paper(self, paper: "ArxivPaper") -> dict:
+        """
+        调用预筛助手，返回 {"relevance", "quality", "score", "reason", "usage"}，调用失败返回 None（按通过处理）
+        """
+        prescreen_config = PaperReviewConfig.ai_assistants_config[
+            AIAssistantType.PAPER_PRESCREEN
+        ]
+        prescreen_assistant = PreScreenAssistant(prescreen_config)
+        result = prescreen_assistant.do_work(paper)
+        if not result:
+            logger.warning(f"Prescreen failed for paper {paper.arxiv_id}, continue full review")
+            return None
+        try:
+            result["score"] = float(result.get("score", 10.0))
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid prescreen score for paper {paper.arxiv_id}: {result}")
+            return None
+        result["usage"] = self._format_token_usage([prescreen_assistant])
+        logger.info(f"Prescreen result of paper {paper.arxiv_id}: {result}")
+        return result
+
+    def _save_prescreen_review(
+        self, db, paper: "ArxivPaper", prescreen: dict
+    ) -> PaperScores:
+        """
+        预筛未通过：保存一条只包含元数据的 Publication 和一条简化的评审结果（不下载 PDF）
+        """
+        publication = (
+            db.query(Publication).filter(Publication.paper_id == paper.arxiv_id).first()
+        )
+        if not publication:
+            publication = Publication(
+                paper_id=paper.arxiv_id,
+                instance_id=0,  # 默认关联到一个非会议
+                title=self._clean_db_str_input(paper.title),
+                year=paper.published.strftime("%Y"),
+                publish_date=paper.published,
+                tldr="",
+                abstract=self._clean_db_str_input(paper.summary)[:5000],
+                conclusion="",
+                content_raw_text="",
+                reference_raw_text="",
+                pdf_path="",
+                citation_count=0,
+                award="",
+                doi="",
+                url="",
+                pdf_url=paper.pdf_url,
+                attachment_url="",
+            )
+            db.add(publication)
+            db.flush()
+
+        score = PaperScores(
+            paper_id=publication.paper_id,
+            title=publication.title,
+            prescreen_score=round(prescreen["score"], 2),
+            recommend=False,
+            recommend_reason=prescreen.get("reason", ""),
+            who_should_read="",
+            ai_reviewer=AIAssistantType.PAPER_PRESCREEN.value,
+            confidence_score=0.0,
+            review_status="prescreen_rejected",
+            error_message="",
+            log="\n".join(
+                [
+                    f"Prescreen score {prescreen['score']} (relevance={prescreen.get('relevance')}, "
+                    f"quality={prescreen.get('quality')}) is below threshold "
+                    f"{PaperReviewConfig.PRESCREEN_THRESHOLD}, full review skipped."
+                ]
+                + prescreen.get("usage", [])
+            ),
+        )
+        db.add(score)
+        db.commit()
+        db.refresh(score)
+        logger.info(
+            f"Paper {paper.arxiv_id} stopped at prescreen with score {prescreen['score']}"
+        )
+        return score
+
     def _detect_section_titles(self, lines):
         """检测标题行，返回标题行索引"""
-        title_indices = {}
-        section_num = 0  # 对于 summary、limitation 这类标题，可能在多个位置出现，需要全部保留。加一个编码，保证独立
-        for i, line in enumerate(lines):
-            clean_line = re.sub(r"[^a-zA-Z\s]", "", line).strip().lower()
-            for section, keywords in PaperReviewConfig.SECTION_TITLES.items():
-                if any(
-                    re.match(
-                        rf"^\s*(\d+([\.\-）]\d+)*[\.\-）]*\s*)?{re.escape(kw)}\s*$",
-                        clean_line,
-                        re.IGNORECASE,
-                    )
-                    for kw in keywords
-                ):
-                    if section in title_indices:
-                        title_indices[section + "_" + str(section_num)] = i
-                        section_num += 1
-                    else:
-                        title_indices[section] = i
-                    break
-        return title_indices
+        return self.section_title_matcher.detect(lines)
 
     def _split_to_chunks_by_title(self, lines, title_indices):
         """按照标题行分块"""
@@ -896,85 +1331,191 @@ class ReviewArxivPaper:
 
         return chunks
 
-    def _get_pdf_path(self, paper):
+    def _get_section_chunks(
+        self, text: str, title_indices: Dict[str, int] = None
+    ) -> Dict[str, List[str]]:
         """
-        根据论文信息生成对应的 PDF 存储路径。
-        假设 paper.date 是 'YYYY-MM-DD' 格式的字符串，paper.arxiv_id 是论文的唯一标识符。
+        把论文全文按标题拆分成章节，第一个标题之前的内容（标题、作者、机构）记为 front_matter。
+        title_indices 是已经识别好的标题行号（来自解析缓存），为空时重新识别
         """
-        try:
-            # 解析日期字符串
-            year = paper.published.strftime("%Y")
-            month = paper.published.strftime("%m")
-            # 构建相对路径
-            relative_path = f"./pdf/{year}/{month}/{paper.arxiv_id}.pdf"
-            # 从配置文件中获取 PDF 存储目录
-            data_storage_dir = get_data_storage_dir()
-            # 构建完整路径
-            full_path = data_storage_dir / relative_path
-
-            logger.info(f"search PDF relative path: {relative_path}")
-            # 如果目录不存在，则创建
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-
-        except Exception as e:
-            logger.error(f"Error generating PDF path: {e}")
-            raise e
-        # 返回 PDF 存储目录和文件路径
-        return str(full_path), str(relative_path)
+        text_lines = [line.strip() for line in (text or "").split("\n") if line.strip()]
+        if title_indices is None:
+            title_indices = self._detect_section_titles(text_lines)
+        section_chunks = {}
+        first_title_index = min(title_indices.values(), default=len(text_lines))
+        if first_title_index > 0:
+            section_chunks["front_matter"] = text_lines[:first_title_index]
+        section_chunks.update(self._split_to_chunks_by_title(text_lines, title_indices))
+        return section_chunks
+
+    def _format_token_usage(self, assistants: List[BaseAssistant]) -> List[str]:
+        """
+        把每个助手每次调用的 token 使用情况整理成日志行，最后一行是合计
+        """
+        lines = []
+        total = {"input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
+        for assistant in assistants:
+            for record in assistant.usage_history:
+                for key in total:
+                    total[key] += record[key]
+                lines.append(
+                    f"Token usage of {record['assistant']} ({record['model']}): "
+                    f"input={record['input_tokens']} (cached={record['cached_input_tokens']}), "
+                    f"output={record['output_tokens']}"
+                )
+        lines.append(
+            f"Token usage in total: input={total['input_tokens']} "
+            f"(cached={total['cached_input_tokens']}), output={total['output_tokens']}"
+        )
+        logger.info(lines[-1])
+        # 累加到批次统计，用来观察前缀缓存的命中率
+        with self.token_usage_lock:
+            self.calls += sum(len(a.usage_history) for a in assistants)
+            for key in total:
+                self.token_usage[key] += total[key]
+        return lines
+
+    def get_token_usage_summary(self) -> dict:
+        """
+        本实例（一次批处理）累计的 token 使用情况和前缀缓存命中率
+        """
+        with self.token_usage_lock:
+            summary = dict(self.token_usage, calls=self.calls)
+        summary["uncached_input_tokens"] = (
+            summary["input_tokens"] - summary["cached_input_tokens"]
+        )
+        summary["cache_hit_ratio"] = (
+            round(summary["cached_input_tokens"] / summary["input_tokens"], 4)
+            if summary["input_tokens"]
+            else 0.0
+        )
+        return summary
 
     def _is_pdf_downloaded(self, paper: "ArxivPaper") -> bool:
         """
-        检查论文的 PDF 是否已下载
+        检查论文的 PDF 是否已下载：PDF 入库时会在论文行上记录 sha256 和状态，这里只看论文行
         """
-        # 实现检查逻辑
-        logger.info(f"Checking if PDF is downloaded for paper: {paper.title}")
-        full_path, relative_path = self._get_pdf_path(paper)
-        logger.info(f"Checking if PDF exists at: {relative_path}")
-        return os.path.exists(full_path)
+        return paper.pdf_state == PdfState.stored.value and bool(paper.pdf_sha256)
 
-    def _download_pdf(self, paper: "ArxivPaper"):
+    def _download_pdf(self, paper: "ArxivPaper") -> PdfDownloadResult:
         """
-        下载论文的 PDF 并保存到指定路径。
+        下载论文的 PDF 并存入内容寻址存储（流式写入、断点续传、失败重试），失败返回 None
         """
-        full_path, relative_path = self._get_pdf_path(paper)
         try:
-            response = requests.get(paper.pdf_url, timeout=10)  # 设置超时时间为10秒
-            response.raise_for_status()  # 如果响应状态码不是 200，将引发 HTTPError 异常
-            with open(full_path, "wb") as f:
-                f.write(response.content)
-            logging.info(f"PDF downloaded and saved to {relative_path}")
-            return full_path, relative_path
-        except requests.HTTPError as http_err:
-            logging.error(f"HTTP error occurred while downloading PDF: {http_err}")
-        except ConnectionError as conn_err:
-            logging.error(
-                f"Connection error occurred while downloading PDF: {conn_err}"
-            )
-        except Timeout as timeout_err:
-            logging.error(
-                f"Timeout error occurred while downloading PDF: {timeout_err}"
-            )
-        except requests.RequestException as req_err:
-            logging.error(f"An error occurred while downloading PDF: {req_err}")
+            result = pdf_store.fetch_sync(paper.arxiv_id, paper.pdf_url, paper.published)
+            logger.info(f"PDF stored as {result.sha256}")
+            return result
+        except PdfDownloadError as download_err:
+            logger.error(f"Failed to download PDF: {download_err}")
         except IOError as io_err:
-            logging.error(f"File operation error: {io_err}")
+            logger.error(f"File operation error: {io_err}")
         return None
 
-    def _parse_pdf_to_text(self, pdf_path) -> str:
+    def _parse_pdf_to_text(self, pdf_path, lazy: bool = False) -> PdfText:
         """
-        解析 PDF 并将其转换为文本
+        解析 PDF 并将其转换为文本（带页偏移）。
+        lazy=True 时只抽取到 References 所在页为止，后面的参考文献和附录在需要时由 load_reference_text 抽取
         """
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            # print(page.number, page.get_text()[:20])
-            text += page.get_text()
+        # 抽取在进程池中执行，不占用 review 线程的 GIL
+        if lazy:
+            pdf_text = pdf_extraction_service.extract_until(
+                pdf_path, PaperReviewConfig.SECTION_TITLES["references"]
+            )
+        else:
+            pdf_text = pdf_extraction_service.extract(pdf_path)
         logger.info(
-            f"PDF parsed to text, page count{len(doc)}, text length: {len(text)}"
+            f"PDF parsed to text, page count{pdf_text.page_count}/{pdf_text.total_pages}, text length: {len(pdf_text.text)}"
         )
-        return text
+        return pdf_text
+
+    def _load_extraction_artifacts(
+        self, pdf_path, pdf_sha256: str
+    ) -> ExtractionArtifacts:
+        """
+        取 PDF 的解析结果：先查以 sha256 为键的缓存，没有再解析 PDF、识别章节并写入缓存
+        """
+        artifacts = extraction_cache.get(pdf_sha256)
+        if artifacts and (PDF_LAZY_EXTRACTION or artifacts.is_complete):
+            logger.info(f"Using cached extraction of PDF {pdf_sha256}")
+            return artifacts
+        pdf_text = self._parse_pdf_to_text(pdf_path, lazy=PDF_LAZY_EXTRACTION)
+        # 入库前会去掉 NUL 字符，这里按页先去掉，保证缓存的文本与 content_raw_text 一致
+        pages = [
+            self._clean_db_str_input(pdf_text.page_text(i))
+            for i in range(pdf_text.page_count)
+        ]
+        page_offsets = array(pdf_text.page_offsets.typecode, [0])
+        for page in pages:
+            page_offsets.append(page_offsets[-1] + len(page))
+        text = "".join(pages)
+        artifacts = ExtractionArtifacts(
+            text=text,
+            page_offsets=page_offsets,
+            line_spans=build_line_spans(text),
+            title_indices={},
+            total_pages=pdf_text.total_pages,
+        )
+        artifacts.title_indices = self._detect_section_titles(artifacts.lines)
+        extraction_cache.put(pdf_sha256, artifacts)
+        return artifacts
+
+    def index_paper_chunks(
+        self, publication: Publication, artifacts: ExtractionArtifacts = None
+    ) -> int:
+        """
+        把论文全文切分成重叠片段并保存，返回片段数。
+        解析缓存与 content_raw_text 一致时直接用缓存里的行位置、章节和页信息，否则从全文重新切分
+        """
+        text = publication.content_raw_text
+        if not text:
+            return 0
+        if artifacts and artifacts.text == text:
+            chunks = self.chunker.chunk(
+                text,
+                line_spans=artifacts.line_spans,
+                title_indices=artifacts.title_indices,
+                pdf_text=artifacts.pdf_text,
+            )
+        else:
+            chunks = self.chunker.chunk(text)
+        paper_chunk_store.save(publication.paper_id, chunks)
+        return len(chunks)
 
-    def _review_paper_with_ai_experts(self, publication: Publication) -> PaperScores:
+    def load_reference_text(self, publication: Publication, pdf_sha256: str = None) -> str:
+        """
+        按需取参考文献文本：按需抽取时 reference_raw_text 在入库时为空，
+        这里再抽取 References 所在页之后的内容，识别出参考文献章节后写回 publication（调用方负责提交）
+        """
+        if publication.reference_raw_text:
+            return publication.reference_raw_text
+        if not publication.pdf_path:
+            return ""
+        full_path = str(get_data_storage_dir() / publication.pdf_path)
+        artifacts = extraction_cache.get(pdf_sha256)
+        if artifacts:
+            head_text, head_pages = artifacts.text, artifacts.pdf_text.page_count
+        else:
+            head_text, head_pages = "", 0
+        tail = pdf_extraction_service.extract_pages(full_path, head_pages)
+        text = head_text + self._clean_db_str_input(tail.text)
+        text_lines = [line.strip() for line in text.split("\n") if line.strip()]
+        section_chunks = self._split_to_chunks_by_title(
+            text_lines, self._detect_section_titles(text_lines)
+        )
+        publication.reference_raw_text = self._clean_db_str_input(
+            "\n".join(section_chunks.get("references", ""))
+        )
+        logger.info(
+            f"Loaded references of {publication.paper_id} from page {head_pages}, length: {len(publication.reference_raw_text)}"
+        )
+        return publication.reference_raw_text
+
+    def _review_paper_with_ai_experts(
+        self,
+        publication: Publication,
+        categories: List[str] = None,
+        section_chunks: Dict[str, List[str]] = None,
+    ) -> PaperScores:
         """
         使用 OpenAI 接口分析文本，并根据不同标准进行评分
         """
@@ -989,6 +1530,7 @@ class ReviewArxivPaper:
             )
             topic_result = topic_summary_assistant.do_work(publication, context="")
             logger.info(f"Topic summary result: {topic_result}")
+            self._emit("topic_summary", publication.paper_id, result=topic_result)
 
             # 1. 让AI总结论文的几个关键问题, 以及答案，辅助推理
             if topic_result:
@@ -1004,11 +1546,17 @@ class ReviewArxivPaper:
                 context = (
                     f"Here are some key research topics: {publication.research_topics}"
                 )
-            traige_summary = traige_assistant.do_work(publication, context)
+            traige_summary = traige_assistant.do_work(
+                publication,
+                context,
+                section_chunks=section_chunks
+                or self._get_section_chunks(publication.content_raw_text),
+            )
             # save traige result
             if traige_summary:
                 publication.triage_qa = traige_summary
             logger.info(f"Triaging result: {traige_summary}")
+            self._emit("triage", publication.paper_id, succeeded=bool(traige_summary))
 
             # 2. 让AI 根据初步的信息来打分，自动检索相关核心问题的state of the art 研究成果作为补充判断
             reviwer_general = PaperReviewConfig.ai_assistants_config[
@@ -1032,9 +1580,25 @@ class ReviewArxivPaper:
             score = self._assign_score_values(score=score, json_score=init_score)
             score.review_status = "completed"
             logger.info(f"sucessfully init a score object: {score}")
+            self._emit(
+                "general_review",
+                publication.paper_id,
+                weighted_score=score.weighted_score,
+                confidence=score.confidence_score,
+            )
 
-            # 3: 遍历领域专家，对打分进行核查和修正
-            domain_reviwers = self._load_domain_review_assistants()
+            # 3: 遍历领域专家，对打分进行核查和修正。先路由，只调用和论文相关的专家
+            domain_reviwers, skipped_experts = self._load_domain_review_assistants(
+                publication, categories
+            )
+            if skipped_experts:
+                score.log = "\n".join(
+                    [
+                        score.log,
+                        f"Expert router skipped {len(skipped_experts)} domain expert call(s): "
+                        f"{', '.join(t.value for t in skipped_experts)}",
+                    ]
+                )
             for expert_name, expert_assistant in domain_reviwers.items():
                 logger.info(
                     f"Processing paper“ {publication.paper_id} ” with expert {expert_name}"
@@ -1076,6 +1640,26 @@ class ReviewArxivPaper:
                             f"Expert {expert_name} reviewed the paper but no valid score provided.",
                         ]
                     )
+                self._emit(
+                    "expert_review",
+                    publication.paper_id,
+                    expert=expert_assistant.name,
+                    confidence=expert_score.get("confidence") if expert_score else None,
+                    accepted=score.ai_reviewer == expert_assistant.name,
+                )
+
+            # 4. 汇总每次 LLM 调用的 token 使用情况
+            score.log = "\n".join(
+                [score.log]
+                + self._format_token_usage(
+                    [
+                        topic_summary_assistant,
+                        traige_assistant,
+                        reviewer_general_assistant,
+                        *domain_reviwers.values(),
+                    ]
+                )
+            )
 
             logger.info(
                 f"Congratulate, AI experts reviewed the paper and the final status are: {score.get_review_status()}"
@@ -1162,16 +1746,32 @@ class ReviewArxivPaper:
         return score
 
     def _load_domain_review_assistants(
-        self,
-    ) -> Dict[AIAssistantType, DomainExpertReviewAssistant]:
+        self, publication: Publication, categories: List[str] = None
+    ) -> Tuple[
+        Dict[AIAssistantType, DomainExpertReviewAssistant], List[AIAssistantType]
+    ]:
+        """
+        加载和论文相关的领域专家，返回 (专家助手, 被路由跳过的专家类型)
+        """
         assistants = {}
         # 只加载domain_xxx的专家。 TODO： 这里的逻辑可以再优化，当前简单按字符串过滤
-        for assistant_type, config in PaperReviewConfig.ai_assistants_config.items():
-            if not assistant_type.value.lower().startswith("domain_reviewer"):
-                continue
-            assistants[assistant_type] = DomainExpertReviewAssistant(config)
+        expert_configs = {
+            assistant_type: config
+            for assistant_type, config in PaperReviewConfig.ai_assistants_config.items()
+            if assistant_type.value.lower().startswith("domain_reviewer")
+        }
+        selected, skipped = DomainExpertRouter(expert_configs).route(
+            publication, categories
+        )
+        for assistant_type in selected:
+            assistants[assistant_type] = DomainExpertReviewAssistant(
+                expert_configs[assistant_type]
+            )
             logger.info(f"Loaded domain review assistants: {assistant_type}'")
-        return assistants
+        logger.info(
+            f"Expert router selected {len(selected)} and skipped {len(skipped)} domain expert(s) for paper {publication.paper_id}"
+        )
+        return assistants, skipped
 
     def _clean_db_str_input(self, text: str):
         if text is None:
@@ -0,0 +1,135 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+import json
+import logging
+import threading
+import uuid
+from typing import AsyncIterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 出现这些事件后，任务结束，事件流随之关闭
+TERMINAL_EVENTS = {"job_completed", "job_failed"}
+
+
+class ReviewJob:
+    def __init__(self, job_id: str, kind: str, paper_ids: List[str]):
+        self.job_id = job_id
+        self.kind = kind
+        self.paper_ids = paper_ids
+        self.events = []
+        self.subscribers = []  # [(event loop, asyncio.Queue)]
+        self.finished = False
+        self.created_at = datetime.now(timezone.utc)
+
+
+class ReviewProgressBroker:
+    """
+    评审进度的发布/订阅中心。
+
+    评审在线程池里同步执行，通过 publish 发布阶段事件（线程安全）；
+    SSE 接口在事件循环里通过 subscribe 订阅，先回放历史事件，再实时接收新事件，
+    所以客户端晚于任务开始连接也不会丢事件。
+    """
+
+    def __init__(self, max_jobs: int = 200):
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, ReviewJob]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def create_job(self, kind: str, paper_ids: List[str]) -> str:
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = ReviewJob(job_id, kind, paper_ids)
+            # 只保留最近的 max_jobs 个任务，优先淘汰已结束的
+            while len(self.jobs) > self.max_jobs:
+                finished = next(
+                    (jid for jid, job in self.jobs.items() if job.finished), None
+                )
+                self.jobs.pop(finished or next(iter(self.jobs)))
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[ReviewJob]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def publish(self, job_id: str, event: str, paper_id: str = None, **data):
+        """发布一个阶段事件，可以在任意线程中调用"""
+        payload = {
+            "event": event,
+            "job_id": job_id,
+            "paper_id": paper_id,
+            "time": datetime.now(timezone.utc).isoformat(),
+            "data": data,
+        }
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job:
+                return
+            job.events.append(payload)
+            if event in TERMINAL_EVENTS:
+                job.finished = True
+            subscribers = list(job.subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, payload)
+            except RuntimeError:
+                # 订阅者的事件循环已经关闭
+                pass
+
+    def callback_for(self, job_id: str):
+        """生成给 ReviewArxivPaper 使用的进度回调"""
+
+        def _callback(event: str, paper_id: str = None, **data):
+            self.publish(job_id, event, paper_id=paper_id, **data)
+
+        return _callback
+
+    async def subscribe(
+        self, job_id: str, keepalive_seconds: float = 15.0
+    ) -> AsyncIterator[Optional[dict]]:
+        """
+        订阅任务事件：先回放历史，再等待新事件，直到任务结束。
+        长时间没有事件时 yield None，调用方可以借此发送心跳。
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job:
+                return
+            history = list(job.events)
+            finished = job.finished
+            if not finished:
+                job.subscribers.append((loop, queue))
+        try:
+            for payload in history:
+                yield payload
+            if finished:
+                return
+            while True:
+                try:
+                    payload = await asyncio.wait_for(
+                        queue.get(), timeout=keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield payload
+                if payload["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self.lock:
+                if (loop, queue) in job.subscribers:
+                    job.subscribers.remove((loop, queue))
+
+
+def format_sse(payload: Optional[dict]) -> str:
+    """把事件格式化为 text/event-stream 报文，None 表示心跳"""
+    if payload is None:
+        return ": keepalive\n\n"
+    return f"event: {payload['event']}\ndata: {json.dumps(payload, default=str, ensure_ascii=False)}\n\n"
+
+
+review_progress = ReviewProgressBroker()
@@ -0,0 +1,46 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+# 标题识别前先去掉非字母字符（编号、标点），只保留字母和空白
+_NON_LETTER = re.compile(r"[^a-zA-Z\s]")
+
+
+class SectionTitleMatcher:
+    """
+    单遍的章节标题识别器。
+
+    原实现对每一行、每个关键词都拼一个正则去匹配（约 60 个关键词 × 行数）。
+    由于匹配前已经去掉了数字和标点，正则中可选的编号前缀只能匹配空串，
+    匹配条件等价于：清洗后的行（去首尾空白、转小写）与关键词的小写形式完全相等。
+    所以这里预先建好 关键词 -> 章节 的哈希表，每行只需清洗一次、查一次表。
+    同一个关键词出现在多个章节时，和原实现一样取 SECTION_TITLES 中靠前的章节。
+    """
+
+    def __init__(self, section_titles: Dict[str, Iterable[str]]):
+        self.keyword_sections: Dict[str, str] = {}
+        for section, keywords in section_titles.items():
+            for keyword in keywords:
+                self.keyword_sections.setdefault(keyword.lower(), section)
+
+    @staticmethod
+    def clean_line(line: str) -> str:
+        return _NON_LETTER.sub("", line).strip().lower()
+
+    def match(self, line: str) -> Optional[str]:
+        """返回该行对应的章节名，不是标题行返回 None"""
+        return self.keyword_sections.get(self.clean_line(line))
+
+    def detect(self, lines: List[str]) -> Dict[str, int]:
+        """检测标题行，返回 {章节名: 行号}，重复出现的章节加编号后缀"""
+        title_indices = {}
+        section_num = 0  # 对于 summary、limitation 这类标题，可能在多个位置出现，需要全部保留。加一个编码，保证独立
+        for i, line in enumerate(lines):
+            section = self.match(line)
+            if section is None:
+                continue
+            if section in title_indices:
+                title_indices[section + "_" + str(section_num)] = i
+                section_num += 1
+            else:
+                title_indices[section] = i
+        return title_indices
@@ -0,0 +1,405 @@
+import hashlib
+import logging
+from pathlib import Path
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import or_
+
+from config import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MAX_TOKENS,
+    EMBEDDING_MODEL_DIR,
+    EMBEDDING_THREADS,
+    SEMANTIC_INDEX_TYPE,
+    SEMANTIC_INDEX_URI,
+)
+from core.background_batch import BackgroundBatcher
+from database import SyncSessionLocal
+from models.tasks import PaperEmbedding, Publication
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticSearchUnavailable(RuntimeError):
+    """模型文件或依赖（onnxruntime / pymilvus）不可用"""
+
+
+def _is_punctuation(char: str) -> bool:
+    cp = ord(char)
+    if 33 <= cp <= 47 or 58 <= cp <= 64 or 91 <= cp <= 96 or 123 <= cp <= 126:
+        return True
+    return unicodedata.category(char).startswith("P")
+
+
+def _is_cjk(char: str) -> bool:
+    cp = ord(char)
+    return (
+        0x4E00 <= cp <= 0x9FFF
+        or 0x3400 <= cp <= 0x4DBF
+        or 0x20000 <= cp <= 0x2A6DF
+        or 0xF900 <= cp <= 0xFAFF
+    )
+
+
+class WordPieceTokenizer:
+    """
+    BERT 的 WordPiece 分词（小写、去重音、按标点切分，再按词表做最长匹配），
+    和 sentence-transformers 导出模型自带的 vocab.txt 配合使用，不需要额外安装 tokenizers
+    """
+
+    def __init__(self, vocab_path: Path, max_tokens: int, lowercase: bool = True):
+        with open(vocab_path, encoding="utf-8") as f:
+            self.vocab: Dict[str, int] = {
+                line.rstrip("\n"): i for i, line in enumerate(f) if line.strip()
+            }
+        self.max_tokens = max_tokens
+        self.lowercase = lowercase
+        self.unk_id = self.vocab["[UNK]"]
+        self.cls_id = self.vocab["[CLS]"]
+        self.sep_id = self.vocab["[SEP]"]
+        self.pad_id = self.vocab.get("[PAD]", 0)
+
+    def _basic_tokens(self, text: str) -> List[str]:
+        if self.lowercase:
+            text = unicodedata.normalize("NFD", text.lower())
+            text = "".join(c for c in text if unicodedata.category(c) != "Mn")
+        tokens = []
+        for word in text.split():
+            current = []
+            for char in word:
+                if _is_punctuation(char) or _is_cjk(char):
+                    if current:
+                        tokens.append("".join(current))
+                        current = []
+                    tokens.append(char)
+                else:
+                    current.append(char)
+            if current:
+                tokens.append("".join(current))
+        return tokens
+
+    def _wordpiece(self, word: str) -> List[int]:
+        if len(word) > 100:
+            return [self.unk_id]
+        ids, start = [], 0
+        while start < len(word):
+            end = len(word)
+            piece_id = None
+            while start < end:
+                piece = word[start:end] if start == 0 else "##" + word[start:end]
+                piece_id = self.vocab.get(piece)
+                if piece_id is not None:
+                    break
+                end -= 1
+            if piece_id is None:
+                return [self.unk_id]
+            ids.append(piece_id)
+            start = end
+        return ids
+
+    def encode(self, text: str) -> List[int]:
+        ids = []
+        for token in self._basic_tokens(text):
+            ids.extend(self._wordpiece(token))
+            if len(ids) >= self.max_tokens - 2:
+                break
+        return [self.cls_id, *ids[: self.max_tokens - 2], self.sep_id]
+
+    def encode_batch(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """返回补齐到批内最长长度的 input_ids 和 attention_mask"""
+        encoded = [self.encode(text) for text in texts]
+        length = max(len(ids) for ids in encoded)
+        input_ids = np.full((len(encoded), length), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encoded), length), dtype=np.int64)
+        for i, ids in enumerate(encoded):
+            input_ids[i, : len(ids)] = ids
+            attention_mask[i, : len(ids)] = 1
+        return input_ids, attention_mask
+
+
+class OnnxEmbedder:
+    """
+    CPU 上的句向量模型（onnxruntime）：mean pooling + L2 归一化，向量之间的内积就是余弦相似度。
+    模型在第一次使用时加载
+    """
+
+    def __init__(self, model_dir: str, batch_size: int, max_tokens: int, threads: int):
+        self.model_dir = Path(model_dir)
+        self.model_name = self.model_dir.name
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.threads = threads
+        self._session = None
+        self._input_names: Set[str] = set()
+        self._tokenizer: Optional[WordPieceTokenizer] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._session is not None:
+                return
+            model_path = self.model_dir / "model.onnx"
+            vocab_path = self.model_dir / "vocab.txt"
+            if not model_path.exists() or not vocab_path.exists():
+                raise SemanticSearchUnavailable(
+                    f"Embedding model not found, expected model.onnx and vocab.txt in {self.model_dir}"
+                )
+            try:
+                import onnxruntime
+            except ImportError as e:
+                raise SemanticSearchUnavailable(f"onnxruntime is not installed: {e}")
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = self.threads
+            self._tokenizer = WordPieceTokenizer(vocab_path, self.max_tokens)
+            self._session = onnxruntime.InferenceSession(
+                str(model_path), options, providers=["CPUExecutionProvider"]
+            )
+            self._input_names = {i.name for i in self._session.get_inputs()}
+            logger.info(f"Loaded embedding model {self.model_name}")
+
+    def _embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        input_ids, attention_mask = self._tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": np.zeros_like(input_ids),
+        }
+        output = self._session.run(
+            None, {name: value for name, value in feeds.items() if name in self._input_names}
+        )[0]
+        if output.ndim == 3:
+            # token 向量按 attention_mask 取平均
+            mask = attention_mask[..., None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return (output / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """按长度排序后分批，批内补齐的 padding 最少，再按原顺序返回"""
+        self._load()
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start : start + self.batch_size]
+            for i, vector in zip(batch, self._embed_batch([texts[i] for i in batch])):
+                vectors[i] = vector
+        return np.stack(vectors)
+
+
+class PaperVectorIndex:
+    """
+    论文向量的 ANN 索引（Milvus；本地部署用 Milvus Lite 的单文件库）。主键是 paper_id，向量已归一化，用内积检索
+    """
+
+    COLLECTION = "paper_abstracts"
+
+    def __init__(self, uri: str, index_type: str):
+        self.uri = uri
+        self.local = "://" not in uri
+        if self.local:
+            # Milvus Lite 不论请求哪种索引类型都只做 FLAT 暴力检索（逐条计算内积），
+            # 检索耗时随论文数线性增长；大规模数据请指向 Milvus 服务以使用 HNSW
+            index_type = "FLAT"
+        self.index_type = index_type
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                try:
+                    from pymilvus import MilvusClient
+                except ImportError as e:
+                    raise SemanticSearchUnavailable(f"pymilvus is not installed: {e}")
+                if self.local:
+                    Path(self.uri).parent.mkdir(parents=True, exist_ok=True)
+                self._client = MilvusClient(self.uri)
+            return self._client
+
+    def _index_params(self) -> dict:
+        if self.index_type == "HNSW":
+            return {"M": 16, "efConstruction": 200}
+        if self.index_type.startswith("IVF"):
+            return {"nlist": 1024}
+        return {}
+
+    def _search_params(self, top_k: int) -> dict:
+        if self.index_type == "HNSW":
+            return {"ef": max(64, top_k)}
+        if self.index_type.startswith("IVF"):
+            return {"nprobe": 16}
+        return {}
+
+    def ensure_collection(self, dim: int):
+        from pymilvus import DataType, MilvusClient
+
+        client = self._get_client()
+        if client.has_collection(self.COLLECTION):
+            return
+        schema = MilvusClient.create_schema(auto_id=False, enable_dynamic_field=False)
+        schema.add_field("paper_id", DataType.VARCHAR, is_primary=True, max_length=255)
+        schema.add_field("vector", DataType.FLOAT_VECTOR, dim=dim)
+        index_params = client.prepare_index_params()
+        index_params.add_index(
+            field_name="vector",
+            index_type=self.index_type,
+            metric_type="IP",
+            params=self._index_params(),
+        )
+        client.create_collection(
+            self.COLLECTION, schema=schema, index_params=index_params
+        )
+        logger.info(f"Created vector collection {self.COLLECTION} ({self.index_type}, dim={dim})")
+
+    def upsert(self, paper_ids: Sequence[str], vectors: np.ndarray):
+        self.ensure_collection(vectors.shape[1])
+        self._get_client().upsert(
+            self.COLLECTION,
+            data=[
+                {"paper_id": paper_id, "vector": vector.tolist()}
+                for paper_id, vector in zip(paper_ids, vectors)
+            ],
+        )
+
+    def search(self, vector: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        client = self._get_client()
+        if not client.has_collection(self.COLLECTION):
+            return []
+        results = client.search(
+            self.COLLECTION,
+            data=[vector.tolist()],
+            limit=top_k,
+            anns_field="vector",
+            search_params={"metric_type": "IP", "params": self._search_params(top_k)},
+        )
+        return [(hit["id"], float(hit["distance"])) for hit in results[0]]
+
+    def vector(self, paper_id: str) -> Optional[np.ndarray]:
+        client = self._get_client()
+        if not client.has_collection(self.COLLECTION):
+            return None
+        rows = client.get(self.COLLECTION, ids=[paper_id], output_fields=["vector"])
+        return np.asarray(rows[0]["vector"], dtype=np.float32) if rows else None
+
+
+class SemanticSearchIndex:
+    """
+    论文标题 + 摘要的语义检索。
+
+    - 增量向量化：只处理没有 PaperEmbedding 记录、模型不同或文本变化的论文，新论文入库后在后台线程里向量化；
+    - 先写向量索引再写 PaperEmbedding 记录，中途失败的论文下次会重新向量化（upsert 是幂等的）；
+    - 查询只需要向量化查询文本和一次 ANN 检索
+    """
+
+    def __init__(self, embedder: OnnxEmbedder, vector_index: PaperVectorIndex):
+        self.embedder = embedder
+        self.vector_index = vector_index
+        self._index_lock = threading.Lock()
+        self._scheduled = BackgroundBatcher("paper-embedding", self._index_scheduled)
+
+    @staticmethod
+    def paper_text(title: Optional[str], abstract: Optional[str]) -> str:
+        return f"{title or ''}. {abstract or ''}".strip(" .")
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _pending(self, db, paper_ids: Optional[Iterable[str]], limit: Optional[int]):
+        """需要（重新）向量化的论文：(paper_id, 文本, 已有的 PaperEmbedding 或 None)"""
+        query = db.query(
+            Publication.paper_id, Publication.title, Publication.abstract, PaperEmbedding
+        ).outerjoin(PaperEmbedding, PaperEmbedding.paper_id == Publication.paper_id)
+        if paper_ids is not None:
+            # 指定的论文还要检查文本是否变化
+            query = query.filter(Publication.paper_id.in_(list(paper_ids)))
+        else:
+            query = query.filter(
+                or_(
+                    PaperEmbedding.id.is_(None),
+                    PaperEmbedding.model != self.embedder.model_name,
+                )
+            )
+        if limit:
+            query = query.limit(limit)
+        pending = []
+        for paper_id, title, abstract, embedding in query:
+            text = self.paper_text(title, abstract)
+            if not text:
+                continue
+            if (
+                embedding is not None
+                and embedding.model == self.embedder.model_name
+                and embedding.text_hash == self.text_hash(text)
+            ):
+                continue
+            pending.append((paper_id, text, embedding))
+        return pending
+
+    def index_pending(
+        self, paper_ids: Optional[Iterable[str]] = None, limit: Optional[int] = None
+    ) -> int:
+        """向量化还没有索引的论文（或者只处理 paper_ids），返回向量化的论文数"""
+        with self._index_lock:
+            db = SyncSessionLocal()
+            try:
+                pending = self._pending(db, paper_ids, limit)
+                # 每批提交一次，大批量回填时中途失败也不会丢掉已完成的部分
+                step = self.embedder.batch_size * 8
+                for start in range(0, len(pending), step):
+                    batch = pending[start : start + step]
+                    vectors = self.embedder.embed([text for _, text, _ in batch])
+                    self.vector_index.upsert([paper_id for paper_id, _, _ in batch], vectors)
+                    for paper_id, text, embedding in batch:
+                        embedding = embedding or PaperEmbedding(paper_id=paper_id)
+                        embedding.model = self.embedder.model_name
+                        embedding.text_hash = self.text_hash(text)
+                        db.add(embedding)
+                    db.commit()
+                    logger.info(f"Embedded {start + len(batch)}/{len(pending)} papers")
+                return len(pending)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def schedule(self, paper_ids: Iterable[str]):
+        """在后台线程里向量化新入库的论文，不阻塞调用方；已经在排队的论文会合并到同一次处理"""
+        self._scheduled.add(paper_ids)
+
+    def _index_scheduled(self, paper_ids: Set[str]):
+        try:
+            self.index_pending(paper_ids)
+        except SemanticSearchUnavailable as e:
+            logger.warning(f"Semantic search is not available, skipped embedding: {e}")
+        except Exception as e:
+            # 向量化失败的论文没有 PaperEmbedding 记录，会在下次 build_embedding_index 任务中补上
+            logger.error(f"Failed to embed {len(paper_ids)} papers: {e}")
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """与查询文本最相似的论文：[(paper_id, 相似度)]，相似度越大越相似"""
+        vector = self.embedder.embed([query])[0]
+        return self.vector_index.search(vector, top_k)
+
+    def similar(self, paper_id: str, top_k: int) -> Optional[List[Tuple[str, float]]]:
+        """与某篇论文最相似的论文（不包括它自己）；论文还没有向量化时返回 None"""
+        vector = self.vector_index.vector(paper_id)
+        if vector is None:
+            return None
+        hits = self.vector_index.search(vector, top_k + 1)
+        return [(hit_id, score) for hit_id, score in hits if hit_id != paper_id][:top_k]
+
+
+semantic_search_index = SemanticSearchIndex(
+    OnnxEmbedder(
+        EMBEDDING_MODEL_DIR,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        max_tokens=EMBEDDING_MAX_TOKENS,
+        threads=EMBEDDING_THREADS,
+    ),
+    PaperVectorIndex(SEMANTIC_INDEX_URI, index_type=SEMANTIC_INDEX_TYPE),
+)
@@ -0,0 +1,142 @@
+import logging
+import re
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # 没有安装 tiktoken 时，退化为按字符数估算
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# 没有 tokenizer 时的估算值：英文论文大约 4 个字符对应 1 个 token
+CHARS_PER_TOKEN = 4
+# tiktoken 不认识的模型名，统一使用 gpt-4o 系列的编码
+DEFAULT_ENCODING = "o200k_base"
+# 被截断的章节用这个标记告诉 LLM 中间有省略
+OMITTED_MARKER = "[...]"
+
+_encoding_cache = {}
+
+
+def _get_encoding(model_name: Optional[str]):
+    if tiktoken is None:
+        return None
+    key = model_name or DEFAULT_ENCODING
+    if key not in _encoding_cache:
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model_name)
+            except (KeyError, TypeError):
+                encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception as e:
+            # 第一次使用时 tiktoken 要下载 BPE 文件，离线或被防火墙拦住时退化为按字符数估算
+            logger.warning(f"tiktoken encoding unavailable, estimating tokens by characters: {e}")
+            encoding = None
+        _encoding_cache[key] = encoding
+    return _encoding_cache[key]
+
+
+class TokenCounter:
+    """
+    按模型的 tokenizer 计算 token 数量，tiktoken 不可用时按字符数估算
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name
+        self.encoding = _get_encoding(model_name)
+
+    def count(self, text: Optional[str]) -> int:
+        if not text:
+            return 0
+        if self.encoding is None:
+            return _ceil_div(len(text), CHARS_PER_TOKEN)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_lines(self, lines: Iterable[str]) -> List[int]:
+        """逐行计算 token 数（每行额外算 1 个换行符）"""
+        return [self.count(line) + 1 for line in lines]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """把文本截断到不超过 max_tokens 个 token"""
+        if max_tokens <= 0 or not text:
+            return ""
+        if self.encoding is None:
+            return text[: max_tokens * CHARS_PER_TOKEN]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max_tokens])
+
+
+def _ceil_div(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+def section_base_name(section: str) -> str:
+    """
+    _detect_section_titles 会给重复出现的章节加编号后缀（比如 summary_3），这里还原出章节名
+    """
+    return re.sub(r"_\d+$", "", section)
+
+
+def pack_sections_by_priority(
+    section_chunks: Dict[str, List[str]],
+    priority: List[str],
+    budget: int,
+    counter: TokenCounter,
+    max_section_share: float = 0.4,
+) -> str:
+    """
+    在 token 预算内按章节优先级挑选论文内容。
+
+    第一轮按优先级给每个章节最多 max_section_share 的预算（取章节开头的若干行），
+    避免单个超长章节（比如 methodology）把后面的 results 挤掉；
+    第二轮把剩余预算继续按优先级补给还没放完的章节。
+    最终按章节在原文中的顺序拼接，被截断的位置用 OMITTED_MARKER 标记。
+    不在 priority 中的章节（比如 references）不会放入。
+    """
+    if budget <= 0 or not section_chunks:
+        return ""
+
+    rank = {name: i for i, name in enumerate(priority)}
+    candidates = [
+        section
+        for section in section_chunks
+        if section_base_name(section) in rank and section_chunks[section]
+    ]
+    candidates.sort(key=lambda s: rank[section_base_name(s)])
+
+    line_tokens = {s: counter.count_lines(section_chunks[s]) for s in candidates}
+    taken = {s: 0 for s in candidates}  # 每个章节已经放入的行数
+    remaining = budget
+    section_cap = max(1, int(budget * max_section_share))
+
+    for cap in (section_cap, None):
+        for section in candidates:
+            if remaining <= 0:
+                break
+            allowance = remaining if cap is None else min(remaining, cap)
+            tokens = line_tokens[section]
+            used = 0
+            i = taken[section]
+            while i < len(tokens) and used + tokens[i] <= allowance:
+                used += tokens[i]
+                i += 1
+            taken[section] = i
+            remaining -= used
+
+    packed = []
+    for section in section_chunks:  # 保持原文顺序
+        n = taken.get(section, 0)
+        if n == 0:
+            continue
+        packed.extend(section_chunks[section][:n])
+        if n < len(section_chunks[section]):
+            packed.append(OMITTED_MARKER)
+
+    logger.info(
+        f"Packed {len([s for s in taken if taken[s]])}/{len(section_chunks)} sections "
+        f"into {budget - remaining}/{budget} tokens"
+    )
+    return "\n".join(packed)
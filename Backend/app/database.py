@@ -1,3 +1,5 @@
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
@@ -11,6 +13,23 @@ SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
 )
 
+# 异步驱动对应的同步驱动
+_SYNC_DRIVERS = {"asyncpg": "psycopg2", "aiosqlite": "pysqlite", "aiomysql": "pymysql"}
+
+
+def sync_database_url(database_url: str):
+    """把异步驱动的连接串换成同一个数据库的同步驱动连接串"""
+    url = make_url(database_url)
+    driver = _SYNC_DRIVERS.get(url.get_driver_name())
+    if driver:
+        url = url.set(drivername=f"{url.get_backend_name()}+{driver}")
+    return url
+
+
+# 同步引擎和会话工厂：给后台线程、任务函数和 review 流程这些同步代码使用
+sync_engine = create_engine(sync_database_url(DATABASE_URL), echo=True)
+SyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
 # SQLAlchemy declarative base for models
 Base = declarative_base()
 
@@ -14,6 +14,14 @@ from models.tasks import (
     Publication,
     PaperScores,
     SOTAContext,
+    PdfBlob,
+    PublicationContent,
+    Citation,
+    PaperChunk,
+    PaperEmbedding,
+    DailyReport,
+    PublicationRollup,
+    PublicationAffiliationRollup,
 )
 
 logger = logging.getLogger(__name__)
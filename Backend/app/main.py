@@ -10,6 +10,8 @@ from api import api_router
 import logging
 import asyncio
 from db_init import init_db
+from core.pdf_extraction import pdf_extraction_service
+from core import query_counter
 
 # Import all SQLAlchemy models to ensure they're registered with metadata
 from models.models import Conference, ConferenceInstance
@@ -34,6 +36,10 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+# 每个请求执行的 SQL 语句数通过 X-Query-Count 响应头返回
+query_counter.install(engine)
+app.middleware("http")(query_counter.query_count_middleware)
+
 
 # Initialize database
 @app.on_event("startup")
@@ -41,6 +47,11 @@ async def startup_event():
     await init_db()
 
 
+@app.on_event("shutdown")
+def shutdown_event():
+    pdf_extraction_service.shutdown()
+
+
 origins = [
     "*",
 ]
@@ -51,6 +62,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[query_counter.QUERY_COUNT_HEADER],
 )
 
 # Register API router
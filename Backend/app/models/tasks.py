@@ -1,6 +1,7 @@
 # 定义任务状态枚举
 import datetime
 import enum
+import zlib
 from typing import Dict, List, Optional, Any
 
 from sqlalchemy import (
@@ -15,9 +16,16 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     Date,
+    LargeBinary,
+    DDL,
+    Index,
+    UniqueConstraint,
+    event,
+    update,
 )
 from sqlalchemy.orm import relationship
 from database import Base
+from core.reference_parser import normalize_title
 from datetime import date, datetime, timedelta, timezone
 from pydantic import BaseModel
 
@@ -107,6 +115,9 @@ class ArxivPaper(Base):
     authors = Column(JSON)
     primary_category = Column(String(255))
     categories = Column(JSON)
+    pdf_size = Column(Integer)  # 下载得到的 PDF 文件大小（字节）
+    pdf_sha256 = Column(String(64), index=True)  # PDF 文件的 sha256，对应 PdfBlob.sha256
+    pdf_state = Column(String(20), index=True)  # PDF 存储状态，取值见 PdfState，为空表示还没有下载
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -118,13 +129,41 @@ class ArxivPaper(Base):
         return f"<ArxivPaper(arxiv_id='{self.arxiv_id}', title='{self.title}')>"
 
 
+class PdfState(enum.Enum):
+    stored = "stored"  # 已经存入内容寻址存储
+    failed = "failed"  # 下载失败，下次评审时重试
+
+
+class PdfBlob(Base):
+    """
+    内容寻址存储中的 PDF 文件，同一内容（比如不同版本号、交叉投递的同一篇论文）只存一份
+    """
+
+    __tablename__ = "pdf_blob"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    storage_path = Column(String(255), nullable=False)  # 相对数据目录的路径
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<PdfBlob(sha256='{self.sha256}', size={self.size})>"
+
+
 class Publication(Base):
     __tablename__ = "publication"
+    __table_args__ = (
+        # 列表接口的 keyset 分页：按 (排序键, paper_id) 走索引，翻到第 N 页和第 1 页的代价相同
+        Index("ix_publication_publish_date_paper_id", "publish_date", "paper_id"),
+        Index("ix_publication_weighted_score_paper_id", "weighted_score", "paper_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     paper_id = Column(String(255), nullable=False, unique=True, index=True)
     instance_id = Column(Integer)
     title = Column(String(500), nullable=False)
+    # normalize_title(title)，参考文献按标题匹配论文时和解析出的标题用同一种规范化，随 title 自动更新
+    title_normalized = Column(String(500), index=True)
     year = Column(Integer)
     publish_date = Column(Date)
     tldr = Column(Text)
@@ -133,12 +172,14 @@ class Publication(Base):
     research_topics = Column(String(500))
     conclusion = Column(Text)
     triage_qa = Column(JSON)
-    content_raw_text = Column(Text)
-    reference_raw_text = Column(Text)
     pdf_path = Column(String(255))
-    citation_count = Column(Integer)
+    citation_count = Column(Integer)  # 本库中引用该论文的论文数，由 citation 表汇总
+    # 最近一次为这篇论文构建引用边的时间，没有解析出参考文献时也会记录，避免每批都重新选中
+    citations_built_at = Column(DateTime)
+    # PaperScores.weighted_score 的冗余副本（未评审为 0），按分数排序分页时不需要关联 paperscores
+    weighted_score = Column(Float, nullable=False, default=0, server_default="0")
     award = Column(String(255))
-    doi = Column(String(255))
+    doi = Column(String(255), index=True)
     url = Column(String(255))
     pdf_url = Column(String(255))
     attachment_url = Column(String(255))
@@ -151,11 +192,260 @@ class Publication(Base):
 
     # Relationships
     scores = relationship("PaperScores", back_populates="publication", uselist=False)
+    # 作者等元数据还在 ArxivPaper 里，列表接口通过这个关系一起加载，而不是每行单独查询
+    arxiv_paper = relationship(
+        "ArxivPaper",
+        primaryjoin="foreign(Publication.paper_id) == ArxivPaper.arxiv_id",
+        uselist=False,
+        viewonly=True,
+    )
+    # 全文和参考文献放在单独的表里，只有访问 content_raw_text/reference_raw_text 时才会加载
+    content = relationship(
+        "PublicationContent",
+        uselist=False,
+        lazy="select",
+        cascade="all, delete-orphan",
+    )
+
+    def _get_content(self) -> "PublicationContent":
+        if self.content is None:
+            self.content = PublicationContent()
+        return self.content
+
+    @property
+    def content_raw_text(self) -> str:
+        return self.content.content_raw_text if self.content else ""
+
+    @content_raw_text.setter
+    def content_raw_text(self, value: str):
+        self._get_content().content_raw_text = value
+
+    @property
+    def reference_raw_text(self) -> str:
+        return self.content.reference_raw_text if self.content else ""
+
+    @reference_raw_text.setter
+    def reference_raw_text(self, value: str):
+        self._get_content().reference_raw_text = value
 
     def __repr__(self):
         return f"<Publication(id='{self.id}', title='{self.title}')>"
 
 
+@event.listens_for(Publication.title, "set")
+def _set_publication_title_normalized(target, value, oldvalue, initiator):
+    target.title_normalized = normalize_title(value)
+
+
+class PublicationContent(Base):
+    """
+    论文全文和参考文献原文（zlib 压缩），和 Publication 一对一。
+    单独成表，列表和详情查询不再读取这些大字段
+    """
+
+    __tablename__ = "publication_content"
+
+    paper_id = Column(
+        String(255), ForeignKey("publication.paper_id", ondelete="CASCADE"), primary_key=True
+    )
+    content_compressed = Column(LargeBinary)
+    reference_compressed = Column(LargeBinary)
+    content_length = Column(Integer, default=0)  # 解压后的字符数
+    reference_length = Column(Integer, default=0)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    @staticmethod
+    def compress(text: Optional[str]) -> Optional[bytes]:
+        return zlib.compress(text.encode("utf-8"), 6) if text else None
+
+    @staticmethod
+    def decompress(data: Optional[bytes]) -> str:
+        return zlib.decompress(data).decode("utf-8") if data else ""
+
+    @property
+    def content_raw_text(self) -> str:
+        return self.decompress(self.content_compressed)
+
+    @content_raw_text.setter
+    def content_raw_text(self, value: str):
+        self.content_compressed = self.compress(value)
+        self.content_length = len(value or "")
+
+    @property
+    def reference_raw_text(self) -> str:
+        return self.decompress(self.reference_compressed)
+
+    @reference_raw_text.setter
+    def reference_raw_text(self, value: str):
+        self.reference_compressed = self.compress(value)
+        self.reference_length = len(value or "")
+
+    def __repr__(self):
+        return f"<PublicationContent(paper_id='{self.paper_id}', content_length={self.content_length})>"
+
+
+class Citation(Base):
+    """
+    引用关系（边）：citing_paper_id 的参考文献列表中第 position 条。
+    能解析到本库论文时 cited_paper_id 为被引论文的 paper_id，否则为空，只保留解析出的标识
+    """
+
+    __tablename__ = "citation"
+    __table_args__ = (
+        UniqueConstraint("citing_paper_id", "position", name="uq_citation_citing_position"),
+        # "谁引用了 X"：按被引论文查引用方
+        Index("ix_citation_cited_citing", "cited_paper_id", "citing_paper_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    citing_paper_id = Column(
+        String(255),
+        ForeignKey("publication.paper_id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    position = Column(Integer, nullable=False)
+    cited_paper_id = Column(String(255))
+    cited_arxiv_id = Column(String(32), index=True)
+    cited_doi = Column(String(255), index=True)
+    cited_title = Column(String(500))
+    cited_year = Column(Integer)
+    raw = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<Citation(citing='{self.citing_paper_id}', cited='{self.cited_paper_id}')>"
+
+
+class PaperChunk(Base):
+    """
+    论文全文按章节切分的重叠片段，用于检索相关内容（而不是把截断的全文整个发给 LLM）。
+    line_start/line_end 是非空行的行号区间 [start, end)，char_start/char_end 是在 content_raw_text 中的字符区间
+    """
+
+    __tablename__ = "paper_chunk"
+    __table_args__ = (
+        UniqueConstraint("paper_id", "chunk_index", name="uq_paper_chunk_paper_index"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    paper_id = Column(
+        String(255),
+        ForeignKey("publication.paper_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    chunk_index = Column(Integer, nullable=False)
+    section = Column(String(50), nullable=False)
+    line_start = Column(Integer, nullable=False)
+    line_end = Column(Integer, nullable=False)
+    char_start = Column(Integer, nullable=False)
+    char_end = Column(Integer, nullable=False)
+    page = Column(Integer)  # 片段开始所在的页码（从 0 开始），没有页信息时为空
+    token_count = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<PaperChunk(paper_id='{self.paper_id}', chunk_index={self.chunk_index}, section='{self.section}')>"
+
+
+class PaperEmbedding(Base):
+    """
+    论文摘要向量的索引记录。向量本身保存在向量索引（Milvus）里，这里记录哪些论文已经用哪个模型向量化过，
+    用于增量向量化：只处理没有记录、模型不同或标题摘要变化（text_hash 不同）的论文
+    """
+
+    __tablename__ = "paper_embedding"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    paper_id = Column(
+        String(255),
+        ForeignKey("publication.paper_id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+        index=True,
+    )
+    model = Column(String(255), nullable=False)
+    text_hash = Column(String(40), nullable=False)  # 向量化文本的 sha1
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    def __repr__(self):
+        return f"<PaperEmbedding(paper_id='{self.paper_id}', model='{self.model}')>"
+
+
+class DailyReport(Base):
+    """
+    每日报告（LLM 生成）。按日期保存，GET 时直接返回；
+    fingerprint 是当天 top-k 论文及其分数的哈希，只有 top-k 变化时才重新生成
+    """
+
+    __tablename__ = "daily_report"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    report_date = Column(Date, nullable=False, unique=True, index=True)
+    top_k = Column(Integer, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    paper_ids = Column(JSON)
+    report = Column(JSON)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    def __repr__(self):
+        return f"<DailyReport(report_date='{self.report_date}', top_k={self.top_k})>"
+
+
+class PublicationRollup(Base):
+    """
+    论文数的聚合表：每个 (发布日期, 主分类, 是否推荐, 分数区间) 组合一行，分面统计只读这张表，不扫描论文表。
+    按发布日期增量维护：某天的论文有写入时，只重算那一天的行（见 core/facets.py）。
+    recommend / score_bucket 为空表示还没有评审；score_bucket 是 weighted_score 向下取整（0-9）
+    """
+
+    __tablename__ = "publication_rollup"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    publish_date = Column(Date, nullable=False, index=True)
+    primary_category = Column(String(255))
+    recommend = Column(Boolean)
+    score_bucket = Column(Integer)
+    count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<PublicationRollup(publish_date='{self.publish_date}', primary_category='{self.primary_category}', count={self.count})>"
+
+
+class PublicationAffiliationRollup(Base):
+    """
+    和 PublicationRollup 相同，但多了作者单位一列：每篇论文对它的每个（去重后的）单位各计一次
+    """
+
+    __tablename__ = "publication_affiliation_rollup"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    publish_date = Column(Date, nullable=False, index=True)
+    primary_category = Column(String(255))
+    recommend = Column(Boolean)
+    score_bucket = Column(Integer)
+    affiliation = Column(String(255), nullable=False, index=True)
+    count = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<PublicationAffiliationRollup(publish_date='{self.publish_date}', affiliation='{self.affiliation}', count={self.count})>"
+
+
 class SOTAContext(Base):
     __tablename__ = "sotacontext"
 
@@ -197,6 +487,9 @@ class PaperScores(Base):
     authority_score = Column(Float)
     authority_reason = Column(Text)
     weighted_score = Column(Float)
+    # 标题/摘要预筛的分数，只在预筛未通过（review_status=prescreen_rejected）时有值；
+    # 这种论文没有完整评审，weighted_score 留空，不参与按分数的排序和报告
+    prescreen_score = Column(Float)
     recommend = Column(Boolean, nullable=False)
     recommend_reason = Column(Text)
     who_should_read = Column(Text)
@@ -280,7 +573,86 @@ class PaperScores(Base):
         return f"<PaperScores(id='{self.id}', paper_id='{self.paper_id}', title='{self.title}')>"
 
 
+@event.listens_for(PaperScores, "after_insert")
+@event.listens_for(PaperScores, "after_update")
+def _sync_publication_weighted_score(mapper, connection, target):
+    """评分写入后同步 Publication.weighted_score，所有保存评分的路径都会经过这里"""
+    connection.execute(
+        update(Publication.__table__)
+        .where(Publication.__table__.c.paper_id == target.paper_id)
+        .values(weighted_score=target.weighted_score or 0)
+    )
+
+
+# 全文检索索引，覆盖 title / research_topics / abstract / conclusion（权重依次降低）。
+# 索引由数据库自己维护，插入和修改论文时增量更新，不需要单独的重建任务：
+# - PostgreSQL：生成列 search_vector（tsvector）+ GIN 索引
+# - SQLite：FTS5 外部内容表 publication_fts + 触发器（本地开发和测试用）
+# 不在模型上映射这些列，普通查询不会加载 tsvector
+
+for _statement in (
+    """
+    ALTER TABLE publication ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(research_topics, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(abstract, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(conclusion, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX ix_publication_search_vector ON publication USING GIN (search_vector)",
+):
+    event.listen(
+        Publication.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+
+for _statement in (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS publication_fts USING fts5(
+        title, research_topics, abstract, conclusion,
+        content='publication', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS publication_fts_ai AFTER INSERT ON publication BEGIN
+        INSERT INTO publication_fts(rowid, title, research_topics, abstract, conclusion)
+        VALUES (new.id, new.title, new.research_topics, new.abstract, new.conclusion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS publication_fts_ad AFTER DELETE ON publication BEGIN
+        INSERT INTO publication_fts(publication_fts, rowid, title, research_topics, abstract, conclusion)
+        VALUES ('delete', old.id, old.title, old.research_topics, old.abstract, old.conclusion);
+    END
+    """,
+    # 只有被索引的列变化时才重建这一行（更新分数、PDF 路径等不会触发）
+    """
+    CREATE TRIGGER IF NOT EXISTS publication_fts_au
+    AFTER UPDATE OF title, research_topics, abstract, conclusion ON publication BEGIN
+        INSERT INTO publication_fts(publication_fts, rowid, title, research_topics, abstract, conclusion)
+        VALUES ('delete', old.id, old.title, old.research_topics, old.abstract, old.conclusion);
+        INSERT INTO publication_fts(rowid, title, research_topics, abstract, conclusion)
+        VALUES (new.id, new.title, new.research_topics, new.abstract, new.conclusion);
+    END
+    """,
+):
+    event.listen(
+        Publication.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+
+event.listen(
+    Publication.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS publication_fts").execute_if(dialect="sqlite"),
+)
+
+
 # Pydantic models for API responses - these stay the same
+
+
 class CrawlerTaskCreate(BaseModel):
     name: str
     description: Optional[str] = None
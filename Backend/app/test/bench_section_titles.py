@@ -0,0 +1,83 @@
+"""
+章节标题识别的微基准：对比原来逐关键词正则匹配的实现和 SectionTitleMatcher，并校验两者结果一致。
+
+在 Backend/app 目录下运行：python -m test.bench_section_titles
+"""
+
+import random
+import re
+import time
+
+from core.review_arxiv_paper import PaperReviewConfig
+from core.section_titles import SectionTitleMatcher
+
+
+def detect_section_titles_regex(lines, section_titles):
+    """原实现：每一行、每个关键词都拼一个正则匹配"""
+    title_indices = {}
+    section_num = 0
+    for i, line in enumerate(lines):
+        clean_line = re.sub(r"[^a-zA-Z\s]", "", line).strip().lower()
+        for section, keywords in section_titles.items():
+            if any(
+                re.match(
+                    rf"^\s*(\d+([\.\-）]\d+)*[\.\-）]*\s*)?{re.escape(kw)}\s*$",
+                    clean_line,
+                    re.IGNORECASE,
+                )
+                for kw in keywords
+            ):
+                if section in title_indices:
+                    title_indices[section + "_" + str(section_num)] = i
+                    section_num += 1
+                else:
+                    title_indices[section] = i
+                break
+    return title_indices
+
+
+def make_paper_lines(line_count=3000, seed=0):
+    """生成一篇模拟论文：大部分是正文行，夹杂带编号、大小写各异的标题行"""
+    rng = random.Random(seed)
+    keywords = [
+        kw for keywords in PaperReviewConfig.SECTION_TITLES.values() for kw in keywords
+    ]
+    words = "we propose a novel model for efficient training of large networks".split()
+    lines = []
+    for i in range(line_count):
+        if rng.random() < 0.02:
+            keyword = rng.choice(keywords)
+            prefix = rng.choice(["", f"{i % 9 + 1} ", f"{i % 9 + 1}.{i % 5} ", "A. "])
+            lines.append(prefix + rng.choice([keyword, keyword.upper(), keyword.title()]))
+        else:
+            lines.append(
+                " ".join(rng.choice(words) for _ in range(rng.randint(3, 14)))
+                + rng.choice(["", ".", ",", " [12]", " (3.1)"])
+            )
+    return lines
+
+
+def bench(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    lines = make_paper_lines()
+    section_titles = PaperReviewConfig.SECTION_TITLES
+    matcher = SectionTitleMatcher(section_titles)
+
+    regex_time, expected = bench(
+        lambda: detect_section_titles_regex(lines, section_titles), repeat=3
+    )
+    matcher_time, actual = bench(lambda: matcher.detect(lines), repeat=20)
+
+    assert actual == expected, "SectionTitleMatcher result differs from the regex implementation"
+    print(f"lines: {len(lines)}, titles found: {len(expected)}")
+    print(f"regex per keyword:    {regex_time * 1000:8.2f} ms")
+    print(f"SectionTitleMatcher:  {matcher_time * 1000:8.2f} ms")
+    print(f"speedup: {regex_time / matcher_time:.1f}x")